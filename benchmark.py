@@ -0,0 +1,510 @@
+"""
+Banc de mesure des scénarios TEST_* de canapematplot (rendu headless).
+
+Chaque scénario de canapematplot.TEST_SCENARIOS est rendu N fois via
+render_image, sous instrument() ; on relève pour chaque rendu :
+  - layout   : géométrie + placement (phase layout hors optimisation)
+  - optimize : optimiseurs _optimize_valise_*
+  - raster   : tracé de la liste d'affichage + encodage (draw + encode)
+  - total    : appel render_image complet
+puis min / médiane / p95 par scénario.
+
+Avec --thumbnail, les mêmes mesures portent sur render_thumbnail (vignette
+Pillow) ; --min-speedup X mesure aussi le rendu complet et échoue si le tracé
+(raster) d'une vignette n'est pas au moins X fois plus rapide. Le layout est
+le même dans les deux cas : le gain de bout en bout (total, affiché aussi)
+est plafonné par l'optimisation des coussins.
+
+Usage :
+    python benchmark.py                              # tous les scénarios, 5 mesures
+    python benchmark.py --family U,U1F -n 10         # familles S1, LF, LNF, U, U1F, U2f
+    python benchmark.py --save bench/baseline.json   # enregistre une référence
+    python benchmark.py --compare bench/baseline.json --threshold 1.15
+    python benchmark.py --soak 1000                  # mémoire bornée sur 1000 devis
+    python benchmark.py --soak 1000 --soak-mode pyplot
+    python benchmark.py --thumbnail --min-speedup 10   # vignettes vs rendu complet
+    python benchmark.py --cache-threads 8              # cache partagé entre threads
+    python benchmark.py --valise-check 300             # recherches valise vs boucle Python
+
+Le mode --soak enchaîne les scénarios en boucle (comme un worker ou un
+processus Streamlit) et échoue si la mémoire résidente (RSS) croît de plus
+de --max-growth-mb après l'échauffement, ou si des figures restent
+enregistrées dans pyplot.
+
+Le mode --cache-threads rend les scénarios en parallèle avec le cache de
+rendu activé et échoue si un rapport console servi (ou mis en cache) n'est
+pas celui du rendu séquentiel sans cache.
+
+Le mode --valise-check compare, sur des canapés valise tirés au hasard, la
+recherche par branche (défaut) et le produit cartésien NumPy (référence) à
+la boucle Python sur tout le produit, alternatives comprises.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+
+import canapematplot as cm
+
+# préfixe du render_* -> famille (U1F/U2f avant U)
+_FAMILIES = (
+    ("render_Simple1", "S1"),
+    ("render_LF_variant", "LF"),
+    ("render_LNF", "LNF"),
+    ("render_U2f_variant", "U2f"),
+    ("render_U1F", "U1F"),
+    ("render_U", "U"),
+)
+
+METRICS = ("layout", "optimize", "raster", "total")
+
+
+def family_of(render_name):
+    for prefix, family in _FAMILIES:
+        if render_name.startswith(prefix):
+            return family
+    return "?"
+
+
+def percentile(values, q):
+    """Percentile « nearest rank » (q dans [0, 100])."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    return {
+        "min": min(values),
+        "median": statistics.median(values),
+        "p95": percentile(values, 95),
+    }
+
+
+def _phase_seconds(record, phase):
+    phases = record.phases if isinstance(record, cm.RenderStats) else record["phases"]
+    return phases.get(phase, {}).get("seconds", 0.0)
+
+
+def measure_once(spec, fmt, dpi, backend, thumbnail=False):
+    """Un rendu instrumenté ; renvoie {métrique: secondes}."""
+    fn = getattr(cm, spec["render"])
+    with cm.instrument() as stats, contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        if thumbnail:
+            cm.render_thumbnail(fn, **spec["params"])
+        else:
+            cm.render_image(fn, fmt=fmt, dpi=dpi, backend=backend, **spec["params"])
+        total = time.perf_counter() - t0
+    record = stats.renders[-1]
+    optimize = _phase_seconds(record, "optimize")
+    # le tracé d'une vignette a lieu hors de l'appel render_* : totaux du bloc
+    return {
+        "layout": _phase_seconds(record, "layout") - optimize,
+        "optimize": optimize,
+        "raster": _phase_seconds(stats, "draw") + _phase_seconds(stats, "encode"),
+        "total": total,
+        "evals": sum(record["evals"].values()),
+    }
+
+
+def run_scenario(name, repeat, warmup, fmt, dpi, backend, thumbnail=False):
+    spec = cm.TEST_SCENARIOS[name]
+    result = {"render": spec["render"], "family": family_of(spec["render"])}
+    try:
+        for _ in range(warmup):
+            measure_once(spec, fmt, dpi, backend, thumbnail)
+        runs = [measure_once(spec, fmt, dpi, backend, thumbnail) for _ in range(repeat)]
+    except Exception as e:
+        # scénario invalide par construction (ex. banquette > 250 cm)
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+    for metric in METRICS:
+        result[metric] = summarize([r[metric] for r in runs])
+    result["evals"] = runs[0]["evals"]
+    return result
+
+
+def select_scenarios(families=None, pattern=None):
+    names = []
+    for name, spec in cm.TEST_SCENARIOS.items():
+        if families and family_of(spec["render"]) not in families:
+            continue
+        if pattern and not re.search(pattern, name):
+            continue
+        names.append(name)
+    return names
+
+
+def _ms(seconds):
+    return f"{seconds * 1000.0:8.1f}"
+
+
+def print_results(results, out=sys.stdout):
+    out.write(f"{'scénario':<56} {'fam.':<4} "
+              + " ".join(f"{m + ' méd.':>10} {'p95':>8}" for m in METRICS) + "\n")
+    for name, r in results.items():
+        if "error" in r:
+            out.write(f"{name:<56} {r['family']:<4} ÉCHEC {r['error']}\n")
+            continue
+        cols = " ".join(f"  {_ms(r[m]['median'])} {_ms(r[m]['p95'])}" for m in METRICS)
+        out.write(f"{name:<56} {r['family']:<4} {cols}\n")
+    totals = {}
+    for r in results.values():
+        if "error" not in r:
+            totals[r["family"]] = totals.get(r["family"], 0.0) + r["total"]["median"]
+    out.write("Total médian par famille (ms) : "
+              + ", ".join(f"{f}={t * 1000.0:.1f}" for f, t in sorted(totals.items())) + "\n")
+
+
+def compare(results, baseline, threshold, out=sys.stdout):
+    """
+    Compare les médianes à une référence ; renvoie la liste des régressions
+    (scénario, métrique, ratio) au-delà de threshold. Les métriques de moins
+    d'une milliseconde dans la référence sont ignorées (bruit).
+    """
+    regressions = []
+    for name, r in results.items():
+        ref = baseline.get("scenarios", {}).get(name)
+        if ref is None or "error" in r or "error" in ref:
+            continue
+        for metric in METRICS:
+            before, after = ref[metric]["median"], r[metric]["median"]
+            if before < 1e-3:
+                continue
+            ratio = after / before
+            if ratio > threshold:
+                regressions.append((name, metric, ratio))
+    for name, metric, ratio in regressions:
+        out.write(f"RÉGRESSION {name} [{metric}] ×{ratio:.2f}\n")
+    if not regressions:
+        out.write(f"Aucune régression au-delà de ×{threshold:.2f}.\n")
+    return regressions
+
+
+def check_speedup(results, full, min_speedup, out=sys.stdout):
+    """
+    Gains médians rendu complet / vignette (raster et total) ; renvoie les
+    scénarios dont le gain raster est sous min_speedup.
+    """
+    slow = []
+    out.write(f"{'scénario':<56} {'raster':>8} {'total':>8}\n")
+    for name, r in results.items():
+        if "error" in r or "error" in full[name]:
+            continue
+        ratio = full[name]["raster"]["median"] / r["raster"]["median"]
+        end_to_end = full[name]["total"]["median"] / r["total"]["median"]
+        out.write(f"{name:<56} ×{ratio:6.1f}  ×{end_to_end:6.1f}\n")
+        if ratio < min_speedup:
+            slow.append((name, ratio))
+    for name, ratio in slow:
+        out.write(f"TROP LENT {name} : vignette ×{ratio:.1f} (attendu ×{min_speedup:g})\n")
+    if not slow:
+        out.write(f"Vignettes au moins ×{min_speedup:g} plus rapides que le rendu complet.\n")
+    return slow
+
+
+def current_rss_mb():
+    """RSS courante du processus (Mo) ; à défaut, pic RSS (getrusage)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ko sous Linux, octets sous macOS
+        return peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)
+
+
+def soak(count, mode, fmt, dpi, backend, max_growth_mb, warmup=50, out=sys.stdout):
+    """
+    Rend `count` devis à la suite en faisant tourner les scénarios valides.
+    mode "headless" : render_image ; mode "pyplot" : appel direct des TEST_*
+    (figures pyplot, backend Agg, plt.show sans effet). Renvoie True si la
+    RSS reste bornée et qu'aucune figure ne traîne dans pyplot.
+    """
+    import matplotlib
+    if mode == "pyplot":
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    names = []
+    for name, spec in cm.TEST_SCENARIOS.items():
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                cm.compute_layout(spec)
+        except ValueError:
+            continue
+        names.append(name)
+
+    def render(i):
+        name = names[i % len(names)]
+        spec = cm.TEST_SCENARIOS[name]
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == "pyplot":
+                getattr(cm, name)()
+            else:
+                cm.render_image(getattr(cm, spec["render"]), fmt=fmt, dpi=dpi,
+                                backend=backend, **spec["params"])
+
+    for i in range(warmup):
+        render(i)
+    base = peak = current_rss_mb()
+    t0 = time.perf_counter()
+    step = max(1, count // 10)
+    for i in range(count):
+        render(warmup + i)
+        if (i + 1) % step == 0 or i + 1 == count:
+            rss = current_rss_mb()
+            peak = max(peak, rss)
+            out.write(f"{i + 1:6d} devis  RSS {rss:7.1f} Mo ({rss - base:+6.1f})  "
+                      f"figures pyplot : {len(plt.get_fignums())}\n")
+    growth = peak - base
+    figures = len(plt.get_fignums())
+    ok = growth <= max_growth_mb and figures == 0
+    out.write(f"{count} devis en {time.perf_counter() - t0:.1f} s ({mode}) : "
+              f"croissance RSS max {growth:.1f} Mo (limite {max_growth_mb} Mo), "
+              f"{figures} figure(s) ouverte(s) → {'OK' if ok else 'ÉCHEC'}\n")
+    return ok
+
+
+def check_cache_threads(names, threads, fmt, dpi, backend, out=sys.stdout):
+    """
+    Rend les scénarios en parallèle (threads) avec le cache activé : un tour
+    qui remplit le cache, un tour servi par la mémoire, un tour servi par le
+    disque (cache neuf sur le même répertoire). Chaque rapport console doit
+    être celui d'un rendu séquentiel sans cache, et sys.stdout doit être
+    rendu intact. Renvoie True si tout concorde.
+    """
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    def render(name):
+        spec = cm.TEST_SCENARIOS[name]
+        with cm.capture_console() as console:
+            try:
+                cm.render_image(getattr(cm, spec["render"]), fmt=fmt, dpi=dpi,
+                                backend=backend, **spec["params"])
+            except ValueError as e:
+                console.write(f"ValueError: {e}\n")
+        return console.getvalue()
+
+    stdout = sys.stdout
+    cm.disable_render_cache()
+    expected = {name: render(name) for name in names}
+    directory = tempfile.mkdtemp(prefix="canape-cache-")
+    wrong = []
+    try:
+        for tour in ("remplissage", "mémoire", "disque"):
+            if tour != "mémoire":
+                cm.enable_render_cache(directory=directory)
+            with ThreadPoolExecutor(max_workers=threads) as ex:
+                reports = dict(zip(names, ex.map(render, names)))
+            wrong += [(tour, name) for name in names if reports[name] != expected[name]]
+    finally:
+        cm.disable_render_cache()
+        shutil.rmtree(directory, ignore_errors=True)
+    for tour, name in wrong:
+        out.write(f"RAPPORT ERRONÉ {name} (tour {tour})\n")
+    # sys.stdout peut n'être que le relais par thread installé par capture_console
+    restored = sys.stdout is stdout or getattr(sys.stdout, "_stream", None) is stdout
+    if not restored:
+        out.write("sys.stdout n'a pas été restauré\n")
+    ok = not wrong and restored
+    out.write(f"{len(names)} scénarios × 3 tours sur {threads} threads, cache activé : "
+              f"{len(wrong)} rapport(s) erroné(s) → {'OK' if ok else 'ÉCHEC'}\n")
+    return ok
+
+
+def _random_valise_layout(rnd):
+    """(layout_*, paramètres) d'un canapé tiré au hasard, coussins en mode valise."""
+    family = rnd.choice(["LF", "LNF", "U2f", "U1F", "U"])
+    frac = rnd.random() < 0.4
+    dim = lambda a, b: round(rnd.uniform(a, b), rnd.choice([1, 2])) if frac else rnd.randint(a, b)
+    p = dict(profondeur=rnd.choice([70, 80, 90]),
+             coussins=rnd.choice(["valise", "p", "g", "valise:s"]),
+             traversins=rnd.choice([None, "g", "d", "b", "g,d", "g,b"]),
+             dossier_left=rnd.random() < 0.8, dossier_bas=rnd.random() < 0.9,
+             acc_left=rnd.random() < 0.7)
+    if family in ("LF", "LNF"):
+        p.update(tx=dim(150, 450), ty=dim(150, 450), acc_bas=rnd.random() < 0.7)
+        p["traversins"] = p["traversins"] if p["traversins"] in (None, "g", "b", "g,b") else None
+    else:
+        p.update(tx=dim(250, 700), ty_left=dim(200, 600), tz_right=dim(200, 600),
+                 dossier_right=rnd.random() < 0.8, acc_right=rnd.random() < 0.7)
+        p["traversins"] = p["traversins"] if p["traversins"] in (None, "g", "d", "g,d") else None
+        if family != "U1F":
+            p["acc_bas"] = True
+    if family in ("LNF", "U", "U1F"):
+        p["variant"] = "auto"
+    return getattr(cm, "layout_" + family), p
+
+
+def check_valise_paths(count, seed=0, alternatives=3, out=sys.stdout):
+    """
+    Équivalence des recherches valise sur `count` canapés tirés au hasard :
+    la recherche par branche (VALISE_DECOMPOSED, défaut) et le produit
+    cartésien vectorisé (_valise_product_search_np, référence) doivent élire
+    les mêmes coussins que la boucle Python sur tout le produit ; avec
+    `alternatives`, les alternatives NumPy doivent être celles de la boucle.
+    Renvoie True si tout concorde.
+    """
+    import random
+
+    if cm._import_numpy() is None:
+        out.write("NumPy absent : seule la recherche par branche est comparée à la boucle.\n")
+    paths = {
+        "branche": dict(VALISE_DECOMPOSED=True, VALISE_NUMPY=True),
+        "numpy": dict(VALISE_DECOMPOSED=False, VALISE_NUMPY=True),
+        "boucle": dict(VALISE_DECOMPOSED=False, VALISE_NUMPY=False),
+    }
+    saved = {name: getattr(cm, name) for name in ("VALISE_DECOMPOSED", "VALISE_NUMPY")}
+
+    def run(fn, params, path, k=0):
+        for name, value in paths[path].items():
+            setattr(cm, name, value)
+        lay = fn(**params, alternatives=k)
+        return repr((lay["cushions"], lay["coussins_line"], lay.get("valise_alternatives")))
+
+    rnd = random.Random(seed)
+    checked = 0
+    wrong = []
+    timings = {path: 0.0 for path in paths}
+    try:
+        while checked < count:
+            fn, params = _random_valise_layout(rnd)
+            try:
+                with cm.capture_console():
+                    results = {}
+                    for path in paths:
+                        t0 = time.perf_counter()
+                        results[path] = run(fn, params, path)
+                        timings[path] += time.perf_counter() - t0
+                    alt_np = run(fn, params, "numpy", alternatives)
+                    alt_py = run(fn, params, "boucle", alternatives)
+            except ValueError:
+                continue  # canapé invalide (ex. banquette > 250 cm)
+            checked += 1
+            for path in ("branche", "numpy"):
+                if results[path] != results["boucle"]:
+                    wrong.append((path, fn.__name__, params))
+            if alt_np != alt_py:
+                wrong.append(("alternatives", fn.__name__, params))
+    finally:
+        for name, value in saved.items():
+            setattr(cm, name, value)
+    for path, fn_name, params in wrong[:10]:
+        out.write(f"DIVERGENCE [{path}] {fn_name}({params})\n")
+    out.write("Temps moyen par layout (ms) : "
+              + ", ".join(f"{path}={t * 1000.0 / max(1, checked):.2f}" for path, t in timings.items())
+              + "\n")
+    out.write(f"{checked} canapés valise : {len(wrong)} divergence(s) avec la boucle Python "
+              f"→ {'OK' if not wrong else 'ÉCHEC'}\n")
+    return not wrong
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de mesure des scénarios TEST_* (headless).")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="mesures par scénario (défaut 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="rendus d'échauffement non mesurés")
+    parser.add_argument("--family", default=None,
+                        help="familles séparées par des virgules : S1,LF,LNF,U,U1F,U2f")
+    parser.add_argument("-k", "--filter", default=None, help="regex sur le nom du scénario")
+    parser.add_argument("--format", choices=("png", "svg", "rgba"), default="png",
+                        help="rgba : canevas Agg brut, sans encodage (aperçu)")
+    parser.add_argument("--backend", choices=("matplotlib", "matplotlib_world", "svg"),
+                        default="matplotlib")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--save", metavar="JSON", help="enregistre les résultats (référence)")
+    parser.add_argument("--compare", metavar="JSON", help="compare à une référence enregistrée")
+    parser.add_argument("--threshold", type=float, default=1.15,
+                        help="ratio médian au-delà duquel une métrique régresse (défaut 1.15)")
+    parser.add_argument("--soak", type=int, metavar="N", help="rend N devis à la suite et vérifie la RSS")
+    parser.add_argument("--soak-mode", choices=("headless", "pyplot"), default="headless")
+    parser.add_argument("--thumbnail", action="store_true",
+                        help="mesure render_thumbnail (vignette) au lieu de render_image")
+    parser.add_argument("--min-speedup", type=float, default=None,
+                        help="avec --thumbnail : gain minimal exigé sur le rendu complet")
+    parser.add_argument("--max-growth-mb", type=float, default=50.0,
+                        help="croissance RSS tolérée après échauffement (défaut 50 Mo)")
+    parser.add_argument("--cache-threads", type=int, metavar="N",
+                        help="rend les scénarios sur N threads, cache activé, et vérifie les rapports")
+    parser.add_argument("--valise-check", type=int, metavar="N",
+                        help="compare les recherches valise à la boucle Python sur N canapés tirés au hasard")
+    parser.add_argument("--seed", type=int, default=0, help="graine du tirage de --valise-check")
+    args = parser.parse_args(argv)
+    if args.backend == "svg":
+        args.format = "svg"
+    if args.repeat < 1:
+        parser.error("--repeat doit être >= 1")
+
+    if args.valise_check:
+        return 0 if check_valise_paths(args.valise_check, args.seed) else 1
+
+    if args.soak:
+        cm.disable_render_cache()
+        ok = soak(args.soak, args.soak_mode, args.format, args.dpi, args.backend,
+                  args.max_growth_mb)
+        return 0 if ok else 1
+
+    families = set(args.family.split(",")) if args.family else None
+    names = select_scenarios(families, args.filter)
+    if not names:
+        parser.error("aucun scénario sélectionné")
+
+    if args.cache_threads:
+        ok = check_cache_threads(names, args.cache_threads, args.format, args.dpi, args.backend)
+        return 0 if ok else 1
+
+    cm.disable_render_cache()
+    results = {}
+    for name in names:
+        results[name] = run_scenario(name, args.repeat, args.warmup,
+                                     args.format, args.dpi, args.backend, args.thumbnail)
+    print_results(results)
+    slow = []
+    if args.thumbnail and args.min_speedup:
+        full = {name: run_scenario(name, args.repeat, args.warmup,
+                                   args.format, args.dpi, args.backend)
+                for name in names}
+        slow = check_speedup(results, full, args.min_speedup)
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "code": cm._render_code_digest(),
+            "repeat": args.repeat,
+            "format": args.format,
+            "backend": args.backend,
+            "dpi": args.dpi,
+            "thumbnail": args.thumbnail,
+        },
+        "scenarios": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -95,27 +95,247 @@ def _compute_dossiers_count(polys):
 #   - Légende affiche la couleur choisie ("Dossier (gris clair)", etc.)
 #   - Correctifs nommage 'coussins_count' -> 'cushions_count'
 
+import contextlib
+import functools
+import heapq
+import html
+import io
+import itertools
 import math
+import threading
+import time
 import unicodedata
 
-import matplotlib.pyplot as plt
-from matplotlib.patches import Polygon
 import types
 
+# NB : Matplotlib n'est importé qu'à la création d'un écran (_Screen) ; la
+# géométrie (compute_points_*, build_polys_*) et les optimiseurs se chargent
+# donc sans payer le démarrage de Matplotlib (et de son cache de polices).
+
 # =========================
 # Adapteur "turtle" -> Matplotlib
 # =========================
 
-_current_screen = None
+# Options de rendu par défaut. En mode "headless" (cf. render_image), la figure
+# est créée hors pyplot sur le canevas Agg et turtle.done() renvoie l'image
+# encodée (octets PNG/SVG) au lieu d'appeler plt.show().
+# "backend" choisit l'écran : "matplotlib" (_Screen), "svg" (_SvgScreen),
+# "reportlab" (_RLScreen, dessin vectoriel pour les devis PDF) ou "pillow"
+# (_PilScreen, vignettes, cf. render_thumbnail) ; "display"
+# renvoie la liste d'affichage elle-même, sans rien tracer (cf. DisplayList).
+# Niveau de détail des arrondis, en pixels de l'image (dpi/100 pixel par unité
+# de l'écran turtle) :
+#   "arc_tolerance_px" : None = arcs à pas fixe (5° par segment, comme turtle) ;
+#                        sinon écart maximal arc/corde, le nombre de segments
+#                        suit le rayon à l'écran (cf. _arc_steps) ;
+#   "min_round_px"     : les coins arrondis de rayon inférieur sont tracés
+#                        droits (vignettes, rendus par lots).
+_DEFAULT_RENDER_OPTIONS = {"headless": False, "fmt": "png", "dpi": 100, "backend": "matplotlib",
+                           "arc_tolerance_px": None, "min_round_px": 0.0}
+
+
+class RenderContext:
+    """
+    État d'un rendu en cours : écran, tortue, palette, transformation cm → px
+    et options. Un contexte par thread (cf. _context) : plusieurs devis peuvent
+    être rendus en parallèle dans un même processus (ThreadPoolExecutor).
+    """
+
+    def __init__(self, **options):
+        self.options = {**_DEFAULT_RENDER_OPTIONS, **options}
+        self.screen = None
+        self.turtle = None
+        self.transform = None
+        # liste d'affichage en cours d'enregistrement (cf. _SceneScreen)
+        self.display = None
+        # écran du dernier rendu terminé (cf. _done) : RenderHandle le garde
+        # pour recolorer sans refaire la géométrie
+        self.last_screen = None
+        # palette résolue par _resolve_and_apply_colors (clés = celles de `couleurs`)
+        self.palette = {
+            "accoudoirs": COLOR_ACC,
+            "dossiers":   COLOR_DOSSIER,
+            "assise":     COLOR_ASSISE,
+            "coussins":   COLOR_CUSHION,
+        }
+
+
+_local = threading.local()
+
+
+def _context():
+    """Contexte de rendu du thread courant (créé à la demande)."""
+    ctx = getattr(_local, "ctx", None)
+    if ctx is None:
+        ctx = _local.ctx = RenderContext()
+    return ctx
+
+
+class _ThreadStdout:
+    """
+    sys.stdout installé une fois par capture_console() : une écriture va au
+    tampon de capture du thread courant s'il en a un, sinon au flux d'origine.
+    (contextlib.redirect_stdout remplace sys.stdout pour tout le processus :
+    des rendus parallèles captureraient les rapports les uns des autres.)
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def _target(self):
+        stack = getattr(_local, "consoles", None)
+        return stack[-1] if stack else self._stream
+
+    def write(self, s):
+        return self._target().write(s)
+
+    def writelines(self, lines):
+        return self._target().writelines(lines)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def capture_console(console=None):
+    """
+    Capture le rapport console (print des render_*) du thread courant
+    seulement, dans `console` (un io.StringIO par défaut), renvoyé par le with.
+    Les autres threads continuent d'écrire sur sys.stdout.
+
+    Exemple :
+        with capture_console() as console:
+            render_image(render_U, tx=450, ty_left=250, tz_right=250)
+        rapport = console.getvalue()
+    """
+    import sys
+
+    if console is None:
+        console = io.StringIO()
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadStdout):
+            sys.stdout = _ThreadStdout(sys.stdout)
+    stack = getattr(_local, "consoles", None)
+    if stack is None:
+        stack = _local.consoles = []
+    stack.append(console)
+    try:
+        yield console
+    finally:
+        stack.pop()
+
+
+# Quart de cercle en Bézier cubique : distance des points de contrôle, en
+# fraction du rayon (erreur radiale < 0,03 %).
+_BEZIER_QUARTER = 4.0 * (math.sqrt(2.0) - 1.0) / 3.0
+
+
+def _rounded_box(x0, y0, x1, y1, r):
+    """
+    Boîte à coins arrondis normalisée, dans le repère de l'écran :
+    {"rect": (x0, y0, x1, y1), "r": r} avec x0 <= x1, y0 <= y1 et r borné à
+    la demi-largeur / demi-hauteur. Les écrans la tracent nativement (chemin
+    de Bézier, <rect rx>, Rect(rx, ry)) au lieu d'arcs polygonaux.
+    """
+    if x0 > x1: x0, x1 = x1, x0
+    if y0 > y1: y0, y1 = y1, y0
+    r = max(0.0, min(float(r), (x1 - x0) / 2.0, (y1 - y0) / 2.0))
+    return {"rect": (x0, y0, x1, y1), "r": r}
+
+
+def _arc_steps(radius_px, extent, tolerance_px):
+    """
+    Nombre de segments d'un arc de `extent` degrés et de rayon radius_px
+    (pixels de l'image) pour que la flèche de chaque corde,
+    r·(1 − cos(θ/2)), reste sous tolerance_px.
+    """
+    r = abs(radius_px)
+    if r <= tolerance_px:
+        return 1
+    theta = 2.0 * math.acos(1.0 - tolerance_px / r)
+    return max(1, math.ceil(math.radians(abs(extent)) / theta))
+
+
+def _visible_radius(r, px_per_unit=1.0):
+    """
+    Rayon d'arrondi r (unités de l'écran, px_per_unit pixels écran par unité),
+    ou 0 s'il fait moins de min_round_px pixels dans l'image (cf. options).
+    """
+    options = _context().options
+    if r * px_per_unit * options["dpi"] / 100.0 < options["min_round_px"]:
+        return 0.0
+    return r
+
+
+def _add_square_box(screen, box, facecolor, edgecolor, linewidth, role=None):
+    """Boîte de rayon nul : surface polygonale et 4 segments, comme draw_polygon_cm."""
+    x0, y0, x1, y1 = box["rect"]
+    pts = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    if facecolor:
+        screen.add_fill(pts, facecolor, edgecolor, linewidth, role)
+    segs = screen.segments.setdefault((edgecolor, float(linewidth)), [])
+    segs.extend(zip(pts, pts[1:] + pts[:1]))
+
+
+def _rounded_box_path(box):
+    """Chemin Matplotlib d'une boîte arrondie : 4 côtés et 4 quarts de cercle (Bézier)."""
+    from matplotlib.path import Path
+    (x0, y0, x1, y1), r = box["rect"], box["r"]
+    k = r * _BEZIER_QUARTER
+    verts = [
+        (x0 + r, y0), (x1 - r, y0),
+        (x1 - r + k, y0), (x1, y0 + r - k), (x1, y0 + r),
+        (x1, y1 - r),
+        (x1, y1 - r + k), (x1 - r + k, y1), (x1 - r, y1),
+        (x0 + r, y1),
+        (x0 + r - k, y1), (x0, y1 - r + k), (x0, y1 - r),
+        (x0, y0 + r),
+        (x0, y0 + r - k), (x0 + r - k, y0), (x0 + r, y0),
+        (x0 + r, y0),
+    ]
+    codes = [Path.MOVETO] + ([Path.LINETO] + [Path.CURVE4] * 3) * 4 + [Path.CLOSEPOLY]
+    return Path(verts, codes)
+
 
 class _Screen:
-    def __init__(self):
-        global _current_screen
-        self.fig, self.ax = plt.subplots()
+    def __init__(self, deferred_fill=None):
+        ctx = _context()
+        self.options = ctx.options
+        if self.options["headless"]:
+            # hors pyplot : ni registre de figures ni backend interactif
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            self.fig = Figure()
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_subplot()
+        else:
+            import matplotlib.pyplot as plt
+            self.fig, self.ax = plt.subplots()
         self.ax.set_aspect('equal', adjustable='box')
         self.width = None
         self.height = None
-        _current_screen = self
+        # Segments tracés au stylo, regroupés par style (couleur, épaisseur) :
+        # un seul LineCollection par style est ajouté à la finalisation.
+        self.segments = {}
+        # Mode remplissage différé : les surfaces (begin_fill/end_fill) sont
+        # collectées puis émises en un seul PathCollection, dans l'ordre de tracé.
+        self.deferred_fill = DEFERRED_FILL if deferred_fill is None else bool(deferred_fill)
+        self.fills = []
+        # rôle de chaque surface (clé de palette : "assise", "coussins", ...),
+        # parallèle à self.fills ; fill_artists = [(artiste, rôles)] une fois
+        # ajoutés aux axes, pour recolor()
+        self.fill_roles = []
+        self.fill_artists = []
+        # contours des boîtes arrondies (chemin, couleur, épaisseur), tracés
+        # au-dessus des surfaces comme les segments
+        self.outlines = []
+        ctx.screen = self
 
     def setup(self, width, height):
         """Approxime turtle.Screen().setup(width,height)."""
@@ -143,14 +363,677 @@ class _Screen:
         # Avec Matplotlib on ne s'en sert pas : méthode factice pour compatibilité.
         pass
 
+    def flush(self):
+        """
+        Ajoute aux axes les surfaces différées (un PathCollection : polygones
+        et boîtes arrondies, dans l'ordre de tracé), les segments accumulés
+        (un LineCollection par style) puis les contours des boîtes arrondies.
+        """
+        from matplotlib.collections import LineCollection, PathCollection
+        from matplotlib.path import Path
+        if self.fills:
+            paths, faces, edges, widths = zip(*self.fills)
+            # polygones fermés comme le ferait PolyCollection(closed=True)
+            paths = [p if isinstance(p, Path) else Path(list(p) + [p[0]], closed=True)
+                     for p in paths]
+            coll = PathCollection(paths, facecolors=faces,
+                                  edgecolors=edges, linewidths=widths,
+                                  joinstyle="miter", zorder=1)
+            self.ax.add_collection(coll, autolim=False)
+            self.fill_artists.append((coll, self.fill_roles))
+            self.fills = []
+            self.fill_roles = []
+        for (color, width), segs in self.segments.items():
+            self.ax.add_collection(
+                LineCollection(segs, colors=color, linewidths=width,
+                               capstyle="projecting", zorder=2),
+                autolim=False,
+            )
+        self.segments = {}
+        if self.outlines:
+            paths, edges, widths = zip(*self.outlines)
+            self.ax.add_collection(
+                PathCollection(paths, facecolors="none", edgecolors=edges,
+                               linewidths=widths, zorder=2),
+                autolim=False,
+            )
+            self.outlines = []
+
+    def add_fill(self, path, facecolor, edgecolor, linewidth, role=None):
+        """path : liste de points (polygone) ou matplotlib.path.Path."""
+        if self.deferred_fill:
+            self.fills.append((path, facecolor, edgecolor, linewidth))
+            self.fill_roles.append(role)
+            return
+        from matplotlib.patches import PathPatch, Polygon
+        from matplotlib.path import Path
+        style = {"facecolor": facecolor, "edgecolor": edgecolor, "linewidth": linewidth}
+        if isinstance(path, Path):
+            patch = self.ax.add_patch(PathPatch(path, **style))
+        else:
+            patch = self.ax.add_patch(Polygon(path, closed=True, **style))
+        self.fill_artists.append((patch, [role]))
+
+    def add_rounded_rect(self, box, facecolor, edgecolor, linewidth, role=None):
+        """
+        Boîte arrondie (cf. _rounded_box) en un seul chemin de Bézier : surface
+        parmi les autres surfaces (si facecolor), contour avec les traits.
+        """
+        if not box["r"]:
+            return _add_square_box(self, box, facecolor, edgecolor, linewidth, role)
+        path = _rounded_box_path(box)
+        if facecolor:
+            self.add_fill(path, facecolor, edgecolor, linewidth, role)
+        self.outlines.append((path, edgecolor, float(linewidth)))
+
+    def add_text(self, x, y, text, align="left", font=None):
+        ha = {"left": "left", "center": "center", "right": "right"}.get(align, "left")
+        kwargs = {"ha": ha, "va": "center"}
+        if font is not None:
+            # tuple de type ("Arial", 12, "bold")
+            if len(font) > 0:
+                kwargs["fontfamily"] = font[0]
+            if len(font) > 1:
+                kwargs["fontsize"] = font[1]
+            if len(font) > 2:
+                style = font[2]
+                if style in ("bold", "normal"):
+                    kwargs["fontweight"] = style
+                else:
+                    kwargs["fontstyle"] = style
+        self.ax.text(x, y, str(text), **kwargs)
+
+    def finish(self):
+        """
+        Finalise la figure : affichage (plt.show) en mode interactif, sinon
+        renvoie l'image encodée au format demandé.
+        """
+        self.flush()
+        self.ax.set_aspect("equal", adjustable="box")
+        if not self.options["headless"]:
+            import matplotlib.pyplot as plt
+            plt.show()
+            # La figure appartient au rendu : une fois affichée (plt.show bloque
+            # jusqu'à la fermeture de la fenêtre, ou ne fait rien sous Agg), on
+            # la retire du registre pyplot, sinon un processus qui enchaîne les
+            # devis garde toutes ses figures. En mode interactif (plt.ion), la
+            # fenêtre reste à l'utilisateur.
+            if not plt.isinteractive():
+                plt.close(self.fig)
+            return None
+        return self.encode()
+
+    def encode(self):
+        if self.options["fmt"] == "rgba":
+            # tableau NumPy (hauteur, largeur, 4) uint8 sur la mémoire du
+            # canevas Agg : ni copie ni encodage PNG (aperçu st.image, Pillow)
+            import numpy as np
+            self.fig.set_dpi(self.options["dpi"])
+            self.fig.canvas.draw()
+            return np.asarray(self.fig.canvas.buffer_rgba())
+        buf = io.BytesIO()
+        self.fig.savefig(buf, format=self.options["fmt"], dpi=self.options["dpi"])
+        return buf.getvalue()
+
+    def recolor(self, palette):
+        """
+        Remplace la couleur de fond des surfaces dont le rôle figure dans
+        palette (figure déjà finalisée), puis ré-encode l'image.
+        """
+        from matplotlib.collections import Collection
+        from matplotlib.colors import to_rgba
+        for artist, roles in self.fill_artists:
+            if isinstance(artist, Collection):
+                faces = artist.get_facecolors().copy()
+                for i, role in enumerate(roles):
+                    if role in palette:
+                        faces[i] = to_rgba(palette[role])
+                artist.set_facecolors(faces)
+            elif roles[0] in palette:
+                artist.set_facecolor(palette[roles[0]])
+        return self.encode()
+
+
+class _WorldScreen(_Screen):
+    """
+    Variante de _Screen qui trace la DisplayList directement en cm : les
+    limites des axes sont celles de la scène en cm et c'est la transformation
+    des axes (Matplotlib, en C) qui passe en pixels. Ni tortue ni
+    WorldToScreen.pt par point ; l'image ne dépend plus que de dpi.
+    Mêmes regroupements que _Screen : surfaces (PathCollection), traits par
+    style (LineCollection, en polylignes), contours arrondis, textes.
+    """
+
+    def paint(self, display):
+        tr = display.transform or {"scale": 1.0, "left_px": 0.0, "bottom_px": 0.0}
+        scale, left, bottom = tr["scale"], tr["left_px"], tr["bottom_px"]
+        self._to_cm = lambda x, y: ((x - left) / scale, (y - bottom) / scale)
+        self._scale = scale
+        if self.width is not None:
+            # même cadrage que setup() (origine au centre), exprimé en cm
+            (x0, y0), (x1, y1) = (self._to_cm(-self.width / 2.0, -self.height / 2.0),
+                                  self._to_cm(self.width / 2.0, self.height / 2.0))
+            self.ax.set_xlim(x0, x1)
+            self.ax.set_ylim(y0, y1)
+        painters = {
+            "polygon": self._paint_polygon,
+            "rounded_rect": self._paint_rounded_rect,
+            "arrow": self._paint_arrow,
+            "text": self._paint_text,
+            "rect": self._paint_rect,
+        }
+        for item in display.items:
+            painters[item["kind"]](item)
+
+    def _outline(self, path, fill, outline, width, role=None):
+        if fill and len(path) >= 3:
+            self.add_fill(path, fill, outline, float(width), role)
+        self.segments.setdefault((outline, float(width)), []).append(path)
+
+    def _paint_polygon(self, item):
+        pts = [tuple(p) for p in item["pts"]]
+        self._outline(pts + [pts[0]], item["fill"], item["outline"], item["width"], item["role"])
+
+    def _paint_rounded_rect(self, item):
+        box = _rounded_box(*item["rect"], item["r"])
+        box["r"] = _visible_radius(box["r"], self._scale)
+        self.add_rounded_rect(box, item["fill"], item["outline"], float(item["width"]),
+                              item["role"])
+
+    def _paint_arrow(self, item):
+        s, (x0, y0), (x1, y1) = self._scale, item["p1"], item["p2"]
+        # géométrie en px autour de l'origine (têtes et décalages du texte en px)
+        segs, (tx, ty) = _double_arrow_geometry((0.0, 0.0), ((x1 - x0) * s, (y1 - y0) * s),
+                                                item["perp_px"], item["tang_px"])
+        to_cm = lambda p: (x0 + p[0] / s, y0 + p[1] / s)
+        style = self.segments.setdefault(("black", 1.5), [])
+        style.extend([to_cm(a), to_cm(b)] for a, b in segs)
+        if item["text"]:
+            self.add_text(*to_cm((tx, ty)), item["text"], align="center", font=FONT_DIM)
+
+    def _paint_text(self, item):
+        x, y = item["at"] if "at" in item else self._to_cm(*item["at_px"])
+        self.add_text(x, y, item["text"], align=item["align"], font=item["font"])
+
+    def _paint_rect(self, item):
+        (x0, y0), (x1, y1) = (self._to_cm(item["x"], item["y"]),
+                              self._to_cm(item["x"] + item["w"], item["y"] + item["h"]))
+        path = [(x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0)]
+        self._outline(path, item["fill"], item["outline"], item["width"])
+
+
+# =========================
+# Backend SVG natif (sans Matplotlib)
+# =========================
+
+def _svg_num(v):
+    """Nombre compact pour les attributs SVG (2 décimales, sans zéros inutiles)."""
+    s = f"{v:.2f}".rstrip("0").rstrip(".")
+    return "0" if s == "-0" else s
+
+
+class _SvgScreen:
+    """
+    Écran de même interface que _Screen, qui produit directement un document
+    SVG sous forme de chaîne. Repère turtle (origine au centre, y vers le haut)
+    converti en repère SVG (y vers le bas) à l'émission.
+    Ordre d'empilement identique à Matplotlib : surfaces, traits, textes.
+    """
+
+    def __init__(self):
+        self.width = float(WIN_W)
+        self.height = float(WIN_H)
+        self.title_text = None
+        self.segments = {}
+        self.fills = []
+        self.fill_roles = []
+        # contours des boîtes arrondies, émis après les traits
+        self.outlines = []
+        self.texts = []
+        _context().screen = self
+
+    def setup(self, width, height):
+        self.width, self.height = float(width), float(height)
+
+    def title(self, text):
+        self.title_text = str(text)
+
+    def tracer(self, flag):
+        pass
+
+    def add_fill(self, path, facecolor, edgecolor, linewidth, role=None):
+        self.fills.append((path, facecolor, edgecolor, linewidth))
+        self.fill_roles.append(role)
+
+    def add_rounded_rect(self, box, facecolor, edgecolor, linewidth, role=None):
+        """Boîte arrondie (cf. _rounded_box) émise en <rect rx ry>."""
+        if not box["r"]:
+            return _add_square_box(self, box, facecolor, edgecolor, linewidth, role)
+        if facecolor:
+            self.add_fill(box, facecolor, edgecolor, linewidth, role)
+        self.outlines.append((box, edgecolor, linewidth))
+
+    @staticmethod
+    def _svg_rect(box):
+        (x0, y0, x1, y1), r = box["rect"], box["r"]
+        return (f'<rect x="{_svg_num(x0)}" y="{_svg_num(-y1)}" '
+                f'width="{_svg_num(x1 - x0)}" height="{_svg_num(y1 - y0)}" '
+                f'rx="{_svg_num(r)}" ry="{_svg_num(r)}"')
+
+    def add_text(self, x, y, text, align="left", font=None):
+        self.texts.append((x, y, str(text), align, font))
+
+    def recolor(self, palette):
+        """Change le fond des surfaces dont le rôle figure dans palette et ré-émet le SVG."""
+        self.fills = [
+            (path, palette[role] if role in palette else face, edge, lw)
+            for (path, face, edge, lw), role in zip(self.fills, self.fill_roles)
+        ]
+        return self.finish()
+
+    def to_svg(self):
+        w, h = self.width, self.height
+        out = [
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{_svg_num(w)}" height="{_svg_num(h)}" '
+            f'viewBox="{_svg_num(-w / 2.0)} {_svg_num(-h / 2.0)} {_svg_num(w)} {_svg_num(h)}">'
+        ]
+        if self.title_text:
+            out.append(f"<title>{html.escape(self.title_text, quote=False)}</title>")
+        out.append(f'<rect x="{_svg_num(-w / 2.0)}" y="{_svg_num(-h / 2.0)}" '
+                   f'width="{_svg_num(w)}" height="{_svg_num(h)}" fill="white"/>')
+
+        for path, face, edge, lw in self.fills:
+            if isinstance(path, dict):
+                out.append(f'{self._svg_rect(path)} fill="{face}" stroke="{edge}" '
+                           f'stroke-width="{_svg_num(lw)}"/>')
+                continue
+            d = "M" + " L".join(f"{_svg_num(x)} {_svg_num(-y)}" for x, y in path) + " Z"
+            out.append(f'<path d="{d}" fill="{face}" stroke="{edge}" '
+                       f'stroke-width="{_svg_num(lw)}" stroke-linejoin="miter"/>')
+
+        # un seul <path> par style de trait
+        for (color, lw), segs in self.segments.items():
+            d = " ".join(
+                f"M{_svg_num(x0)} {_svg_num(-y0)} L{_svg_num(x1)} {_svg_num(-y1)}"
+                for (x0, y0), (x1, y1) in segs
+            )
+            out.append(f'<path d="{d}" fill="none" stroke="{color}" '
+                       f'stroke-width="{_svg_num(lw)}" stroke-linecap="square"/>')
+
+        for box, edge, lw in self.outlines:
+            out.append(f'{self._svg_rect(box)} fill="none" stroke="{edge}" '
+                       f'stroke-width="{_svg_num(lw)}"/>')
+
+        for x, y, text, align, font in self.texts:
+            anchor = {"left": "start", "center": "middle", "right": "end"}.get(align, "start")
+            attrs = [f'x="{_svg_num(x)}"', f'y="{_svg_num(-y)}"',
+                     f'text-anchor="{anchor}"', 'dominant-baseline="central"']
+            family, size, style = (tuple(font or ()) + (None, None, None))[:3]
+            attrs.append(f'font-family="{html.escape(family or "sans-serif")}, sans-serif"')
+            # tailles de police turtle en points
+            attrs.append(f'font-size="{_svg_num(size or 10)}pt"')
+            if style == "bold":
+                attrs.append('font-weight="bold"')
+            elif style and style != "normal":
+                attrs.append(f'font-style="{html.escape(style)}"')
+            out.append(f"<text {' '.join(attrs)}>{html.escape(text, quote=False)}</text>")
+
+        out.append("</svg>")
+        return "\n".join(out)
+
+    def finish(self):
+        """Renvoie le document SVG encodé en UTF-8."""
+        return self.to_svg().encode("utf-8")
+
+
+# =========================
+# Backend ReportLab (dessin vectoriel pour les PDF)
+# =========================
+
+# Polices turtle -> polices standard PDF (Arial n'est pas embarquée par ReportLab)
+_RL_FONTS = {
+    "normal": "Helvetica",
+    "bold": "Helvetica-Bold",
+    "italic": "Helvetica-Oblique",
+}
+
+
+class _RLScreen:
+    """
+    Écran de même interface que _Screen, qui dessine dans un
+    reportlab.graphics.shapes.Drawing : le schéma reste vectoriel et
+    s'insère tel quel comme Flowable dans un document platypus.
+    Origine turtle (centre) décalée vers l'origine ReportLab (bas-gauche) ;
+    l'axe y est déjà orienté vers le haut dans les deux repères.
+    """
+
+    def __init__(self):
+        from reportlab.graphics import shapes
+        from reportlab.lib import colors
+        self._shapes = shapes
+        self._colors = colors
+        self.width = float(WIN_W)
+        self.height = float(WIN_H)
+        self.title_text = None
+        self.segments = {}
+        self.fills = []
+        self.outlines = []
+        self.texts = []
+        _context().screen = self
+
+    def setup(self, width, height):
+        self.width, self.height = float(width), float(height)
+
+    def title(self, text):
+        self.title_text = str(text)
+
+    def tracer(self, flag):
+        pass
+
+    def add_fill(self, path, facecolor, edgecolor, linewidth, role=None):
+        self.fills.append((path, facecolor, edgecolor, linewidth))
+
+    def add_rounded_rect(self, box, facecolor, edgecolor, linewidth, role=None):
+        """Boîte arrondie (cf. _rounded_box) tracée en Rect(rx, ry)."""
+        if not box["r"]:
+            return _add_square_box(self, box, facecolor, edgecolor, linewidth, role)
+        if facecolor:
+            self.add_fill(box, facecolor, edgecolor, linewidth, role)
+        self.outlines.append((box, edgecolor, linewidth))
+
+    def _rl_rect(self, box, **style):
+        (x0, y0, x1, y1), r = box["rect"], box["r"]
+        ox, oy = self.width / 2.0, self.height / 2.0
+        return self._shapes.Rect(ox + x0, oy + y0, x1 - x0, y1 - y0, rx=r, ry=r, **style)
+
+    def add_text(self, x, y, text, align="left", font=None):
+        self.texts.append((x, y, str(text), align, font))
+
+    def to_drawing(self):
+        shapes, to_color = self._shapes, self._colors.toColor
+        ox, oy = self.width / 2.0, self.height / 2.0
+        d = shapes.Drawing(self.width, self.height)
+
+        for path, face, edge, lw in self.fills:
+            if isinstance(path, dict):
+                d.add(self._rl_rect(path, fillColor=to_color(face),
+                                    strokeColor=to_color(edge), strokeWidth=lw))
+                continue
+            points = []
+            for x, y in path:
+                points += [ox + x, oy + y]
+            d.add(shapes.Polygon(points, fillColor=to_color(face),
+                                 strokeColor=to_color(edge), strokeWidth=lw,
+                                 strokeLineJoin=0))
+
+        # un seul Path par style de trait ; strokeLineCap=2 : extrémités carrées
+        for (color, lw), segs in self.segments.items():
+            p = shapes.Path(fillColor=None, strokeColor=to_color(color),
+                            strokeWidth=lw, strokeLineCap=2)
+            for (x0, y0), (x1, y1) in segs:
+                p.moveTo(ox + x0, oy + y0)
+                p.lineTo(ox + x1, oy + y1)
+            d.add(p)
+
+        for box, edge, lw in self.outlines:
+            d.add(self._rl_rect(box, fillColor=None, strokeColor=to_color(edge),
+                                strokeWidth=lw))
+
+        for x, y, text, align, font in self.texts:
+            anchor = {"left": "start", "center": "middle", "right": "end"}.get(align, "start")
+            _family, size, style = (tuple(font or ()) + (None, None, None))[:3]
+            size = float(size or 10)
+            # String est posé sur sa ligne de base : on recentre verticalement
+            d.add(shapes.String(ox + x, oy + y - 0.35 * size, text,
+                                fontName=_RL_FONTS.get(style, "Helvetica"),
+                                fontSize=size, textAnchor=anchor,
+                                fillColor=self._colors.black))
+        return d
+
+    def finish(self):
+        """Renvoie le reportlab Drawing (Flowable) du schéma."""
+        return self.to_drawing()
+
+
+# =========================
+# Backend Pillow (vignettes)
+# =========================
+
+# Facteur de suréchantillonnage : tracé à 2× puis réduction (anticrénelage)
+_PIL_SUPERSAMPLE = 2
+
+
+def _pil_color(color):
+    """Couleur PIL (r, g, b) ; repli sur Matplotlib pour les notations qu'ImageColor ignore."""
+    from PIL import ImageColor
+    try:
+        return ImageColor.getrgb(color)
+    except (ValueError, AttributeError):
+        from matplotlib.colors import to_hex
+        return ImageColor.getrgb(to_hex(color))
+
+
+class _PilScreen:
+    """
+    Écran de même interface que _Screen, qui dessine avec PIL.ImageDraw :
+    ni figure ni axes Matplotlib à créer, ce qui en fait l'écran des
+    vignettes (cf. render_thumbnail). Image de width × dpi/100 pixels, comme
+    _Screen ; épaisseurs en points (dpi/72 pixel par point).
+    Ordre d'empilement identique à Matplotlib : surfaces, traits, textes.
+    """
+
+    def __init__(self):
+        self.options = _context().options
+        self.width = float(WIN_W)
+        self.height = float(WIN_H)
+        self.title_text = None
+        self.segments = {}
+        self.fills = []
+        self.outlines = []
+        self.texts = []
+        _context().screen = self
+
+    def setup(self, width, height):
+        self.width, self.height = float(width), float(height)
+
+    def title(self, text):
+        self.title_text = str(text)
+
+    def tracer(self, flag):
+        pass
+
+    def add_fill(self, path, facecolor, edgecolor, linewidth, role=None):
+        self.fills.append((path, facecolor, edgecolor, linewidth))
+
+    def add_rounded_rect(self, box, facecolor, edgecolor, linewidth, role=None):
+        """Boîte arrondie (cf. _rounded_box) tracée en ImageDraw.rounded_rectangle."""
+        if not box["r"]:
+            return _add_square_box(self, box, facecolor, edgecolor, linewidth, role)
+        if facecolor:
+            self.add_fill(box, facecolor, edgecolor, linewidth, role)
+        self.outlines.append((box, edgecolor, linewidth))
+
+    def add_text(self, x, y, text, align="left", font=None):
+        self.texts.append((x, y, str(text), align, font))
+
+    def to_image(self):
+        from PIL import Image, ImageDraw, ImageFont
+        ss = _PIL_SUPERSAMPLE
+        dpi = self.options["dpi"]
+        k = dpi / 100.0 * ss  # pixels (suréchantillonnés) par unité de l'écran
+        size = (max(1, round(self.width * dpi / 100.0)), max(1, round(self.height * dpi / 100.0)))
+        img = Image.new("RGB", (size[0] * ss, size[1] * ss), "white")
+        draw = ImageDraw.Draw(img)
+        half_w, half_h = self.width / 2.0, self.height / 2.0
+        to_px = lambda x, y: ((x + half_w) * k, (half_h - y) * k)
+        px_width = lambda lw: max(1, round(lw * dpi / 72.0 * ss))
+
+        def box_xy(box):
+            (x0, y0), (x1, y1) = to_px(*box["rect"][:2]), to_px(*box["rect"][2:])
+            return (x0, y1, x1, y0), box["r"] * k
+
+        for path, face, edge, lw in self.fills:
+            if isinstance(path, dict):
+                xy, r = box_xy(path)
+                draw.rounded_rectangle(xy, r, fill=_pil_color(face))
+            else:
+                draw.polygon([to_px(x, y) for x, y in path], fill=_pil_color(face))
+
+        for (color, lw), segs in self.segments.items():
+            rgb, w = _pil_color(color), px_width(lw)
+            for a, b in segs:
+                draw.line([to_px(*a), to_px(*b)], fill=rgb, width=w)
+
+        for box, edge, lw in self.outlines:
+            xy, r = box_xy(box)
+            draw.rounded_rectangle(xy, r, outline=_pil_color(edge), width=px_width(lw))
+
+        for x, y, text, align, font in self.texts:
+            anchor = {"left": "lm", "center": "mm", "right": "rm"}.get(align, "lm")
+            size_pt = float((tuple(font or ()) + (None, None))[1] or 10)
+            face = ImageFont.load_default(size_pt * dpi / 72.0 * ss)
+            draw.text(to_px(x, y), text, fill=(0, 0, 0), font=face, anchor=anchor)
+        if self.title_text:
+            face = ImageFont.load_default(12.0 * dpi / 72.0 * ss)
+            draw.text((img.width / 2.0, 0.02 * img.height), self.title_text,
+                      fill=(0, 0, 0), font=face, anchor="mt")
+        return img.reduce(ss) if ss > 1 else img
+
+    def finish(self):
+        """PNG (octets) ou, avec fmt="rgba", tableau NumPy (hauteur, largeur, 4)."""
+        img = self.to_image()
+        if self.options["fmt"] == "rgba":
+            import numpy as np
+            return np.asarray(img.convert("RGBA"))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        return buf.getvalue()
+
+
+_SCREEN_BACKENDS = {
+    "matplotlib": _Screen,
+    "matplotlib_world": _WorldScreen,
+    "svg": _SvgScreen,
+    "reportlab": _RLScreen,
+    "pillow": _PilScreen,
+}
+
+
+# =========================
+# Liste d'affichage (display list)
+# =========================
+
+class DisplayList:
+    """
+    Scène d'un rendu : primitives typées en coordonnées monde (cm), émises par
+    les outils de dessin (draw_polygon_cm, label_poly, ...) puis rejouées sur
+    l'écran d'un backend (cf. _paint_display_list). La même liste peut être
+    mise en cache, sérialisée (to_json/from_json), comparée (diff) et tracée
+    par Matplotlib, SVG ou ReportLab sans recalculer le layout.
+
+    Primitives : dict {"kind": ..., champs} —
+      polygon       pts, fill, outline, width, role
+      rounded_rect  rect (x0, y0, x1, y1), r, fill, outline, width, role
+      arrow         p1, p2, text, perp_px, tang_px (décalages du texte en px)
+      text          at (cm) ou at_px (px, titre), text, align, font
+      rect          x, y, w, h en px, fill, outline, width (fond de légende)
+    """
+
+    def __init__(self, width=None, height=None, title=None, transform=None, items=None):
+        self.width = width
+        self.height = height
+        self.title = title
+        # paramètres de WorldToScreen (scale, left_px, bottom_px)
+        self.transform = transform
+        self.items = list(items or [])
+
+    def add(self, kind, **fields):
+        self.items.append({"kind": kind, **fields})
+
+    def to_dict(self):
+        return _cache_normalize({
+            "width": self.width,
+            "height": self.height,
+            "title": self.title,
+            "transform": self.transform,
+            "items": self.items,
+        })
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("width"), data.get("height"), data.get("title"),
+                   data.get("transform"), data.get("items"))
+
+    def to_json(self):
+        import json
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        import json
+        return cls.from_dict(json.loads(text))
+
+    def __eq__(self, other):
+        if not isinstance(other, DisplayList):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def diff(self, other):
+        """
+        Différences avec une autre liste : [(champ, a, b)] pour l'en-tête puis
+        [(indice, a, b)] pour les primitives (None si absente d'un côté).
+        """
+        a, b = self.to_dict(), other.to_dict()
+        out = [(key, a[key], b[key]) for key in ("width", "height", "title", "transform")
+               if a[key] != b[key]]
+        ia, ib = a["items"], b["items"]
+        for i in range(max(len(ia), len(ib))):
+            x = ia[i] if i < len(ia) else None
+            y = ib[i] if i < len(ib) else None
+            if x != y:
+                out.append((i, x, y))
+        return out
+
+
+class _SceneScreen:
+    """
+    Écran vu par les render_* (turtle.Screen()) : il n'enregistre que la
+    taille et le titre dans la liste d'affichage ; l'écran du backend n'est
+    créé qu'au tracé, par _done().
+    """
+
+    def __init__(self):
+        ctx = _context()
+        self.display = ctx.display = DisplayList()
+        ctx.screen = self
+
+    def setup(self, width, height):
+        self.display.width, self.display.height = float(width), float(height)
+
+    def title(self, text):
+        self.display.title = str(text)
+
+    def tracer(self, flag):
+        pass
+
+
+def _open_screen():
+    """Équivalent de turtle.Screen() : ouvre la liste d'affichage du rendu."""
+    return _SceneScreen()
+
 
 class _Turtle:
     def __init__(self, visible=True):
-        global _current_screen
-        if _current_screen is None:
-            _current_screen = _Screen()
-        self.screen = _current_screen
-        self.ax = self.screen.ax
+        ctx = _context()
+        if ctx.screen is None:
+            _open_screen()
+        self.ctx = ctx
+        self.screen = ctx.screen
+        ctx.turtle = self
         self.x = 0.0
         self.y = 0.0
         # 0° vers la droite, positif = anti-horaire (comme turtle)
@@ -159,6 +1042,8 @@ class _Turtle:
         self.linewidth = 1.0
         self.pencolor_value = "black"
         self.fillcolor_value = "black"
+        # rôle (clé de palette) de la prochaine surface, transmis à add_fill
+        self.fill_role = None
         self.is_filling = False
         self.fill_path = []
         # "visible" ignoré : on ne dessine jamais la tortue elle-même.
@@ -183,8 +1068,9 @@ class _Turtle:
     def pencolor(self, c):
         self.pencolor_value = c
 
-    def fillcolor(self, c):
+    def fillcolor(self, c, role=None):
         self.fillcolor_value = c
+        self.fill_role = role
 
     # --- Orientation / déplacement ---
     def setheading(self, angle):
@@ -194,7 +1080,8 @@ class _Turtle:
         x = float(x)
         y = float(y)
         if self.pen_down:
-            self.ax.plot([self.x, x], [self.y, y], linewidth=self.linewidth, color=self.pencolor_value)
+            key = (self.pencolor_value, self.linewidth)
+            self.screen.segments.setdefault(key, []).append(((self.x, self.y), (x, y)))
         if self.is_filling:
             if not self.fill_path:
                 self.fill_path.append((self.x, self.y))
@@ -220,11 +1107,9 @@ class _Turtle:
 
     def end_fill(self):
         if self.is_filling and len(self.fill_path) >= 3:
-            poly = Polygon(self.fill_path, closed=True,
-                           facecolor=self.fillcolor_value,
-                           edgecolor=self.pencolor_value,
-                           linewidth=self.linewidth)
-            self.ax.add_patch(poly)
+            self.screen.add_fill(self.fill_path, self.fillcolor_value,
+                                 self.pencolor_value, self.linewidth,
+                                 role=self.fill_role)
         self.is_filling = False
         self.fill_path = []
 
@@ -233,9 +1118,18 @@ class _Turtle:
         if extent is None:
             extent = 360.0
         extent = float(extent)
-        # nombre de segments pour approcher l'arc
+        # nombre de segments pour approcher l'arc : pas fixe de 5°, ou selon
+        # le rayon en pixels de l'image (options "arc_tolerance_px", "min_round_px")
         if steps is None:
-            steps = max(4, int(abs(extent) / 5.0))
+            options = self.ctx.options
+            tolerance = options["arc_tolerance_px"]
+            radius_px = abs(radius) * options["dpi"] / 100.0
+            if radius_px < options["min_round_px"]:
+                steps = 1
+            elif tolerance:
+                steps = _arc_steps(radius_px, extent, tolerance)
+            else:
+                steps = max(4, int(abs(extent) / 5.0))
         steps = max(1, int(steps))
 
         start_heading = self.heading
@@ -265,21 +1159,7 @@ class _Turtle:
 
     # --- Texte ---
     def write(self, text, align="left", font=None):
-        ha = {"left": "left", "center": "center", "right": "right"}.get(align, "left")
-        kwargs = {"ha": ha, "va": "center"}
-        if font is not None:
-            # tuple de type ("Arial", 12, "bold")
-            if len(font) > 0:
-                kwargs["fontfamily"] = font[0]
-            if len(font) > 1:
-                kwargs["fontsize"] = font[1]
-            if len(font) > 2:
-                style = font[2]
-                if style in ("bold", "normal"):
-                    kwargs["fontweight"] = style
-                else:
-                    kwargs["fontstyle"] = style
-        self.ax.text(self.x, self.y, str(text), **kwargs)
+        self.screen.add_text(self.x, self.y, text, align=align, font=font)
 
     # --- Autres méthodes ---
     def speed(self, _):
@@ -292,15 +1172,528 @@ class _Turtle:
 
 
 def _done():
-    """Équivalent de turtle.done() : affiche la figure Matplotlib."""
-    global _current_screen
-    if _current_screen is not None:
-        _current_screen.ax.set_aspect("equal", adjustable="box")
-        plt.show()
-    _current_screen = None
+    """
+    Équivalent de turtle.done() : trace la liste d'affichage sur l'écran du
+    backend puis affiche la figure Matplotlib ; en mode headless, renvoie
+    l'image encodée (ou la DisplayList avec backend="display").
+    """
+    ctx = _context()
+    display, ctx.display, ctx.screen, ctx.turtle = ctx.display, None, None, None
+    if display is None:
+        return None
+    if ctx.options["backend"] == "display":
+        return display
+    return _paint_display_list(display)
+
+
+def _paint_display_list(display):
+    """
+    Rejoue une DisplayList sur un écran neuf du backend actif (cf. _PAINTERS)
+    et renvoie le résultat de screen.finish().
+    """
+    ctx = _context()
+    with _phase_timer("draw"):
+        screen = _SCREEN_BACKENDS[ctx.options["backend"]]()
+        if display.width is not None:
+            screen.setup(display.width, display.height)
+        if display.title is not None:
+            screen.title(display.title)
+        if hasattr(screen, "paint"):
+            # l'écran consomme directement les primitives (cf. _WorldScreen)
+            screen.paint(display)
+        else:
+            t = _Turtle(visible=False)
+            tr = WorldToScreen.from_params(**display.transform) if display.transform else None
+            for item in display.items:
+                _PAINTERS[item["kind"]](t, tr, item)
+    ctx.screen, ctx.turtle = None, None
+    ctx.last_screen = screen
+    # savefig (headless) ou plt.show (interactif)
+    with _phase_timer("encode"):
+        return screen.finish()
+
+
+def _render_headless(render_fn, args, kwargs, **options):
+    """
+    Exécute render_fn dans un RenderContext neuf (options données), propre au
+    thread appelant ; le contexte précédent est restauré ensuite, y compris
+    si le rendu lève une exception.
+    """
+    previous = getattr(_local, "ctx", None)
+    _local.ctx = RenderContext(headless=True, **options)
+    try:
+        return render_fn(*args, **kwargs)
+    finally:
+        _local.ctx = previous
+
+
+def _check_image_options(fmt, backend):
+    """Valide backend/format d'un rendu image ; renvoie le format normalisé."""
+    if backend not in ("matplotlib", "matplotlib_world", "svg"):
+        raise ValueError(f"Backend d'image inconnu : {backend!r} "
+                         "(matplotlib, matplotlib_world ou svg).")
+    fmt = str(fmt or ("svg" if backend == "svg" else "png")).lower()
+    if fmt not in ("png", "svg", "rgba"):
+        raise ValueError(f"Format d'image non supporté : {fmt!r} (png, svg ou rgba).")
+    if backend == "svg" and fmt != "svg":
+        raise ValueError("Le backend svg ne produit que du SVG.")
+    return fmt
+
+
+def render_image(render_fn, *args, fmt=None, dpi=100, backend="matplotlib",
+                 arc_tolerance_px=None, min_round_px=0.0, **kwargs):
+    """
+    Exécute un rendu (render_U, render_LNF, ...) sans interface graphique et
+    renvoie l'image encodée (bytes), au format "png" ou "svg".
+
+    fmt="rgba" (backends matplotlib) : renvoie le canevas Agg tel quel, en
+    tableau NumPy (hauteur, largeur, 4) uint8, sans copie ni encodage PNG ;
+    st.image(arr) ou PIL.Image.fromarray(arr) l'utilisent directement.
+    Réservé à l'aperçu : le PNG reste le format d'export.
+
+    backend="matplotlib" (défaut) : PNG ou SVG via le canevas Agg.
+    backend="matplotlib_world" : idem, mais la scène est tracée en cm et
+                    mise à l'échelle par les axes (cf. _WorldScreen).
+    backend="svg" : SVG écrit directement, sans passer par Matplotlib
+                    (beaucoup plus rapide, pour l'aperçu web).
+
+    arc_tolerance_px / min_round_px : niveau de détail des arrondis, en
+    pixels de l'image (cf. _DEFAULT_RENDER_OPTIONS) ; ex. min_round_px=2 pour
+    des vignettes où des coins de quelques pixels ne se voient pas.
+
+    Si enable_render_cache() a été appelé, un rendu déjà fait (mêmes
+    arguments normalisés) renvoie directement les octets mémorisés.
+
+    Exemple :
+        png = render_image(render_LNF, tx=280, ty=250, coussins="auto")
+        svg = render_image(render_LNF, tx=280, ty=250, backend="svg")
+    """
+    fmt = _check_image_options(fmt, backend)
+    options = {"fmt": fmt, "dpi": dpi, "backend": backend,
+               "arc_tolerance_px": arc_tolerance_px, "min_round_px": min_round_px}
+    cache = _render_cache
+    # un tableau rgba est une vue sur le canevas du rendu : pas de mise en cache
+    if cache is None or fmt == "rgba":
+        return _render_headless(render_fn, args, kwargs, **options)
+    return cache.render(render_fn, args, kwargs, **options)
+
+
+def record_display_list(render_fn, *args, **kwargs):
+    """
+    Exécute un rendu sans rien tracer et renvoie sa DisplayList, à tracer
+    ensuite (éventuellement plusieurs fois) avec render_display_list.
+
+    Exemple :
+        dl = record_display_list(render_LNF, tx=280, ty=250)
+        png = render_display_list(dl)
+        svg = render_display_list(DisplayList.from_json(dl.to_json()), backend="svg")
+    """
+    return _render_headless(render_fn, args, kwargs, backend="display")
+
+
+def render_display_list(display, fmt=None, dpi=100, backend="matplotlib",
+                        arc_tolerance_px=None, min_round_px=0.0):
+    """
+    Trace une DisplayList : octets PNG/SVG (backends matplotlib et svg, comme
+    render_image) ou reportlab Drawing (backend="reportlab").
+    """
+    lod = {"arc_tolerance_px": arc_tolerance_px, "min_round_px": min_round_px}
+    if backend == "reportlab":
+        return _render_headless(_paint_display_list, (display,), {}, backend=backend, **lod)
+    fmt = _check_image_options(fmt, backend)
+    return _render_headless(_paint_display_list, (display,), {},
+                            fmt=fmt, dpi=dpi, backend=backend, **lod)
+
+
+def render_drawing(render_fn, *args, **kwargs):
+    """
+    Exécute un rendu et renvoie un reportlab.graphics.shapes.Drawing vectoriel
+    (900×700 points, cf. WIN_W/WIN_H), à insérer directement dans un PDF.
+
+    Exemple :
+        d = render_drawing(render_U, tx=400, ty_left=250, tz_right=250)
+        d.scale(0.5, 0.5); d.width *= 0.5; d.height *= 0.5
+        elements.append(d)
+    """
+    return _render_headless(render_fn, args, kwargs, backend="reportlab")
+
+
+# ----- Vignettes (liste des devis) -----
+
+_THUMBNAIL_KINDS = ("polygon", "rounded_rect")
+
+
+def thumbnail_display_list(display):
+    """
+    Version vignette d'une DisplayList : mêmes surfaces (structure, coussins,
+    traversins) et même transformation, sans titre, textes, cotes ni fond de
+    légende ; coussins à coins droits.
+    """
+    items = [dict(item, r=0.0) if item["kind"] == "rounded_rect" else item
+             for item in display.items if item["kind"] in _THUMBNAIL_KINDS]
+    return DisplayList(display.width, display.height, None, display.transform, items)
+
+
+def render_thumbnail(source, *args, width=180, fmt=None, backend="pillow", **kwargs):
+    """
+    Vignette d'un devis, pour l'afficher à côté de chaque devis d'une liste :
+    le layout est celui du rendu complet (mêmes compute_points_* et
+    build_polys_*, cf. record_display_list), tracé sans textes ni cotes
+    (thumbnail_display_list) sur une image de `width` pixels de large.
+
+    source : fonction render_* (args/kwargs comme render_image), ou
+             DisplayList déjà enregistrée (ex. stockée avec le devis via
+             to_json) : le layout et l'optimisation des coussins ne sont
+             alors pas refaits.
+    backend="pillow" (défaut) : PNG ou tableau "rgba" via PIL.ImageDraw,
+                    sans Matplotlib ni figure à créer (tracé 30 à 60× plus
+                    rapide que render_image, cf. benchmark.py --thumbnail).
+    backend="matplotlib" / "svg" : mêmes écrans que render_image.
+
+    Exemple :
+        png = render_thumbnail(render_U, tx=450, ty_left=250, tz_right=250)
+        png = render_thumbnail(DisplayList.from_json(devis["schema"]))
+    """
+    if not isinstance(source, DisplayList):
+        source = record_display_list(source, *args, **kwargs)
+    display = thumbnail_display_list(source)
+    dpi = 100.0 * width / (display.width or WIN_W)
+    if backend != "pillow":
+        return render_display_list(display, fmt=fmt, dpi=dpi, backend=backend)
+    fmt = str(fmt or "png").lower()
+    if fmt not in ("png", "rgba"):
+        raise ValueError(f"Format de vignette non supporté : {fmt!r} (png ou rgba).")
+    return _render_headless(_paint_display_list, (display,), {},
+                            fmt=fmt, dpi=dpi, backend=backend)
+
+
+# ----- Recoloration (changement de palette sans recalcul) -----
+
+def _rounded_roles(palette):
+    """
+    Rôles dessinés avec coins arrondis : draw_polygon_cm arrondit toute surface
+    rectangulaire de la couleur des coussins. Si cet ensemble change, la
+    géométrie du rendu change aussi.
+    """
+    return frozenset(role for role in ("accoudoirs", "dossiers", "assise")
+                     if palette[role] == palette["coussins"])
+
+
+class RenderHandle:
+    """
+    Rendu image conservé en mémoire (cf. render_recolorable) : les surfaces
+    sont regroupées par rôle (assise, dossiers, accoudoirs, coussins,
+    traversins), si bien qu'un changement de palette ne fait que remplacer
+    les couleurs de fond et ré-encoder l'image, sans refaire la géométrie ni
+    l'optimisation des coussins.
+
+    Attributs : data (octets de la dernière image), palette (palette en cours).
+    """
+
+    def __init__(self, render_fn, args, kwargs, **options):
+        self.render_fn = render_fn
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs)
+        self.options = options
+        self.data = None
+        self.palette = None
+        self._screen = None
+        self._render()
+
+    def _render(self):
+        previous = getattr(_local, "ctx", None)
+        ctx = _local.ctx = RenderContext(headless=True, **self.options)
+        try:
+            self.data = self.render_fn(*self.args, **self.kwargs)
+        finally:
+            _local.ctx = previous
+        self._screen = ctx.last_screen
+        self.palette = dict(ctx.palette)
+
+    def recolor(self, couleurs):
+        """
+        Applique une nouvelle palette (même syntaxe que l'argument `couleurs`
+        des render_*) et renvoie la nouvelle image. Le rapport console n'est
+        pas réimprimé. Repli sur un rendu complet si la palette modifie
+        l'arrondi des surfaces (cf. _rounded_roles).
+        """
+        palette, _items = _resolve_palette(couleurs)
+        self.kwargs["couleurs"] = couleurs
+        if _rounded_roles(palette) != _rounded_roles(self.palette):
+            self._render()
+            return self.data
+        self.data = self._screen.recolor(palette)
+        self.palette = palette
+        return self.data
+
+
+def render_recolorable(render_fn, *args, fmt=None, dpi=100, backend="matplotlib",
+                       arc_tolerance_px=None, min_round_px=0.0, **kwargs):
+    """
+    Comme render_image, mais renvoie un RenderHandle : handle.data contient
+    l'image, handle.recolor(couleurs) renvoie l'image recolorée sans refaire
+    la géométrie (configurateur : changement de tissu en direct).
+    Le cache de rendu n'est pas consulté (la figure doit rester vivante).
+    Avec fmt="rgba", chaque recolor() redessine le même canevas : le tableau
+    précédent est mis à jour sur place.
+
+    Exemple :
+        h = render_recolorable(render_LNF, tx=280, ty=250)
+        png = h.recolor("coussins:#b38b6d; assise:crème")
+    """
+    fmt = _check_image_options(fmt, backend)
+    return RenderHandle(render_fn, args, kwargs, fmt=fmt, dpi=dpi, backend=backend,
+                        arc_tolerance_px=arc_tolerance_px, min_round_px=min_round_px)
+
+
+# ----- Cache de rendu (render_image) -----
+# Clé = sha256 des arguments normalisés (palette résolue, traversins triés,
+# valeurs par défaut appliquées) + format/dpi/backend + empreinte du code.
+# Niveau 1 : LRU en mémoire ; niveau 2 (optionnel) : un fichier par clé dans
+# un répertoire, évincé par ancienneté d'accès au-delà de max_disk_bytes.
+# Le rapport console est stocké avec l'image et réimprimé lors d'un succès.
+
+_render_cache = None
+_code_digest = None
+
+
+def _render_code_digest():
+    """Empreinte du module : un cache disque ne survit pas à un changement de code."""
+    global _code_digest
+    if _code_digest is None:
+        import hashlib
+        try:
+            with open(__file__, "rb") as f:
+                _code_digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            _code_digest = "?"
+    return _code_digest
+
+
+def _cache_normalize(value):
+    if isinstance(value, dict):
+        return {str(k): _cache_normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_cache_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_cache_normalize(v) for v in value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)  # tx=250 et tx=250.0 : même rendu, même clé
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+# réglages du module qui changent le rendu : une image en cache n'est
+# resservie que s'ils n'ont pas bougé depuis
+_RENDER_CACHE_SETTINGS = ("WIN_W", "WIN_H", "PAD_PX", "ZOOM", "LINE_WIDTH",
+                          "DEFERRED_FILL", "VALISE_DECOMPOSED")
+
+
+def _render_cache_key(render_fn, args, kwargs, **options):
+    import hashlib
+    import inspect
+    import json
+
+    try:
+        bound = inspect.signature(render_fn).bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+    except (TypeError, ValueError):
+        params = {"*args": list(args), **kwargs}
+    if "couleurs" in params:
+        try:
+            params["couleurs"] = _resolve_palette(params["couleurs"])
+        except ValueError:
+            pass  # palette invalide : le rendu lèvera l'erreur
+    if "traversins" in params:
+        params["traversins"] = _parse_traversins_spec(params["traversins"])
+    payload = {
+        "fn": f"{getattr(render_fn, '__module__', '')}.{getattr(render_fn, '__qualname__', render_fn)}",
+        "params": _cache_normalize(params),
+        "options": _cache_normalize(options),
+        "settings": _cache_normalize({name: globals().get(name) for name in _RENDER_CACHE_SETTINGS}),
+        "code": _render_code_digest(),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    Cache des images de render_image (cf. enable_render_cache).
+    Partageable entre threads ; le répertoire disque peut être partagé entre
+    processus (écritures atomiques, éviction tolérante).
+    """
+
+    def __init__(self, max_items=128, directory=None, max_disk_bytes=512 * 1024 * 1024):
+        import collections
+        import os
+
+        self.max_items = int(max_items)
+        self.directory = directory
+        self.max_disk_bytes = int(max_disk_bytes)
+        self._mem = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.hits = self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    def render(self, render_fn, args, kwargs, **options):
+        import sys
+
+        key = _render_cache_key(render_fn, args, kwargs, **options)
+        hit = self.get(key)
+        if hit is not None:
+            report, data = hit
+            sys.stdout.write(report)
+            return data
+        console = io.StringIO()
+        try:
+            # rapport de ce thread seulement (cf. capture_console)
+            with capture_console(console):
+                data = _render_headless(render_fn, args, kwargs, **options)
+        finally:
+            sys.stdout.write(console.getvalue())
+        self.put(key, console.getvalue(), data)
+        return data
+
+    def get(self, key):
+        """(rapport, image) ou None ; un succès disque remonte en mémoire."""
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._disk_get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._mem_put(key, entry)
+        return entry
+
+    def put(self, key, report, data):
+        entry = (report, bytes(data))
+        with self._lock:
+            self._mem_put(key, entry)
+        self._disk_put(key, entry)
+
+    def clear(self):
+        import os
+
+        with self._lock:
+            self._mem.clear()
+            self._disk_bytes = 0
+        for path, _, _ in self._disk_entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # -- mémoire --
+    def _mem_put(self, key, entry):
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    # -- disque : <clé>.bin = longueur du rapport (4 octets) + rapport + image --
+    def _disk_path(self, key):
+        import os
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _disk_entries(self):
+        import os
+
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if e.name.endswith(".bin"):
+                        try:
+                            st = e.stat()
+                        except OSError:
+                            continue
+                        entries.append((e.path, st.st_size, st.st_mtime))
+        except OSError:
+            pass
+        return entries
+
+    def _disk_get(self, key):
+        import os
+
+        if not self.directory:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            os.utime(path)  # ancienneté d'accès pour l'éviction
+        except OSError:
+            return None
+        n = int.from_bytes(blob[:4], "big")
+        return blob[4:4 + n].decode("utf-8"), blob[4 + n:]
+
+    def _disk_put(self, key, entry):
+        import os
+
+        if not self.directory:
+            return
+        report, data = entry
+        rep = report.encode("utf-8")
+        blob = len(rep).to_bytes(4, "big") + rep + data
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes += len(blob)
+            over = self._disk_bytes > self.max_disk_bytes
+        if over:
+            self._disk_evict()
+
+    def _disk_evict(self):
+        import os
+
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
 
+def enable_render_cache(max_items=128, directory=None, max_disk_bytes=512 * 1024 * 1024):
+    """
+    Active le cache de render_image pour tout le processus et le retourne.
+    directory : répertoire du niveau disque (None = mémoire seule).
+    """
+    global _render_cache
+    _render_cache = RenderCache(max_items, directory, max_disk_bytes)
+    return _render_cache
+
+
+def disable_render_cache():
+    global _render_cache
+    _render_cache = None
 
-turtle = types.SimpleNamespace(Screen=_Screen, Turtle=_Turtle, done=_done)
+
+turtle = types.SimpleNamespace(Screen=_open_screen, Turtle=_Turtle, done=_done)
 
 # =========================
 # Réglages / constantes
@@ -309,6 +1702,10 @@ WIN_W, WIN_H       = 900, 700
 PAD_PX             = 60
 ZOOM               = 0.85
 LINE_WIDTH         = 2
+DEFERRED_FILL      = True   # surfaces regroupées en un seul PathCollection (cf. _Screen)
+VALISE_DECOMPOSED  = True   # recherche valise par branche (cf. _valise_window_search) ; False : produit cartésien
+VALISE_NUMPY       = True   # produit cartésien de référence vectorisé si NumPy est installé (cf. _valise_product_search_np, benchmark.py --valise-check)
+VALISE_LUT_FILE    = None   # table valise construite hors ligne (python -m canapematplot valise-lut, cf. _valise_lut) ; None : recherche directe
 
 # ========= PALETTE / THÈME =========
 # Couleurs par défaut, selon la demande :
@@ -316,7 +1713,8 @@ LINE_WIDTH         = 2
 # - dossiers = gris (un ton plus clair)
 # - assises/banquettes = gris très clair (presque blanc)
 # - coussins = taupe
-# NB : Ces valeurs seront éventuellement écrasées à chaque render_* via _resolve_and_apply_colors()
+# NB : valeurs par défaut de RenderContext.palette ; chaque render_* résout sa
+#      propre palette via _resolve_and_apply_colors() (sans modifier ces constantes)
 # Mise à jour : remplissage par défaut blanc pour toutes les parties sauf les coussins.
 COLOR_ASSISE       = "#ffffff"  # blanc (assises/banquettes)
 COLOR_ACC          = "#ffffff"  # blanc (accoudoirs)
@@ -336,6 +1734,7 @@ DEPTH_STD          = 70
 ACCOUDOIR_THICK    = 15
 DOSSIER_THICK      = 10
 CUSHION_DEPTH      = 15
+CUSHION_CATALOGUE  = (65, 80, 90)  # tailles d'atelier : auto en choisit une, "mix" les combine
 
 # *** Seuil strict de scission ***
 MAX_BANQUETTE      = 250
@@ -552,15 +1951,13 @@ def _parse_couleurs_argument(couleurs):
             res[kn] = v
     return res
 
-def _resolve_and_apply_colors(couleurs):
+def _resolve_palette(couleurs):
     """
-    Résout la palette utilisateur puis applique aux variables globales:
-      COLOR_ASSISE, COLOR_ACC, COLOR_DOSSIER, COLOR_CUSHION
-    Retourne une liste d'items pour la légende: [(libellé, hex, nom)]
+    Résout la palette utilisateur sans l'appliquer.
+    Retourne (palette, items) : palette = {accoudoirs, dossiers, assise, coussins}
+    en hex, items = liste pour la légende [(libellé, hex, nom)].
     Règle : si dossiers non spécifié mais accoudoirs oui => dossiers = accoudoirs éclaircis.
     """
-    global COLOR_ASSISE, COLOR_ACC, COLOR_DOSSIER, COLOR_CUSHION
-
     # base par défaut (demande client)
     default = {
         "accoudoirs": "gris",
@@ -585,19 +1982,31 @@ def _resolve_and_apply_colors(couleurs):
     # coussins
     cush_hex, cush_name = _parse_color_value(spec["coussins"])
 
-    # applique globals
-    COLOR_ACC     = acc_hex
-    COLOR_DOSSIER = dos_hex
-    COLOR_ASSISE  = ass_hex
-    COLOR_CUSHION = cush_hex
+    palette = {
+        "accoudoirs": acc_hex,
+        "dossiers":   dos_hex,
+        "assise":     ass_hex,
+        "coussins":   cush_hex,
+    }
 
     # Items de légende (texte + nom de couleur si dispo)
     items = [
-        ("Dossier",   COLOR_DOSSIER, dos_name),
-        ("Accoudoir", COLOR_ACC,     acc_name),
-        ("Coussins",  COLOR_CUSHION, cush_name),
-        ("Assise",    COLOR_ASSISE,  ass_name),
+        ("Dossier",   dos_hex,  dos_name),
+        ("Accoudoir", acc_hex,  acc_name),
+        ("Coussins",  cush_hex, cush_name),
+        ("Assise",    ass_hex,  ass_name),
     ]
+    return palette, items
+
+def _resolve_and_apply_colors(couleurs):
+    """
+    Résout la palette utilisateur puis l'applique au contexte de rendu courant
+    (RenderContext.palette : accoudoirs, dossiers, assise, coussins).
+    Retourne une liste d'items pour la légende: [(libellé, hex, nom)]
+    """
+    palette, items = _resolve_palette(couleurs)
+    # applique au contexte de rendu (propre au thread)
+    _context().palette = palette
     return items
 
 # =========================
@@ -614,10 +2023,29 @@ class WorldToScreen:
         self.bottom_px = -used_h / 2.0
     def pt(self, x_cm, y_cm):
         return (self.left_px + x_cm*self.scale, self.bottom_px + y_cm*self.scale)
+    def params(self):
+        return {"scale": self.scale, "left_px": self.left_px, "bottom_px": self.bottom_px}
+    @classmethod
+    def from_params(cls, scale, left_px, bottom_px):
+        """Transformation relue d'une DisplayList (cf. params)."""
+        tr = cls.__new__(cls)
+        tr.scale, tr.left_px, tr.bottom_px = scale, left_px, bottom_px
+        return tr
 
 # =========================
 # Outils dessin
 # =========================
+# Les draw_*/label_* ne pilotent pas la tortue : ils ajoutent des primitives
+# (en cm) à la DisplayList du rendu ; les _paint_* les tracent au moment de
+# turtle.done() (cf. _PAINTERS).
+
+def _display(t, tr):
+    """DisplayList du rendu en cours (la transformation y est relevée au passage)."""
+    dl = t.ctx.display
+    if dl.transform is None and tr is not None:
+        dl.transform = tr.params()
+    return dl
+
 def pen_up_to(t, x, y):
     t.up(); t.goto(x, y)
 
@@ -633,45 +2061,39 @@ def _is_axis_aligned_rect(pts):
     return len(xs) == 2 and len(ys) == 2
 
 def draw_rounded_rect_cm(t, tr, x0, y0, x1, y1, r_cm=CUSHION_ROUND_R_CM,
-                         fill=None, outline=COLOR_CONTOUR, width=LINE_WIDTH):
-    # normalise
-    if x0 > x1: x0, x1 = x1, x0
-    if y0 > y1: y0, y1 = y1, y0
-    rx = max(0.0, min(r_cm, (x1-x0)/2.0, (y1-y0)/2.0))
-    wpx = (x1 - x0) * tr.scale
-    hpx = (y1 - y0) * tr.scale
-    rpx = rx * tr.scale
-    sx, sy = tr.pt(x0 + rx, y0)
-
-    t.pensize(width)
-    t.pencolor(outline)
-    pen_up_to(t, sx, sy)
-    if fill:
-        t.fillcolor(fill)
-        t.begin_fill()
-    t.setheading(0)
-    t.down()
-    for _ in range(2):
-        t.forward(max(0.0, wpx - 2*rpx)); t.circle(rpx, 90)
-        t.forward(max(0.0, hpx - 2*rpx)); t.circle(rpx, 90)
-    t.up()
-    if fill:
-        t.end_fill()
-
-def draw_polygon_cm(t, tr, pts, fill=None, outline=COLOR_CONTOUR, width=LINE_WIDTH):
+                         fill=None, outline=COLOR_CONTOUR, width=LINE_WIDTH, role=None):
+    _display(t, tr).add("rounded_rect", rect=(x0, y0, x1, y1), r=r_cm,
+                        fill=fill, outline=outline, width=width, role=role)
+
+def _paint_rounded_rect(t, tr, item):
+    # une seule primitive native par boîte (chemin de Bézier, <rect rx>,
+    # Rect(rx, ry)) plutôt que 4 côtés + 4 arcs tortue de 18 segments
+    x0, y0, x1, y1 = item["rect"]
+    (sx0, sy0), (sx1, sy1) = tr.pt(x0, y0), tr.pt(x1, y1)
+    box = _rounded_box(sx0, sy0, sx1, sy1, item["r"] * tr.scale)
+    box["r"] = _visible_radius(box["r"])
+    t.screen.add_rounded_rect(box, item["fill"], item["outline"], float(item["width"]),
+                              role=item["role"])
+
+def draw_polygon_cm(t, tr, pts, fill=None, outline=COLOR_CONTOUR, width=LINE_WIDTH, role=None):
+    # role : clé de palette de la surface ("assise", "coussins", ...), cf. RenderHandle.recolor
     if not pts: return
     # Arrondi auto pour coussins rectangulaires axis‑alignés
-    if fill == COLOR_CUSHION and _is_axis_aligned_rect(pts):
+    if fill == t.ctx.palette["coussins"] and _is_axis_aligned_rect(pts):
         xs = [x for x, _ in pts[:-1]] if pts[0] == pts[-1] else [x for x, _ in pts]
         ys = [y for _, y in pts[:-1]] if pts[0] == pts[-1] else [y for _, y in pts]
         x0, x1 = min(xs), max(xs); y0, y1 = min(ys), max(ys)
         draw_rounded_rect_cm(t, tr, x0, y0, x1, y1, r_cm=CUSHION_ROUND_R_CM,
-                             fill=fill, outline=outline, width=width)
+                             fill=fill, outline=outline, width=width, role=role)
         return
     # Fallback polygonal
+    _display(t, tr).add("polygon", pts=list(pts), fill=fill, outline=outline, width=width, role=role)
+
+def _paint_polygon(t, tr, item):
+    pts, fill, outline, width = item["pts"], item["fill"], item["outline"], item["width"]
     t.pensize(width); t.pencolor(outline)
     x0, y0 = tr.pt(*pts[0]); pen_up_to(t, x0, y0)
-    if fill: t.fillcolor(fill); t.begin_fill()
+    if fill: t.fillcolor(fill, item["role"]); t.begin_fill()
     t.down()
     for x, y in pts[1:]:
         t.goto(*tr.pt(x, y))
@@ -690,39 +2112,53 @@ def _unit(vx, vy):
     n = math.hypot(vx, vy)
     return (vx/n, vy/n) if n else (0, 0)
 
-def draw_double_arrow_px(t, p1, p2, text=None, text_perp_offset_px=0, text_tang_shift_px=0):
-    t.pensize(1.5); t.pencolor("black")
-    pen_up_to(t, *p1); t.down(); t.goto(*p2); t.up()
+def _double_arrow_geometry(p1, p2, text_perp_offset_px=0, text_tang_shift_px=0):
+    """Segments (trait puis pointes) et position du texte d'une double flèche, en px."""
     vx, vy = (p2[0]-p1[0], p2[1]-p1[1]); ux, uy = _unit(vx, vy); px, py = -uy, ux
     ah, spread = 12, 5
+    segs = [(p1, p2)]
     for base, sgn in [(p1, +1), (p2, -1)]:
         a = (base[0] + ux*ah*sgn + px*spread, base[1] + uy*ah*sgn + py*spread)
         b = (base[0] + ux*ah*sgn - px*spread, base[1] + uy*ah*sgn - py*spread)
-        pen_up_to(t, *base); t.down(); t.goto(*a); t.up()
-        pen_up_to(t, *base); t.down(); t.goto(*b); t.up()
+        segs += [(base, a), (base, b)]
+    cx, cy = ((p1[0]+p2[0])/2.0, (p1[1]+p2[1])/2.0)
+    tx = cx + px*text_perp_offset_px + ux*text_tang_shift_px
+    ty = cy + py*text_perp_offset_px + uy*text_tang_shift_px
+    return segs, (tx, ty)
+
+def draw_double_arrow_px(t, p1, p2, text=None, text_perp_offset_px=0, text_tang_shift_px=0):
+    t.pensize(1.5); t.pencolor("black")
+    segs, (tx, ty) = _double_arrow_geometry(p1, p2, text_perp_offset_px, text_tang_shift_px)
+    for a, b in segs:
+        pen_up_to(t, *a); t.down(); t.goto(*b); t.up()
     if text:
-        cx, cy = ((p1[0]+p2[0])/2.0, (p1[1]+p2[1])/2.0)
-        tx = cx + px*text_perp_offset_px + ux*text_tang_shift_px
-        ty = cy + py*text_perp_offset_px + uy*text_tang_shift_px
         pen_up_to(t, tx, ty); t.write(text, align="center", font=FONT_DIM)
 
 def draw_double_arrow_vertical_cm(t, tr, x_cm, y0_cm, y1_cm, label):
-    draw_double_arrow_px(t, tr.pt(x_cm, y0_cm), tr.pt(x_cm, y1_cm), text=label, text_perp_offset_px=+12)
+    _display(t, tr).add("arrow", p1=(x_cm, y0_cm), p2=(x_cm, y1_cm), text=label,
+                        perp_px=+12, tang_px=0)
 
 def draw_double_arrow_horizontal_cm(t, tr, y_cm, x0_cm, x1_cm, label):
-    draw_double_arrow_px(t, tr.pt(x0_cm, y_cm), tr.pt(x1_cm, y_cm), text=label,
-                         text_perp_offset_px=-12, text_tang_shift_px=20)
+    _display(t, tr).add("arrow", p1=(x0_cm, y_cm), p2=(x1_cm, y_cm), text=label,
+                        perp_px=-12, tang_px=20)
+
+def _paint_arrow(t, tr, item):
+    draw_double_arrow_px(t, tr.pt(*item["p1"]), tr.pt(*item["p2"]), text=item["text"],
+                         text_perp_offset_px=item["perp_px"], text_tang_shift_px=item["tang_px"])
 
 def centroid(poly):
     return (sum(x for x,y in poly)/len(poly), sum(y for x,y in poly)/len(poly))
 
 def label_poly(t, tr, poly, text, font=FONT_LABEL):
-    cx, cy = centroid(poly); pen_up_to(t, *tr.pt(cx, cy))
-    t.write(text, align="center", font=font)
+    _display(t, tr).add("text", at=centroid(poly), text=text, align="center", font=font)
 
 def label_poly_offset_cm(t, tr, poly, text, dx_cm=0.0, dy_cm=0.0, font=FONT_LABEL):
-    cx, cy = centroid(poly); x, y = tr.pt(cx + dx_cm, cy + dy_cm)
-    pen_up_to(t, x, y); t.write(text, align="center", font=font)
+    cx, cy = centroid(poly)
+    _display(t, tr).add("text", at=(cx + dx_cm, cy + dy_cm), text=text, align="center", font=font)
+
+def _paint_text(t, tr, item):
+    x, y = tr.pt(*item["at"]) if "at" in item else item["at_px"]
+    pen_up_to(t, x, y); t.write(item["text"], align=item["align"], font=item["font"])
 
 def banquette_dims(poly):
     xs=[p[0] for p in poly]; ys=[p[1] for p in poly]
@@ -798,6 +2234,11 @@ def _assert_banquettes_max_250(polys):
 # =====================================================================
 
 def _draw_rect_px(t, x, y, w, h, fill=None, outline=COLOR_CONTOUR, width=1):
+    _display(t, None).add("rect", x=x, y=y, w=w, h=h, fill=fill, outline=outline, width=width)
+
+def _paint_rect(t, tr, item):
+    x, y, w, h = item["x"], item["y"], item["w"], item["h"]
+    fill, outline, width = item["fill"], item["outline"], item["width"]
     t.pensize(width); t.pencolor(outline)
     pen_up_to(t, x, y)
     if fill:
@@ -829,8 +2270,16 @@ def draw_title_center(t, tr, tx_cm, ty_cm, text):
     y  = top - TITLE_MARGIN_PX
     lines = _wrap_text(text, max_len=34)
     for i, line in enumerate(lines):
-        pen_up_to(t, cx, y - i*18)
-        t.write(line, align="center", font=FONT_TITLE)
+        _display(t, tr).add("text", at_px=(cx, y - i*18), text=line, align="center", font=FONT_TITLE)
+
+# Primitive de DisplayList -> fonction de tracé (tortue sur l'écran du backend)
+_PAINTERS = {
+    "polygon": _paint_polygon,
+    "rounded_rect": _paint_rounded_rect,
+    "arrow": _paint_arrow,
+    "text": _paint_text,
+    "rect": _paint_rect,
+}
 
 def draw_legend(t, tr, tx_cm, ty_cm, items=None, pos="top-right"):
     """
@@ -847,10 +2296,10 @@ def draw_legend(t, tr, tx_cm, ty_cm, items=None, pos="top-right"):
     # Items / couleurs
     if not items:
         items = [
-            ("Dossier",   COLOR_DOSSIER, None),
-            ("Accoudoir", COLOR_ACC,     None),
-            ("Coussins",  COLOR_CUSHION, None),
-            ("Assise",    COLOR_ASSISE,  None),
+            ("Dossier",   t.ctx.palette["dossiers"],   None),
+            ("Accoudoir", t.ctx.palette["accoudoirs"], None),
+            ("Coussins",  t.ctx.palette["coussins"],   None),
+            ("Assise",    t.ctx.palette["assise"],     None),
         ]
     # Taille & position + placement "safe" (jamais sur le schéma)
     box = LEGEND_BOX_PX
@@ -977,6 +2426,7 @@ def _parse_coussins_spec(coussins):
       s             -> same global, 60..100
       p:s           -> same global, 60..74
       g:s           -> same global, 76..100
+      mix           -> tailles du catalogue mélangées par branche (cf. _mix_fill_1d)
     """
     if isinstance(coussins, int):
         return {"mode":"fixed", "fixed": int(coussins)}
@@ -985,6 +2435,8 @@ def _parse_coussins_spec(coussins):
         return {"mode":"auto"}
     if s.isdigit():
         return {"mode":"fixed", "fixed": int(s)}
+    if s == "mix":
+        return {"mode":"mix", "catalogue": CUSHION_CATALOGUE}
     same = (":s" in s) or (s == "s")
     base = s.replace(":s", "")
     if base == "s":
@@ -1021,17 +2473,77 @@ def _waste_and_count_1d(length, size):
     waste = length - n*size
     return n, waste
 
+def _import_numpy():
+    """NumPy s'il est installé et activé (VALISE_NUMPY), sinon None : repli sur les boucles Python."""
+    if not VALISE_NUMPY:
+        return None
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+# ----- Layout : résultat commun (sans dessin) -----
+def _layout_result(family, variant, pts, polys, cushions, traversins,
+                   coussins_line, add_split, angles, alternatives=None):
+    """
+    Assemble le résultat d'un layout_* : géométrie, coussins et traversins
+    placés (en cm), plus les comptages repris tels quels par le rapport console.
+    alternatives : alternatives valise (cf. _valise_alternatives), jointes
+    sous "valise_alternatives" si présentes.
+    """
+    lay = {
+        "family": family,
+        "variant": variant,
+        "pts": pts,
+        "polys": polys,
+        "cushions": cushions,
+        "traversins": traversins,
+        "counts": {
+            "banquettes": len(polys["banquettes"]),
+            "banquette_sizes": [banquette_dims(p) for p in polys["banquettes"]],
+            "dossiers": _compute_dossiers_count(polys),
+            "dossiers_scission": add_split,
+            "accoudoirs": len(polys["accoudoirs"]),
+            "angles": angles,
+            "traversins": len(traversins),
+            "coussins": len(cushions),
+        },
+        "coussins_line": coussins_line,
+    }
+    if alternatives:
+        lay["valise_alternatives"] = alternatives
+    return lay
+
+def _dossiers_str(count):
+    return f"{int(count)}" if abs(count - int(count)) < 1e-9 else f"{count}"
+
 # ----- Traversins : dessin -----
 def _draw_traversin_block(t, tr, x0, y0, x1, y1):
     draw_rounded_rect_cm(t, tr, x0, y0, x1, y1,
                          r_cm=CUSHION_ROUND_R_CM,
-                         fill=COLOR_TRAVERSIN, outline=COLOR_CONTOUR, width=1)
+                         fill=COLOR_TRAVERSIN, outline=COLOR_CONTOUR, width=1,
+                         role="traversins")
     cx, cy = (x0+x1)/2.0, (y0+y1)/2.0
-    pen_up_to(t, *tr.pt(cx, cy))
-    t.write("70x30", align="center", font=FONT_CUSHION)
+    _display(t, tr).add("text", at=(cx, cy), text="70x30", align="center", font=FONT_CUSHION)
+
+def _draw_traversins(t, tr, traversins):
+    """Dessine les traversins placés par un layout_* (liste de rectangles en cm)."""
+    for tv in traversins:
+        _draw_traversin_block(t, tr, *tv["rect"])
+
+def _draw_cushions(t, tr, cushions):
+    """Dessine les coussins placés par un layout_* (polygone + taille)."""
+    for c in cushions:
+        draw_polygon_cm(t, tr, c["poly"], fill=t.ctx.palette["coussins"],
+                        outline=COLOR_CONTOUR, width=1, role="coussins")
+        label_poly(t, tr, c["poly"], f"{c['size']}", font=FONT_CUSHION)
+
+def _place_traversin_block(out, x0, y0, x1, y1, side):
+    out.append({"rect": (x0, y0, x1, y1), "side": side})
 
-# ----- L-like / U / S1 : placement traversins -----
-def _draw_traversins_simple_S1(t, tr, pts, profondeur, dossier, traversins):
+# ----- L-like / U / S1 : placement traversins (sans dessin) -----
+def _place_traversins_simple_S1(out, pts, profondeur, dossier, traversins):
     """
     Traversins S1 : positionnés à la fin du dossier.
     - Si méridienne à gauche/droite, on s'aligne sur D0_m / Dx_m.
@@ -1048,15 +2560,15 @@ def _draw_traversins_simple_S1(t, tr, pts, profondeur, dossier, traversins):
         # fin du dossier côté gauche
         x0 = (pts["D0_m"][0] if "D0_m" in pts else (pts["D0"][0] if "D0" in pts else pts["B0"][0]))
         x1 = x0 + TRAVERSIN_THK
-        _draw_traversin_block(t, tr, x0, y0, x1, y1); n += 1
+        _place_traversin_block(out, x0, y0, x1, y1, "g"); n += 1
     if "d" in traversins:
         # fin du dossier côté droit
         x1 = (pts["Dx_m"][0] if "Dx_m" in pts else (pts["Dx"][0] if "Dx" in pts else pts["Bx"][0]))
         x0 = x1 - TRAVERSIN_THK
-        _draw_traversin_block(t, tr, x0, y0, x1, y1); n += 1
+        _place_traversin_block(out, x0, y0, x1, y1, "d"); n += 1
     return n
 
-def _draw_traversins_L_like(t, tr, pts, profondeur, traversins):
+def _place_traversins_L_like(out, pts, profondeur, traversins):
     """
     Placement des TR pour les formes 'L-like' (LNF v1/v2, LF).
     - 'g'  (gauche, horizontal) : collé sur la FIN DE BANQUETTE gauche (segment By–By2, ignorer *_mer)
@@ -1076,7 +2588,7 @@ def _draw_traversins_L_like(t, tr, pts, profondeur, traversins):
         y_end = pts["By"][1] if "By" in pts else (F0y + profondeur)
         y0 = y_end - TRAVERSIN_THK
         y1 = y_end
-        _draw_traversin_block(t, tr, F0x, y0, F0x + depth_len, y1)
+        _place_traversin_block(out, F0x, y0, F0x + depth_len, y1, "g")
         n += 1
 
     # --- Bas (vertical) → FIN DE BANQUETTE (Bx2–Bx), pas fin de dossier ---
@@ -1093,7 +2605,7 @@ def _draw_traversins_L_like(t, tr, pts, profondeur, traversins):
 
         x0 = x_end - TRAVERSIN_THK
         x1 = x_end
-        _draw_traversin_block(t, tr, x0, F0y, x1, F0y + depth_len)
+        _place_traversin_block(out, x0, F0y, x1, F0y + depth_len, "b")
         n += 1
 
     return n
@@ -1101,7 +2613,7 @@ def _draw_traversins_L_like(t, tr, pts, profondeur, traversins):
 def _u_right_col_x(variant, pts):
     return pts["Bx"][0] if variant in ("v1","v4") else pts["F02"][0]
 
-def _draw_traversins_U_common(t, tr, variant, pts, profondeur, traversins):
+def _place_traversins_U_common(out, variant, pts, profondeur, traversins):
     """
     U v1..v4 : traversins STRICTEMENT sur les segments de dossier internes :
       - gauche  → segment By–By2
@@ -1121,7 +2633,7 @@ def _draw_traversins_U_common(t, tr, variant, pts, profondeur, traversins):
         x0, x1 = _clamp_to_segment(seg_min, depth_len, seg_min, seg_max, align="start")
         y0 = y_line - TRAVERSIN_THK
         y1 = y_line
-        _draw_traversin_block(t, tr, x0, y0, x1, y1)
+        _place_traversin_block(out, x0, y0, x1, y1, "g")
         n += 1
 
     # --- Droite : By3–By4 (alignement à la fin du segment)
@@ -1130,12 +2642,12 @@ def _draw_traversins_U_common(t, tr, variant, pts, profondeur, traversins):
         x0, x1 = _clamp_to_segment(seg_max, depth_len, seg_min, seg_max, align="end")
         y0 = y_line - TRAVERSIN_THK
         y1 = y_line
-        _draw_traversin_block(t, tr, x0, y0, x1, y1)
+        _place_traversin_block(out, x0, y0, x1, y1, "d")
         n += 1
 
     return n
 
-def _draw_traversins_U_side_F02(t, tr, pts, profondeur, traversins):
+def _place_traversins_U_side_F02(out, pts, profondeur, traversins):
     """
     U1F / U2f : traversins STRICTEMENT sur les segments de dossier internes :
       - gauche  → segment By–By2
@@ -1154,7 +2666,7 @@ def _draw_traversins_U_side_F02(t, tr, pts, profondeur, traversins):
         x0, x1 = _clamp_to_segment(seg_min, depth_len, seg_min, seg_max, align="start")
         y0 = y_line - TRAVERSIN_THK
         y1 = y_line
-        _draw_traversin_block(t, tr, x0, y0, x1, y1)
+        _place_traversin_block(out, x0, y0, x1, y1, "g")
         n += 1
 
     # --- Droite : By3–By4 (fin du segment)
@@ -1163,7 +2675,7 @@ def _draw_traversins_U_side_F02(t, tr, pts, profondeur, traversins):
         x0, x1 = _clamp_to_segment(seg_max, depth_len, seg_min, seg_max, align="end")
         y0 = y_line - TRAVERSIN_THK
         y1 = y_line
-        _draw_traversin_block(t, tr, x0, y0, x1, y1)
+        _place_traversin_block(out, x0, y0, x1, y1, "d")
         n += 1
 
     return n
@@ -1172,6 +2684,403 @@ def _draw_traversins_U_side_F02(t, tr, pts, profondeur, traversins):
 # ================  COUSSINS — moteur "valise" (utilitaires)  =========
 # =====================================================================
 
+# ----- Table précalculée : meilleure taille par (fenêtre, longueur) -----
+# Optionnelle : construite hors ligne (python -m canapematplot valise-lut
+# --out FICHIER) puis désignée par VALISE_LUT_FILE ; projetée en mémoire (mmap).
+# En-tête "<4s16sHHHH" : magic, empreinte du critère (source de
+# _waste_and_count_1d et _valise_window_pick, cf. _valise_lut_digest), première
+# et dernière fenêtre (taille basse lo), largeur de fenêtre, longueur maximale ;
+# puis un octet par (lo, longueur entière 0..L max) : la taille de
+# [lo, lo+largeur] minimisant (perte, -couverture, -taille). Une table dont
+# l'en-tête diffère (périmée) est ignorée : recherche directe.
+
+_VALISE_LUT_MAGIC = b"CVLT"
+_VALISE_LUT_HEADER = "<4s16sHHHH"
+_VALISE_LUT_WINDOWS = (60, 95)
+_VALISE_LUT_SPAN = 5
+_VALISE_LUT_MAX_LENGTH = 600
+_valise_lut_cache = None
+_valise_lut_digest_cache = None
+
+def _valise_window_pick(length, lo, hi):
+    """Taille de [lo, hi] minimisant (perte, -couverture, -taille) sur une branche, et cette clé."""
+    best = None
+    for size in range(lo, hi + 1):
+        n, w = _waste_and_count_1d(length, size)
+        key = (w, -n * size, -size)
+        if best is None or key < best:
+            best = key
+    return best
+
+def _valise_lut_digest():
+    """Empreinte (16 octets) du critère tabulé : la table suit le code qui l'a produite."""
+    global _valise_lut_digest_cache
+    if _valise_lut_digest_cache is None:
+        import hashlib
+        import inspect
+        import marshal
+
+        h = hashlib.sha256()
+        for fn in (_waste_and_count_1d, _valise_window_pick):
+            try:
+                h.update(inspect.getsource(fn).encode("utf-8"))
+            except (OSError, TypeError):
+                h.update(marshal.dumps(fn.__code__))
+        _valise_lut_digest_cache = h.digest()[:16]
+    return _valise_lut_digest_cache
+
+def _valise_lut_params():
+    lo_min, lo_max = _VALISE_LUT_WINDOWS
+    return (_VALISE_LUT_MAGIC, _valise_lut_digest(), lo_min, lo_max, _VALISE_LUT_SPAN, _VALISE_LUT_MAX_LENGTH)
+
+def build_valise_lut(path):
+    """
+    Génère la table des tailles valise dans `path` et retourne ce chemin
+    (à désigner ensuite par VALISE_LUT_FILE). Écriture atomique. Contenu :
+    cf. l'en-tête ci-dessus.
+    """
+    import os
+    import struct
+
+    magic, digest, lo_min, lo_max, span, max_len = _valise_lut_params()
+    data = bytearray()
+    for lo in range(lo_min, lo_max + 1):
+        for length in range(max_len + 1):
+            data.append(-_valise_window_pick(length, lo, lo + span)[2])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(struct.pack(_VALISE_LUT_HEADER, *_valise_lut_params()))
+        f.write(data)
+    os.replace(tmp, path)
+    return path
+
+def _valise_lut_open(path):
+    """(mmap, décalage des données) si le fichier porte exactement les paramètres attendus, sinon None."""
+    import mmap
+    import struct
+
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    offset = struct.calcsize(_VALISE_LUT_HEADER)
+    _magic, _digest, lo_min, lo_max, _span, max_len = params = _valise_lut_params()
+    if (len(mm) == offset + (lo_max - lo_min + 1) * (max_len + 1)
+            and struct.unpack_from(_VALISE_LUT_HEADER, mm) == params):
+        return mm, offset
+    mm.close()
+    return None
+
+def _valise_lut():
+    """
+    Table valise VALISE_LUT_FILE projetée en mémoire (mmap, lecture seule),
+    chargée une fois par chemin. Retourne (mmap, lo_min, lo_max, longueur
+    max, décalage des données), ou None si elle est désactivée, absente ou
+    périmée (avertissement sur stderr) : recherche directe. Rien n'est
+    jamais écrit ici.
+    """
+    global _valise_lut_cache
+    path = VALISE_LUT_FILE
+    if not path:
+        return None
+    if _valise_lut_cache is None or _valise_lut_cache[0] != path:
+        lut = None
+        opened = _valise_lut_open(path)
+        if opened is None:
+            import sys
+            print(f"Table valise {path!r} absente ou périmée : recherche directe "
+                  f"(cf. python -m canapematplot valise-lut).", file=sys.stderr)
+        else:
+            lo_min, lo_max = _VALISE_LUT_WINDOWS
+            lut = (opened[0], lo_min, lo_max, _VALISE_LUT_MAX_LENGTH, opened[1])
+        _valise_lut_cache = (path, lut)
+    return _valise_lut_cache[1]
+
+def _valise_window_picks(rng, lengths_by_shift):
+    """
+    Tailles (une par branche, ordre bas, gauche[, droite]) qu'élit la
+    recherche exhaustive des optimiseurs valise, sans parcourir le produit
+    cartésien des tailles.
+
+    lengths_by_shift : longueurs utiles des branches pour chaque décalage.
+    La perte d'une branche ne dépend que de sa taille et de sa longueur : on
+    tabule une fois (perte, couverture) par longueur et par taille. Les
+    combinaisons admissibles (Δ ≤ 5) sont celles d'une fenêtre [lo, lo+5] ;
+    dans chaque fenêtre, chaque branche prend sa taille minimisant
+    (perte, -couverture, -taille). Tailles entières : deux pertes distinctes
+    d'une même branche diffèrent d'au moins 1 cm, donc la perte totale est
+    minimale si et seulement si celle de chaque branche l'est, et le départage
+    (waste, -cover, -sb, -sg, -sd) reste celui de la boucle complète.
+    Coût : O(R × branches × décalages) au lieu de O(R³ × décalages).
+
+    La taille élue par fenêtre vient de la table précalculée (_valise_lut)
+    pour une longueur entière couverte ; sinon elle est recherchée ici.
+    Génère (score, tailles) pour chaque décalage et chaque fenêtre ;
+    _valise_window_search en retient le minimum.
+    """
+    r0, r1 = rng
+    if r1 < r0:
+        return
+    windows = [(lo, min(lo + 5, r1)) for lo in range(r0, max(r0, r1 - 5) + 1)]
+    lut = _valise_lut()
+    if lut is not None:
+        mm, lo_min, lo_max, max_len, offset = lut
+        if r1 - r0 < 5 or r0 < lo_min or r1 - 5 > lo_max:
+            lut = None
+    picks_by_length = {}
+    for lengths in lengths_by_shift:
+        rows = []
+        for L in lengths:
+            if L not in picks_by_length:
+                if lut is not None and L == int(L) and L <= max_len:
+                    row = []
+                    for lo, _hi in windows:
+                        size = mm[offset + (lo - lo_min) * (max_len + 1) + int(L)]
+                        n, w = _waste_and_count_1d(L, size)
+                        row.append((w, -n * size, -size))
+                else:
+                    row = [_valise_window_pick(L, lo, hi) for lo, hi in windows]
+                picks_by_length[L] = row
+            rows.append(picks_by_length[L])
+        for picks in zip(*rows):
+            waste = 0
+            cover = 0
+            for w, neg_cover, _neg_size in picks:
+                waste = waste + w
+                cover = cover - neg_cover
+            yield (waste, -cover) + tuple(p[2] for p in picks), tuple(-p[2] for p in picks)
+
+def _valise_window_search(rng, lengths_by_shift):
+    """Meilleure combinaison de _valise_window_picks (la première à score égal), ou None."""
+    best = None
+    for score, sizes in _valise_window_picks(rng, lengths_by_shift):
+        if best is None or score < best[0]:
+            best = (score, sizes)
+    return best and best[1]
+
+def _valise_product_np(np, rng, lengths_by_shift):
+    """
+    Produit cartésien complet en tableaux : toutes les combinaisons (une
+    taille par branche, masque Δ ≤ 5) évaluées sur chaque décalage avec les
+    mêmes opérations flottantes que _waste_and_count_1d. Pour chaque
+    combinaison, garde le décalage que retiendrait l'optimiseur (premier
+    minimum de (waste, -cover)). Retourne (tailles par branche, waste,
+    cover, nombre de coussins), ou None si aucune combinaison.
+    """
+    r0, r1 = rng
+    nbranches = len(lengths_by_shift[0])
+    sizes = np.arange(r0, r1 + 1, dtype=np.int64)
+    combo = [a.ravel() for a in np.meshgrid(*([sizes] * nbranches), indexing="ij")]
+    keep = np.max(combo, axis=0) - np.min(combo, axis=0) <= 5
+    combo = [a[keep] for a in combo]
+    if not len(combo[0]):
+        return None
+    waste, cover, count = [], [], []
+    for lengths in lengths_by_shift:
+        w_tot, c_tot, n_tot = None, 0, 0
+        for L, s in zip(lengths, combo):
+            n = np.floor_divide(L, s) if L > 0 else np.zeros_like(s)
+            w = L - n * s
+            w_tot = w if w_tot is None else w_tot + w
+            c_tot = c_tot + n.astype(np.int64) * s
+            n_tot = n_tot + n.astype(np.int64)
+        waste.append(np.broadcast_to(w_tot, combo[0].shape))
+        cover.append(np.broadcast_to(c_tot, combo[0].shape))
+        count.append(np.broadcast_to(n_tot, combo[0].shape))
+    waste, cover, count = np.array(waste, dtype=float), np.array(cover), np.array(count)
+    tie = waste == waste.min(axis=0)
+    tie &= cover == np.where(tie, cover, -1).max(axis=0)
+    shift = np.argmax(tie, axis=0)
+    cols = np.arange(len(shift))
+    return combo, waste[shift, cols], cover[shift, cols], count[shift, cols]
+
+def _valise_product_search_np(np, rng, lengths_by_shift):
+    """
+    Tailles qu'élirait le produit cartésien complet : minimum lexicographique
+    de (waste, -cover, -sb, -sg[, -sd]) sur _valise_product_np. None si aucune.
+    Chemin de référence (VALISE_DECOMPOSED faux) : la recherche par branche,
+    utilisée par défaut, doit élire la même combinaison ; les deux sont
+    comparées à la boucle Python par python benchmark.py --valise-check.
+    """
+    prod = _valise_product_np(np, rng, lengths_by_shift)
+    if prod is None:
+        return None
+    combo, waste, cover, _count = prod
+    i = np.lexsort(tuple(-a for a in reversed(combo)) + (-cover, waste))[0]
+    return tuple(int(a[i]) for a in combo)
+
+def _valise_product_topk_np(np, rng, lengths_by_shift, k):
+    """
+    Combinaisons à évaluer pour des alternatives exactes : réunion des k
+    premières du produit complet selon chaque critère de _valise_alt_push
+    (perte, nombre de coussins, écart de tailles, départagés par le score).
+    """
+    prod = _valise_product_np(np, rng, lengths_by_shift)
+    if prod is None:
+        return []
+    combo, waste, cover, count = prod
+    score = tuple(-a for a in reversed(combo)) + (-cover, waste)
+    spread = np.max(combo, axis=0) - np.min(combo, axis=0)
+    cands = {}
+    for keys in (score, score + (count,), score + (spread,)):
+        for i in np.lexsort(keys)[:k]:
+            cands[tuple(int(a[i]) for a in combo)] = None
+    return list(cands)
+
+def _valise_candidates(rng, same, lengths_by_shift, alternatives=0):
+    """
+    Combinaisons (bas, gauche[, droite]) évaluées par un optimiseur valise :
+    same → la même taille sur toutes les branches ; sinon la combinaison
+    élue par _valise_window_search, ou, si VALISE_DECOMPOSED est faux, celle
+    du produit cartésien complet (_valise_product_search_np, ou à défaut de
+    NumPy tout le produit dans l'ordre historique : gauche, bas, droite).
+    Avec k alternatives demandées, le classement doit être exact : on
+    évalue la réunion des k premières combinaisons du produit complet selon
+    chaque critère (_valise_product_topk_np), ou à défaut de NumPy tout le
+    produit. L'élu global en fait partie : le meilleur résultat ne change pas.
+    """
+    r0, r1 = rng
+    nbranches = len(lengths_by_shift[0])
+    if same:
+        return [(s,) * nbranches for s in range(r0, r1 + 1)]
+    np = _import_numpy()
+    if alternatives:
+        if np is not None:
+            return _valise_product_topk_np(np, rng, lengths_by_shift, alternatives)
+    elif VALISE_DECOMPOSED:
+        choice = _valise_window_search(rng, lengths_by_shift)
+        return [choice] if choice else []
+    elif np is not None:
+        choice = _valise_product_search_np(np, rng, lengths_by_shift)
+        return [choice] if choice else []
+    sizes = range(r0, r1 + 1)
+    if nbranches == 2:
+        return [(sb, sg) for sg in sizes for sb in sizes]
+    return [(sb, sg, sd) for sg in sizes for sb in sizes for sd in sizes]
+
+# ----- Alternatives valise : k meilleures par critère, en une passe -----
+# Critères : perte minimale (le score historique), moins de coussins, tailles
+# les plus proches (écart max - min). Un tas borné à k par critère suffit.
+_VALISE_ALT_CRITERIA = ("waste", "count", "same")
+
+def _valise_alt(score, sizes, e, **shifts):
+    """Alternative d'un optimiseur valise : combinaison évaluée e et son décalage (mêmes clés que best)."""
+    alt = {"score": score, "sizes": sizes, "counts": e["counts"],
+           "count": sum(e["counts"].values()), "waste": e["waste"], "cover": e["cover"],
+           "spread": max(sizes.values()) - min(sizes.values())}
+    alt.update(shifts)
+    return alt
+
+def _valise_alt_push(heaps, k, alt):
+    """Range alt dans le tas borné (k éléments) de chaque critère ; le pire en sort."""
+    for crit in _VALISE_ALT_CRITERIA:
+        if crit == "count":
+            key = (alt["count"],) + alt["score"]
+        elif crit == "same":
+            key = (alt["spread"],) + alt["score"]
+        else:
+            key = alt["score"]
+        # tas min sur la clé opposée : heap[0] est la pire des k retenues
+        item = (tuple(-x for x in key), alt["score"], alt)
+        heap = heaps.setdefault(crit, [])
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item[0] > heap[0][0]:
+            heapq.heapreplace(heap, item)
+
+def _valise_alternatives(heaps, k):
+    """
+    Jusqu'à k alternatives, sans doublon : la meilleure de chaque critère,
+    puis les suivantes, à tour de rôle. Chacune porte son "criterion".
+    """
+    ranked = {crit: [item[2] for item in sorted(heaps.get(crit, []), key=lambda it: it[0], reverse=True)]
+              for crit in _VALISE_ALT_CRITERIA}
+    out, seen = [], set()
+    for rank in range(k):
+        for crit in _VALISE_ALT_CRITERIA:
+            if rank < len(ranked[crit]) and len(out) < k:
+                alt = ranked[crit][rank]
+                if alt["score"] not in seen:
+                    seen.add(alt["score"])
+                    out.append(dict(alt, criterion=crit))
+    return out
+
+def _cushion_run(size, start, end):
+    """
+    Coussins d'une ligne [start, end] : couples (position, taille).
+    size entier → cette taille autant de fois que possible ; séquence (mode
+    mix) → ces tailles dans l'ordre, tant qu'elles tiennent.
+    """
+    pos = start
+    for s in (size if isinstance(size, (list, tuple)) else itertools.repeat(size)):
+        if pos + s > end + 1e-6:
+            break
+        yield pos, s
+        pos += s
+
+# ----- Mode mix : remplissage d'une branche par tailles du catalogue -----
+_mix_tables = {}
+
+def _mix_table(catalogue, cap):
+    """
+    Sac à dos non borné : table[c] = combinaison de tailles (décroissantes)
+    de somme exactement c, la plus courte puis aux plus grandes tailles ; None
+    si c n'est pas atteignable. Étendue à la demande, une table par catalogue.
+    """
+    table = _mix_tables.get(catalogue, [()])
+    if len(table) <= cap:
+        table = list(table)
+        for c in range(len(table), cap + 1):
+            best = None
+            for s in catalogue:
+                if s <= c and table[c - s] is not None:
+                    cand = tuple(sorted(table[c - s] + (s,), reverse=True))
+                    if best is None or (len(cand), [-x for x in cand]) < (len(best), [-x for x in best]):
+                        best = cand
+            table.append(best)
+        _mix_tables[catalogue] = table
+    return table
+
+def _mix_fill_1d(length, catalogue=CUSHION_CATALOGUE):
+    """Retourne (tailles, waste) : le mélange de perte minimale sur 'length' (cm entiers)."""
+    if length <= 0:
+        return (), max(0, length)
+    cap = int(length + 1e-6)
+    table = _mix_table(catalogue, cap)
+    for c in range(cap, -1, -1):
+        if table[c] is not None:
+            return table[c], length - c
+    return (), length
+
+def _optimize_mix(lengths_by_shift, catalogue=CUSHION_CATALOGUE):
+    """
+    Mode mix : pour chaque décalage (longueurs des branches bas, gauche[,
+    droite]), chaque branche reçoit son mélange de perte minimale ; retient
+    le décalage de perte totale minimale, puis au moins de coussins.
+    Retourne {"score", "shift" (indice dans lengths_by_shift), "sizes"}.
+    """
+    best = None
+    for k, lengths in enumerate(lengths_by_shift):
+        fills = [_mix_fill_1d(L, catalogue) for L in lengths]
+        waste = 0
+        for _sizes, w in fills:
+            waste = waste + w
+        score = (waste, sum(len(f[0]) for f in fills))
+        if best is None or score < best["score"]:
+            best = {"score": score, "shift": k, "sizes": [list(f[0]) for f in fills]}
+    return best
+
+def _format_mix_counts_console(cushions):
+    """Affichage console *mix* : quantités par taille, décroissantes. Ex. "2x90 / 1x65 - total 3"."""
+    agg = {}
+    for c in cushions:
+        agg[c["size"]] = agg.get(c["size"], 0) + 1
+    parts = [f"{agg[size]}x{size}" for size in sorted(agg, reverse=True)]
+    total = f"- total {len(cushions)}"
+    return f"{' / '.join(parts)} {total}" if parts else total
+
 def _apply_traversin_limits_L_like(pts, x_end_key, y_end_key, traversins):
     x_end = _lim_x(pts, x_end_key); y_end = _lim_y(pts, y_end_key)
     if traversins:
@@ -1179,7 +3088,8 @@ def _apply_traversin_limits_L_like(pts, x_end_key, y_end_key, traversins):
         if "g" in traversins: y_end -= TRAVERSIN_THK
     return x_end, y_end
 
-def _eval_L_like_counts(pts, size_bas, size_g, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
+def _L_like_rows(pts, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
+    """Lignes bas/gauche d'un L pour un décalage : géométrie et longueurs utiles."""
     F0x, F0y = pts["F0"]
     x_end, y_end = _apply_traversin_limits_L_like(pts, x_end_key, y_end_key, traversins)
 
@@ -1187,9 +3097,10 @@ def _eval_L_like_counts(pts, size_bas, size_g, shift_bas, x_end_key="Bx", y_end_
     xe = x_end
     y0 = F0y + (0 if shift_bas else CUSHION_DEPTH)
     ye = y_end
+    return {"xs": xs, "xe": xe, "y0": y0, "ye": ye}, (max(0, xe - xs), max(0, ye - y0))
 
-    len_b = max(0, xe - xs)
-    len_g = max(0, ye - y0)
+def _eval_L_like_counts(pts, size_bas, size_g, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
+    geom, (len_b, len_g) = _L_like_rows(pts, shift_bas, x_end_key, y_end_key, traversins)
 
     nb_b, wb = _waste_and_count_1d(len_b, size_bas)
     nb_g, wg = _waste_and_count_1d(len_g, size_g)
@@ -1199,56 +3110,66 @@ def _eval_L_like_counts(pts, size_bas, size_g, shift_bas, x_end_key="Bx", y_end_
         "counts": {"bas": nb_b, "gauche": nb_g},
         "waste": waste_tot,
         "cover": cover,
-        "geom": {"xs": xs, "xe": xe, "y0": y0, "ye": ye}
+        "geom": geom
     }
 
-def _optimize_valise_L_like(pts, rng, same, x_end_key="Bx", y_end_key="By", traversins=None):
-    best = None
-    r0, r1 = rng
-    for size_g in range(r0, r1+1):
-        cand_b = [size_g] if same else range(r0, r1+1)
-        for size_b in cand_b:
-            if abs(size_b - size_g) > 5:
-                continue
-            eval_A = _eval_L_like_counts(pts, size_b, size_g, shift_bas=False, x_end_key=x_end_key, y_end_key=y_end_key, traversins=traversins)
-            eval_B = _eval_L_like_counts(pts, size_b, size_g, shift_bas=True,  x_end_key=x_end_key, y_end_key=y_end_key, traversins=traversins)
-            e = min([eval_A, eval_B], key=lambda E: (E["waste"], -E["cover"], -size_b, -size_g))
-            score = (e["waste"], -e["cover"], -size_b, -size_g)
-            if (best is None) or (score < best["score"]):
-                best = {"score": score, "sizes": {"bas": size_b, "gauche": size_g}, "eval": e,
-                        "shift_bas": (e is eval_B)}
+def _optimize_valise_L_like(pts, rng, same, x_end_key="Bx", y_end_key="By", traversins=None, alternatives=0):
+    best = None; heaps = {}
+    lengths = [_L_like_rows(pts, sh, x_end_key, y_end_key, traversins)[1] for sh in (False, True)]
+    for size_b, size_g in _valise_candidates(rng, same, lengths, alternatives):
+        if abs(size_b - size_g) > 5:
+            continue
+        eval_A = _eval_L_like_counts(pts, size_b, size_g, shift_bas=False, x_end_key=x_end_key, y_end_key=y_end_key, traversins=traversins)
+        eval_B = _eval_L_like_counts(pts, size_b, size_g, shift_bas=True,  x_end_key=x_end_key, y_end_key=y_end_key, traversins=traversins)
+        e = min([eval_A, eval_B], key=lambda E: (E["waste"], -E["cover"], -size_b, -size_g))
+        score = (e["waste"], -e["cover"], -size_b, -size_g)
+        if alternatives:
+            _valise_alt_push(heaps, alternatives, _valise_alt(score, {"bas": size_b, "gauche": size_g}, e,
+                                                              shift_bas=(e is eval_B)))
+        if (best is None) or (score < best["score"]):
+            best = {"score": score, "sizes": {"bas": size_b, "gauche": size_g}, "eval": e,
+                    "shift_bas": (e is eval_B)}
+    if best and alternatives:
+        best["alternatives"] = _valise_alternatives(heaps, alternatives)
     return best
 
-def _draw_L_like_with_sizes(t, tr, pts, sizes, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
+def _place_L_like_with_sizes(out, pts, sizes, shift_bas, x_end_key="Bx", y_end_key="By", traversins=None):
     F0x, F0y = pts["F0"]
     x_end, y_end = _apply_traversin_limits_L_like(pts, x_end_key, y_end_key, traversins)
 
     # bas
     xs = F0x + (CUSHION_DEPTH if shift_bas else 0)
     xe = x_end; yb = F0y
-    nb = 0; x = xs
+    nb = 0
     sb = sizes["bas"]
-    while x + sb <= xe + 1e-6:
-        poly = [(x,yb), (x+sb,yb), (x+sb,yb+CUSHION_DEPTH), (x,yb+CUSHION_DEPTH), (x,yb)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
-        label_poly(t, tr, poly, f"{sb}", font=FONT_CUSHION)
-        x += sb; nb += 1
+    for x, s in _cushion_run(sb, xs, xe):
+        poly = [(x,yb), (x+s,yb), (x+s,yb+CUSHION_DEPTH), (x,yb+CUSHION_DEPTH), (x,yb)]
+        out.append({"poly": poly, "size": s, "side": "bas"})
+        nb += 1
 
     # gauche
     yg0 = F0y + (0 if shift_bas else CUSHION_DEPTH)
     yg1 = y_end; xg = F0x
-    ng = 0; y = yg0
+    ng = 0
     sg = sizes["gauche"]
-    while y + sg <= yg1 + 1e-6:
-        poly = [(xg,y), (xg+CUSHION_DEPTH,y), (xg+CUSHION_DEPTH,y+sg), (xg,y+sg), (xg,y)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
-        label_poly(t, tr, poly, f"{sg}", font=FONT_CUSHION)
-        y += sg; ng += 1
+    for y, s in _cushion_run(sg, yg0, yg1):
+        poly = [(xg,y), (xg+CUSHION_DEPTH,y), (xg+CUSHION_DEPTH,y+s), (xg,y+s), (xg,y)]
+        out.append({"poly": poly, "size": s, "side": "gauche"})
+        ng += 1
 
     return nb + ng, sb, sg
 
-# ----- U2f : évaluation / dessin -----
-def _eval_U2f_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
+def _place_L_like_mix(out, pts, catalogue, x_end_key="Bx", y_end_key="By", traversins=None):
+    """Mode mix d'un L : mélange par branche (cf. _optimize_mix), posé comme en valise."""
+    lengths = [_L_like_rows(pts, sh, x_end_key, y_end_key, traversins)[1] for sh in (False, True)]
+    best = _optimize_mix(lengths, catalogue)
+    sizes = {"bas": best["sizes"][0], "gauche": best["sizes"][1]}
+    n, _sb, _sg = _place_L_like_with_sizes(out, pts, sizes, best["shift"] == 1, x_end_key, y_end_key, traversins)
+    return n
+
+# ----- U2f : évaluation / placement -----
+def _U2f_rows(pts, shiftL, shiftR, traversins=None):
+    """Lignes bas/gauche/droite d'un U2f pour un décalage : géométrie et longueurs utiles."""
     F0x, F0y = pts["F0"]
     F02x = pts["F02"][0]
     y_end_L = pts.get("By_", pts["By"])[1]
@@ -1261,10 +3182,11 @@ def _eval_U2f_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
     xe = F02x - (CUSHION_DEPTH if shiftR else 0)
     yL0 = F0y + (0 if shiftL else CUSHION_DEPTH)
     yR0 = F0y + (0 if shiftR else CUSHION_DEPTH)
+    return ({"xs": xs, "xe": xe, "yL0": yL0, "yR0": yR0},
+            (max(0, xe - xs), max(0, y_end_L - yL0), max(0, y_end_R - yR0)))
 
-    len_b = max(0, xe - xs)
-    len_g = max(0, y_end_L - yL0)
-    len_d = max(0, y_end_R - yR0)
+def _eval_U2f_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
+    geom, (len_b, len_g, len_d) = _U2f_rows(pts, shiftL, shiftR, traversins)
 
     nb, wb = _waste_and_count_1d(len_b, sb)
     ng, wg = _waste_and_count_1d(len_g, sg)
@@ -1273,25 +3195,29 @@ def _eval_U2f_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
     cover = nb*sb + ng*sg + nd*sd
     return {"counts": {"bas": nb, "gauche": ng, "droite": nd},
             "waste": waste, "cover": cover,
-            "geom": {"xs": xs, "xe": xe, "yL0": yL0, "yR0": yR0}}
-
-def _optimize_valise_U2f(pts, rng, same, traversins=None):
-    best=None; r0,r1=rng
-    for sg in range(r0, r1+1):
-        cand_b = [sg] if same else range(r0, r1+1)
-        for sb in cand_b:
-            cand_d = [sg] if same else range(r0, r1+1)
-            for sd in cand_d:
-                if max(sb, sg, sd) - min(sb, sg, sd) > 5:
-                    continue
-                E = []
-                for sl in (False, True):
-                    for sr in (False, True):
-                        E.append(_eval_U2f_counts(pts, sb, sg, sd, sl, sr, traversins=traversins))
-                e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
-                score = (e["waste"], -e["cover"], -sb, -sg, -sd)
-                if (best is None) or (score < best["score"]):
-                    best = {"score": score, "sizes": {"bas": sb, "gauche": sg, "droite": sd}, "eval": e}
+            "geom": geom}
+
+def _optimize_valise_U2f(pts, rng, same, traversins=None, alternatives=0):
+    best=None; heaps={}
+    shifts = [(sl, sr) for sl in (False, True) for sr in (False, True)]
+    lengths = [_U2f_rows(pts, sl, sr, traversins)[1] for sl, sr in shifts]
+    for sb, sg, sd in _valise_candidates(rng, same, lengths, alternatives):
+        if max(sb, sg, sd) - min(sb, sg, sd) > 5:
+            continue
+        E = []
+        for sl in (False, True):
+            for sr in (False, True):
+                E.append(_eval_U2f_counts(pts, sb, sg, sd, sl, sr, traversins=traversins))
+        e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
+        score = (e["waste"], -e["cover"], -sb, -sg, -sd)
+        if alternatives:
+            sl, sr = shifts[[x is e for x in E].index(True)]
+            _valise_alt_push(heaps, alternatives, _valise_alt(score, {"bas": sb, "gauche": sg, "droite": sd}, e,
+                                                              shiftL=sl, shiftR=sr))
+        if (best is None) or (score < best["score"]):
+            best = {"score": score, "sizes": {"bas": sb, "gauche": sg, "droite": sd}, "eval": e}
+    if best and alternatives:
+        best["alternatives"] = _valise_alternatives(heaps, alternatives)
     if best:
         chosen = best["eval"]
         for sl in (False, True):
@@ -1302,7 +3228,7 @@ def _optimize_valise_U2f(pts, rng, same, traversins=None):
                     return best
     return best
 
-def _draw_U2f_with_sizes(t, tr, pts, sizes, shiftL, shiftR, traversins=None):
+def _place_U2f_with_sizes(out, pts, sizes, shiftL, shiftR, traversins=None):
     F0x, F0y = pts["F0"]
     F02x = pts["F02"][0]
     y_end_L = pts.get("By_", pts["By"])[1]
@@ -1314,34 +3240,37 @@ def _draw_U2f_with_sizes(t, tr, pts, sizes, shiftL, shiftR, traversins=None):
     # Bas
     xs = F0x + (CUSHION_DEPTH if shiftL else 0)
     xe = F02x - (CUSHION_DEPTH if shiftR else 0)
-    yb = F0y; sb = sizes["bas"]; nb=0; x=xs
-    while x + sb <= xe + 1e-6:
-        poly=[(x,yb),(x+sb,yb),(x+sb,yb+CUSHION_DEPTH),(x,yb+CUSHION_DEPTH),(x,yb)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{sb}",font=FONT_CUSHION)
-        x+=sb; nb+=1
+    yb = F0y; nb=0
+    for x, s in _cushion_run(sizes["bas"], xs, xe):
+        poly=[(x,yb),(x+s,yb),(x+s,yb+CUSHION_DEPTH),(x,yb+CUSHION_DEPTH),(x,yb)]
+        out.append({"poly": poly, "size": s, "side": "bas"})
+        nb+=1
 
     # Gauche
     yL0 = F0y + (0 if shiftL else CUSHION_DEPTH)
-    xg = F0x; sg = sizes["gauche"]; ng=0; y=yL0
-    while y + sg <= y_end_L + 1e-6:
-        poly=[(xg,y),(xg+CUSHION_DEPTH,y),(xg+CUSHION_DEPTH,y+sg),(xg,y+sg),(xg,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{sg}",font=FONT_CUSHION)
-        y+=sg; ng+=1
+    xg = F0x; ng=0
+    for y, s in _cushion_run(sizes["gauche"], yL0, y_end_L):
+        poly=[(xg,y),(xg+CUSHION_DEPTH,y),(xg+CUSHION_DEPTH,y+s),(xg,y+s),(xg,y)]
+        out.append({"poly": poly, "size": s, "side": "gauche"})
+        ng+=1
 
     # Droite
     yR0 = F0y + (0 if shiftR else CUSHION_DEPTH)
-    xr = F02x; sd = sizes["droite"]; nd=0; y=yR0
-    while y + sd <= y_end_R + 1e-6:
-        poly=[(xr-CUSHION_DEPTH,y),(xr,y),(xr,y+sd),(xr-CUSHION_DEPTH,y+sd),(xr-CUSHION_DEPTH,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{sd}",font=FONT_CUSHION)
-        y+=sd; nd+=1
+    xr = F02x; nd=0
+    for y, s in _cushion_run(sizes["droite"], yR0, y_end_R):
+        poly=[(xr-CUSHION_DEPTH,y),(xr,y),(xr,y+s),(xr-CUSHION_DEPTH,y+s),(xr-CUSHION_DEPTH,y)]
+        out.append({"poly": poly, "size": s, "side": "droite"})
+        nd+=1
 
     return nb+ng+nd
 
-def _draw_cushions_U2f_optimized(t, tr, pts, size, traversins=None):
+def _place_U2f_mix(out, pts, catalogue, traversins=None):
+    shifts = [(sl, sr) for sl in (False, True) for sr in (False, True)]
+    best = _optimize_mix([_U2f_rows(pts, sl, sr, traversins)[1] for sl, sr in shifts], catalogue)
+    sizes = dict(zip(("bas", "gauche", "droite"), best["sizes"]))
+    return _place_U2f_with_sizes(out, pts, sizes, *shifts[best["shift"]], traversins=traversins)
+
+def _place_cushions_U2f_optimized(out, pts, size, traversins=None):
     F0x, F0y = pts["F0"]
     F02x = pts["F02"][0]
     y_end_L = pts.get("By_", pts["By"])[1]
@@ -1375,27 +3304,25 @@ def _draw_cushions_U2f_optimized(t, tr, pts, size, traversins=None):
     y, x = F0y, xs
     while x + size <= xe + 1e-6:
         poly = [(x,y),(x+size,y),(x+size,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "bas"})
         x += size; count += 1
     # Gauche
     x, y = F0x, yL0
     while y + size <= y_end_L + 1e-6:
         poly = [(x,y),(x+CUSHION_DEPTH,y),(x+CUSHION_DEPTH,y+size),(x,y+size),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "gauche"})
         y += size; count += 1
     # Droite
     x, y = F02x, yR0
     while y + size <= y_end_R + 1e-6:
         poly = [(x-CUSHION_DEPTH,y),(x,y),(x,y+size),(x-CUSHION_DEPTH,y+size),(x-CUSHION_DEPTH,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "droite"})
         y += size; count += 1
     return count
 
-# ----- U1F : évaluation / dessin -----
-def _eval_U1F_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
+# ----- U1F : évaluation / placement -----
+def _U1F_branch_lengths(pts, shiftL, shiftR, traversins=None):
+    """Longueurs utiles (bas, gauche, droite) des lignes de coussins d'un U1F pour un décalage."""
     F0x, F0y = pts["F0"]; F02x = pts["F02"][0]
     y_end_L = pts["By_cush"][1]; y_end_R = pts["By4_cush"][1]
     if traversins:
@@ -1405,28 +3332,36 @@ def _eval_U1F_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
     xe = F02x - (CUSHION_DEPTH if shiftR else 0)
     yL0 = F0y + (0 if shiftL else CUSHION_DEPTH)
     yR0 = F0y + (0 if shiftR else CUSHION_DEPTH)
-    len_b = max(0, xe-xs); len_g=max(0, y_end_L-yL0); len_d=max(0, y_end_R-yR0)
+    return max(0, xe-xs), max(0, y_end_L-yL0), max(0, y_end_R-yR0)
+
+def _eval_U1F_counts(pts, sb, sg, sd, shiftL, shiftR, traversins=None):
+    len_b, len_g, len_d = _U1F_branch_lengths(pts, shiftL, shiftR, traversins)
     nb, wb = _waste_and_count_1d(len_b, sb)
     ng, wg = _waste_and_count_1d(len_g, sg)
     nd, wd = _waste_and_count_1d(len_d, sd)
     waste = wb+wg+wd; cover=nb*sb+ng*sg+nd*sd
     return {"counts":{"bas":nb,"gauche":ng,"droite":nd},"waste":waste,"cover":cover}
 
-def _optimize_valise_U1F(pts, rng, same, traversins=None):
-    best=None; r0,r1=rng
-    for sg in range(r0,r1+1):
-        for sb in ([sg] if same else range(r0,r1+1)):
-            for sd in ([sg] if same else range(r0,r1+1)):
-                if max(sb,sg,sd)-min(sb,sg,sd) > 5:
-                    continue
-                E=[]
-                for sl in (False,True):
-                    for sr in (False,True):
-                        E.append(_eval_U1F_counts(pts,sb,sg,sd,sl,sr,traversins=traversins))
-                e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
-                score=(e["waste"], -e["cover"], -sb, -sg, -sd)
-                if (best is None) or (score < best["score"]):
-                    best={"score":score, "sizes":{"bas":sb,"gauche":sg,"droite":sd}, "shifts":("?", "?")}
+def _optimize_valise_U1F(pts, rng, same, traversins=None, alternatives=0):
+    best=None; heaps={}
+    shifts = [(sl, sr) for sl in (False,True) for sr in (False,True)]
+    lengths = [_U1F_branch_lengths(pts, sl, sr, traversins) for sl, sr in shifts]
+    for sb, sg, sd in _valise_candidates(rng, same, lengths, alternatives):
+        if max(sb,sg,sd)-min(sb,sg,sd) > 5:
+            continue
+        E=[]
+        for sl in (False,True):
+            for sr in (False,True):
+                E.append(_eval_U1F_counts(pts,sb,sg,sd,sl,sr,traversins=traversins))
+        e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
+        score=(e["waste"], -e["cover"], -sb, -sg, -sd)
+        if alternatives:
+            _valise_alt_push(heaps, alternatives, _valise_alt(score, {"bas":sb,"gauche":sg,"droite":sd}, e,
+                                                              shifts=shifts[[x is e for x in E].index(True)]))
+        if (best is None) or (score < best["score"]):
+            best={"score":score, "sizes":{"bas":sb,"gauche":sg,"droite":sd}, "shifts":("?", "?")}
+    if best and alternatives:
+        best["alternatives"] = _valise_alternatives(heaps, alternatives)
     # Retrouver shifts exacts
     if best:
         tgt = best["score"]
@@ -1438,7 +3373,7 @@ def _optimize_valise_U1F(pts, rng, same, traversins=None):
                     best["shifts"]=(sl,sr); break
     return best
 
-def _draw_U1F_with_sizes(t,tr,pts,sizes,shiftL,shiftR,traversins=None):
+def _place_U1F_with_sizes(out,pts,sizes,shiftL,shiftR,traversins=None):
     F0x, F0y = pts["F0"]; F02x=pts["F02"][0]
     y_end_L = pts["By_cush"][1]; y_end_R=pts["By4_cush"][1]
     if traversins:
@@ -1448,46 +3383,45 @@ def _draw_U1F_with_sizes(t,tr,pts,sizes,shiftL,shiftR,traversins=None):
     # Bas
     xs = F0x + (CUSHION_DEPTH if shiftL else 0)
     xe = F02x - (CUSHION_DEPTH if shiftR else 0)
-    sb=sizes["bas"]; nb=0; x=xs; y=F0y
-    while x + sb <= xe + 1e-6:
-        poly=[(x,y),(x+sb,y),(x+sb,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{sb}",font=FONT_CUSHION)
-        nb+=1; x+=sb
+    nb=0; y=F0y
+    for x, s in _cushion_run(sizes["bas"], xs, xe):
+        poly=[(x,y),(x+s,y),(x+s,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
+        out.append({"poly": poly, "size": s, "side": "bas"})
+        nb+=1
 
     # Gauche
     yL0 = F0y + (0 if shiftL else CUSHION_DEPTH)
-    sg=sizes["gauche"]; ng=0; xg=F0x; y_=yL0
-    while y_ + sg <= y_end_L + 1e-6:
-        poly=[(xg,y_),(xg+CUSHION_DEPTH,y_),(xg+CUSHION_DEPTH,y_+sg),(xg,y_+sg),(xg,y_)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{sg}",font=FONT_CUSHION)
-        ng+=1; y_+=sg
+    ng=0; xg=F0x
+    for y_, s in _cushion_run(sizes["gauche"], yL0, y_end_L):
+        poly=[(xg,y_),(xg+CUSHION_DEPTH,y_),(xg+CUSHION_DEPTH,y_+s),(xg,y_+s),(xg,y_)]
+        out.append({"poly": poly, "size": s, "side": "gauche"})
+        ng+=1
 
     # Droite
     yR0 = F0y + (0 if shiftR else CUSHION_DEPTH)
-    sd=sizes["droite"]; nd=0; xr=F02x; y_=yR0
-    while y_ + sd <= y_end_R + 1e-6:
-        poly=[(xr-CUSHION_DEPTH,y_),(xr,y_),(xr,y_+sd),(xr-CUSHION_DEPTH,y_+sd),(xr-CUSHION_DEPTH,y_)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{sd}",font=FONT_CUSHION)
-        nd+=1; y_+=sd
+    nd=0; xr=F02x
+    for y_, s in _cushion_run(sizes["droite"], yR0, y_end_R):
+        poly=[(xr-CUSHION_DEPTH,y_),(xr,y_),(xr,y_+s),(xr-CUSHION_DEPTH,y_+s),(xr-CUSHION_DEPTH,y_)]
+        out.append({"poly": poly, "size": s, "side": "droite"})
+        nd+=1
 
     return nb+ng+nd
 
-# ----- U (no fromage) : fonctions de choix et dessin coussins -----
+def _place_U1F_mix(out, pts, catalogue, traversins=None):
+    shifts = [(sl, sr) for sl in (False, True) for sr in (False, True)]
+    best = _optimize_mix([_U1F_branch_lengths(pts, sl, sr, traversins) for sl, sr in shifts], catalogue)
+    sizes = dict(zip(("bas", "gauche", "droite"), best["sizes"]))
+    return _place_U1F_with_sizes(out, pts, sizes, *shifts[best["shift"]], traversins=traversins)
+
+# ----- U (no fromage) : fonctions de choix et placement coussins -----
 def _u_variant_x_end(variant, pts):
     if variant in ("v1","v4"):
         return pts["Bx"][0]
     else:
         return pts["F02"][0]
 
-def _eval_U_counts(variant, pts, drawn, sb, sg, sd, shiftL, shiftR, traversins=None):
-    """
-    Evaluate how many cushions of sizes ``sb``, ``sg`` and ``sd`` will fit on
-    the bottom, left and right branches of a U‑shaped sofa, considering
-    possible méridienne limits.
-    """
+def _U_branch_lengths(variant, pts, drawn, shiftL, shiftR, traversins=None):
+    """Longueurs utiles (bas, gauche, droite) des lignes de coussins d'un U pour un décalage donné."""
     F0x, F0y = pts["F0"]
     x_end = _u_variant_x_end(variant, pts)
     xs = F0x + (CUSHION_DEPTH if shiftL else 0)
@@ -1503,10 +3437,18 @@ def _eval_U_counts(variant, pts, drawn, sb, sg, sd, shiftL, shiftR, traversins=N
     yL0 = F0y + (0 if (not drawn.get("D1", False) or shiftL) else CUSHION_DEPTH)
     has_right = drawn.get("D4", False) or drawn.get("D5", False)
     yR0 = F0y + (0 if (not has_right or shiftR) else CUSHION_DEPTH)
+    return max(0, xe - xs), max(0, y_end_L - yL0), max(0, y_end_R - yR0)
 
-    nb, wb = _waste_and_count_1d(max(0, xe - xs), sb)
-    ng, wg = _waste_and_count_1d(max(0, y_end_L - yL0), sg)
-    nd, wd = _waste_and_count_1d(max(0, y_end_R - yR0), sd)
+def _eval_U_counts(variant, pts, drawn, sb, sg, sd, shiftL, shiftR, traversins=None):
+    """
+    Evaluate how many cushions of sizes ``sb``, ``sg`` and ``sd`` will fit on
+    the bottom, left and right branches of a U‑shaped sofa, considering
+    possible méridienne limits.
+    """
+    Lb, Lg, Ld = _U_branch_lengths(variant, pts, drawn, shiftL, shiftR, traversins)
+    nb, wb = _waste_and_count_1d(Lb, sb)
+    ng, wg = _waste_and_count_1d(Lg, sg)
+    nd, wd = _waste_and_count_1d(Ld, sd)
     waste = wb + wg + wd
     cover = nb * sb + ng * sg + nd * sd
     return {
@@ -1515,21 +3457,27 @@ def _eval_U_counts(variant, pts, drawn, sb, sg, sd, shiftL, shiftR, traversins=N
         "cover": cover,
     }
 
-def _optimize_valise_U(variant, pts, drawn, rng, same, traversins=None):
-    best=None; r0,r1=rng
-    for sg in range(r0,r1+1):
-        for sb in ([sg] if same else range(r0,r1+1)):
-            for sd in ([sg] if same else range(r0,r1+1)):
-                if max(sb,sg,sd)-min(sb,sg,sd) > 5:
-                    continue
-                E=[]
-                for sl in (False,True):
-                    for sr in (False,True):
-                        E.append(_eval_U_counts(variant, pts, drawn, sb, sg, sd, sl, sr, traversins=traversins))
-                e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
-                score=(e["waste"], -e["cover"], -sb, -sg, -sd)
-                if (best is None) or (score < best["score"]):
-                    best={"score":score, "sizes":{"bas":sb,"gauche":sg,"droite":sd}}
+def _optimize_valise_U(variant, pts, drawn, rng, same, traversins=None, alternatives=0):
+    best=None; heaps={}
+    shifts = [(sl, sr) for sl in (False,True) for sr in (False,True)]
+    lengths = [_U_branch_lengths(variant, pts, drawn, sl, sr, traversins) for sl, sr in shifts]
+    for sb, sg, sd in _valise_candidates(rng, same, lengths, alternatives):
+        if max(sb,sg,sd)-min(sb,sg,sd) > 5:
+            continue
+        E=[]
+        for sl in (False,True):
+            for sr in (False,True):
+                E.append(_eval_U_counts(variant, pts, drawn, sb, sg, sd, sl, sr, traversins=traversins))
+        e = min(E, key=lambda x: (x["waste"], -x["cover"], -sb, -sg, -sd))
+        score=(e["waste"], -e["cover"], -sb, -sg, -sd)
+        if alternatives:
+            sl, sr = shifts[[x is e for x in E].index(True)]
+            _valise_alt_push(heaps, alternatives, _valise_alt(score, {"bas":sb,"gauche":sg,"droite":sd}, e,
+                                                              shiftL=sl, shiftR=sr))
+        if (best is None) or (score < best["score"]):
+            best={"score":score, "sizes":{"bas":sb,"gauche":sg,"droite":sd}}
+    if best and alternatives:
+        best["alternatives"] = _valise_alternatives(heaps, alternatives)
     if best:
         tgt=best["score"]
         for sl in (False,True):
@@ -1541,27 +3489,26 @@ def _optimize_valise_U(variant, pts, drawn, rng, same, traversins=None):
                     break
     return best
 
-def _draw_U_with_sizes(
-    variant, t, tr, pts, sizes, drawn, shiftL, shiftR, traversins=None
+def _place_U_with_sizes(
+    variant, out, pts, sizes, drawn, shiftL, shiftR, traversins=None
 ):
     """
-    Draw cushions with specific sizes for each part of a U‑shaped sofa.
+    Place cushions with specific sizes for each part of a U‑shaped sofa.
 
     ``sizes`` should be a dict with keys ``"bas"``, ``"gauche"`` and
     ``"droite"`` giving the cushion size for the bottom, left and right,
-    respectively. This version respects méridienne limits via ``By_`` and
-    ``By4_`` when present and optional traversins.
+    respectively. Each size may also be a sequence of sizes laid out in
+    order (``coussins="mix"``). This version respects méridienne limits via
+    ``By_`` and ``By4_`` when present and optional traversins.
     """
     F0x, F0y = pts["F0"]
     x_end = _u_variant_x_end(variant, pts)
     # bottom
     xs = F0x + (CUSHION_DEPTH if shiftL else 0)
     xe = x_end - (CUSHION_DEPTH if shiftR else 0)
-    sb = sizes["bas"]
     nb = 0
-    x = xs
     y = F0y
-    while x + sb <= xe + 1e-6:
+    for x, sb in _cushion_run(sizes["bas"], xs, xe):
         poly = [
             (x, y),
             (x + sb, y),
@@ -1569,12 +3516,8 @@ def _draw_U_with_sizes(
             (x, y + CUSHION_DEPTH),
             (x, y),
         ]
-        draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
-        )
-        label_poly(t, tr, poly, f"{sb}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": sb, "side": "bas"})
         nb += 1
-        x += sb
 
     # left branch
     y_end_L = pts.get("By_", pts["By"])[1]
@@ -1585,11 +3528,9 @@ def _draw_U_with_sizes(
         if (not drawn.get("D1", False) or shiftL)
         else CUSHION_DEPTH
     )
-    sg = sizes["gauche"]
     ng = 0
     xg = F0x
-    y_ = yL0
-    while y_ + sg <= y_end_L + 1e-6:
+    for y_, sg in _cushion_run(sizes["gauche"], yL0, y_end_L):
         poly = [
             (xg, y_),
             (xg + CUSHION_DEPTH, y_),
@@ -1597,12 +3538,8 @@ def _draw_U_with_sizes(
             (xg, y_ + sg),
             (xg, y_),
         ]
-        draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
-        )
-        label_poly(t, tr, poly, f"{sg}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": sg, "side": "gauche"})
         ng += 1
-        y_ += sg
 
     # right branch
     y_end_R = pts.get("By4_", pts["By4"])[1]
@@ -1614,11 +3551,9 @@ def _draw_U_with_sizes(
         if (not has_right or shiftR)
         else CUSHION_DEPTH
     )
-    sd = sizes["droite"]
     nd = 0
     x_col = pts["Bx"][0] if variant in ("v1", "v4") else pts["F02"][0]
-    y_ = yR0
-    while y_ + sd <= y_end_R + 1e-6:
+    for y_, sd in _cushion_run(sizes["droite"], yR0, y_end_R):
         poly = [
             (x_col - CUSHION_DEPTH, y_),
             (x_col, y_),
@@ -1626,17 +3561,30 @@ def _draw_U_with_sizes(
             (x_col - CUSHION_DEPTH, y_ + sd),
             (x_col - CUSHION_DEPTH, y_),
         ]
-        draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
-        )
-        label_poly(t, tr, poly, f"{sd}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": sd, "side": "droite"})
         nd += 1
-        y_ += sd
 
     return nb + ng + nd
 
+def _place_U_mix(variant, out, pts, drawn, catalogue, traversins=None):
+    """
+    Mixed catalogue sizes per branch (``coussins="mix"``), laid out through
+    ``_place_U_with_sizes`` with the shift of least total waste.
+    """
+    shifts = [(sl, sr) for sl in (False, True) for sr in (False, True)]
+    best = _optimize_mix(
+        [_U_branch_lengths(variant, pts, drawn, sl, sr, traversins) for sl, sr in shifts],
+        catalogue,
+    )
+    sizes = dict(zip(("bas", "gauche", "droite"), best["sizes"]))
+    shiftL, shiftR = shifts[best["shift"]]
+    return _place_U_with_sizes(
+        variant, out, pts, sizes, drawn, shiftL, shiftR, traversins=traversins
+    )
+
 # ----- Simple S1 -----
-def _optimize_valise_simple(pts, rng, mer_side=None, mer_len=0, traversins=None):
+def _simple_row(pts, mer_side=None, mer_len=0, traversins=None):
+    """Bornes (x0, x1) de la ligne de coussins d'un S1 (méridienne et traversins déduits)."""
     x0 = pts["B0"][0]; x1 = pts["Bx"][0]
     if mer_side == 'g' and mer_len>0:
         x0 = max(x0, pts.get("B0_m", (x0,0))[0])
@@ -1645,8 +3593,12 @@ def _optimize_valise_simple(pts, rng, mer_side=None, mer_len=0, traversins=None)
     if traversins:
         if "g" in traversins: x0 += TRAVERSIN_THK
         if "d" in traversins: x1 -= TRAVERSIN_THK
+    return x0, x1
+
+def _optimize_valise_simple(pts, rng, mer_side=None, mer_len=0, traversins=None, alternatives=0):
+    x0, x1 = _simple_row(pts, mer_side, mer_len, traversins)
 
-    best=None; r0,r1=rng
+    best=None; heaps={}; r0,r1=rng
     for s in range(r0, r1+1):
         n0, w0 = _waste_and_count_1d(max(0, x1-x0), s)
         n1, w1 = _waste_and_count_1d(max(0, x1-(x0+CUSHION_DEPTH)), s)
@@ -1655,31 +3607,37 @@ def _optimize_valise_simple(pts, rng, mer_side=None, mer_len=0, traversins=None)
         else:
             n, waste, off = n0, w0, 0
         score=(waste, -n, -s)
+        if alternatives:
+            _valise_alt_push(heaps, alternatives, {"score":score, "size":s, "offset":off, "count":n,
+                                                   "waste":waste, "cover":n*s, "spread":0})
         if (best is None) or (score < best["score"]):
             best={"score":score, "size":s, "offset":off, "count":n}
+    if best and alternatives:
+        best["alternatives"] = _valise_alternatives(heaps, alternatives)
     return best
 
-def _draw_simple_with_size(t,tr,pts,size,mer_side=None,mer_len=0, traversins=None):
-    x0 = pts["B0"][0]; x1 = pts["Bx"][0]
-    if mer_side == 'g' and mer_len>0:
-        x0 = max(x0, pts.get("B0_m", (x0,0))[0])
-    if mer_side == 'd' and mer_len>0:
-        x1 = min(x1, pts.get("Bx_m", pts["Bx"])[0])
-    if traversins:
-        if "g" in traversins: x0 += TRAVERSIN_THK
-        if "d" in traversins: x1 -= TRAVERSIN_THK
-
-    n0, w0 = _waste_and_count_1d(max(0,x1-x0), size)
-    n1, w1 = _waste_and_count_1d(max(0,x1-(x0+CUSHION_DEPTH)), size)
-    off = CUSHION_DEPTH if (w1 < w0 or (w1==w0 and n1>n0)) else 0
-    x = x0 + off; y = pts["B0"][1]; n=0
-    while x + size <= x1 + 1e-6:
-        poly=[(x,y),(x+size,y),(x+size,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
-        x+=size; n+=1
+def _place_simple_with_size(out,pts,size,mer_side=None,mer_len=0, traversins=None, offset=None):
+    """size : taille unique, ou séquence de tailles (mix) avec son offset imposé."""
+    x0, x1 = _simple_row(pts, mer_side, mer_len, traversins)
+
+    if offset is None:
+        n0, w0 = _waste_and_count_1d(max(0,x1-x0), size)
+        n1, w1 = _waste_and_count_1d(max(0,x1-(x0+CUSHION_DEPTH)), size)
+        offset = CUSHION_DEPTH if (w1 < w0 or (w1==w0 and n1>n0)) else 0
+    y = pts["B0"][1]; n=0
+    for x, s in _cushion_run(size, x0 + offset, x1):
+        poly=[(x,y),(x+s,y),(x+s,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
+        out.append({"poly": poly, "size": s, "side": "bas"})
+        n+=1
     return n
 
+def _place_simple_mix(out, pts, catalogue, mer_side=None, mer_len=0, traversins=None):
+    x0, x1 = _simple_row(pts, mer_side, mer_len, traversins)
+    offsets = (0, CUSHION_DEPTH)
+    best = _optimize_mix([(max(0, x1 - (x0 + off)),) for off in offsets], catalogue)
+    return _place_simple_with_size(out, pts, best["sizes"][0], mer_side, mer_len,
+                                   traversins=traversins, offset=offsets[best["shift"]])
+
 # =====================================================================
 # =======================  LF (L avec angle fromage)  ==================
 # =====================================================================
@@ -1766,7 +3724,7 @@ def _choose_cushion_size_auto(pts, tx, ty, meridienne_side=None, meridienne_len=
         return (max(waste_h, waste_v), -s)
     return min(candidates, key=score)
 
-def draw_cousins_and_return_count(t, tr, pts, tx, ty, coussins, meridienne_side, meridienne_len, traversins=None):
+def _place_coussins_LF(out, pts, tx, ty, coussins, meridienne_side, meridienne_len, traversins=None):
     if isinstance(coussins, str) and coussins.strip().lower() == "auto":
         size = _choose_cushion_size_auto(pts, tx, ty, meridienne_side, meridienne_len, traversins=traversins)
     else:
@@ -1797,20 +3755,24 @@ def draw_cousins_and_return_count(t, tr, pts, tx, ty, coussins, meridienne_side,
     x_cur = F0x + (CUSHION_DEPTH if use_shift else 0)
     while x_cur + size <= x_end + 1e-6:
         poly = [(x_cur, y), (x_cur+size, y), (x_cur+size, y+CUSHION_DEPTH), (x_cur, y+CUSHION_DEPTH), (x_cur, y)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
-        label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "bas"})
         x_cur += size; count += 1
     # gauche
     x = F0x
     y_cur = F0y + (0 if use_shift else CUSHION_DEPTH)
     while y_cur + size <= y_end + 1e-6:
         poly = [(x, y_cur), (x+CUSHION_DEPTH, y_cur), (x+CUSHION_DEPTH, y_cur+size), (x, y_cur+size), (x, y_cur)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
-        label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "gauche"})
         y_cur += size; count += 1
 
     return count, size
 
+def draw_cousins_and_return_count(t, tr, pts, tx, ty, coussins, meridienne_side, meridienne_len, traversins=None):
+    cushions = []
+    count, size = _place_coussins_LF(cushions, pts, tx, ty, coussins, meridienne_side, meridienne_len, traversins=traversins)
+    _draw_cushions(t, tr, cushions)
+    return count, size
+
 def build_polys_LF_variant(pts, tx, ty, profondeur=DEPTH_STD,
                            dossier_left=True, dossier_bas=True,
                            acc_left=True, acc_bas=True,
@@ -1885,45 +3847,94 @@ def build_polys_LF_variant(pts, tx, ty, profondeur=DEPTH_STD,
     polys["split_flags"]={"left":split_g,"bottom":split_b,"right":False}
     return polys
 
-def render_LF_variant(tx, ty, profondeur=DEPTH_STD,
-                      dossier_left=True, dossier_bas=True,
-                      acc_left=True, acc_bas=True,
-                      meridienne_side=None, meridienne_len=0,
-                      coussins="auto",
-                      traversins=None,
-                      couleurs=None,
-                      window_title="LF — variantes"):
+def layout_LF(tx, ty, profondeur=DEPTH_STD,
+              dossier_left=True, dossier_bas=True,
+              acc_left=True, acc_bas=True,
+              meridienne_side=None, meridienne_len=0,
+              coussins="auto",
+              traversins=None, alternatives=0):
+    """
+    Calcul complet d'un LF sans aucun dessin : points, polygones, coussins et
+    traversins placés (en cm) et comptages du rapport. Voir compute_layout().
+    alternatives : en mode valise, nombre d'alternatives jointes au résultat
+    (cf. _valise_alternatives) ; 0 : aucune.
+    """
     if meridienne_side == 'g' and acc_left:
         raise ValueError("Erreur: une méridienne gauche ne peut pas coexister avec un accoudoir gauche.")
     if meridienne_side == 'b' and acc_bas:
         raise ValueError("Erreur: une méridienne bas ne peut pas coexister avec un accoudoir bas.")
 
     trv = _parse_traversins_spec(traversins, allowed={"g","b"})
-    legend_items = _resolve_and_apply_colors(couleurs)
 
     pts=compute_points_LF_variant(tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
     polys=build_polys_LF_variant(pts,tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
     _assert_banquettes_max_250(polys)
 
+    trv_rects = []
+    _place_traversins_L_like(trv_rects, pts, profondeur, trv)
+
+    # ===== COUSSINS =====
+    cushions = []
+    valise_alts = None
+    spec = _parse_coussins_spec(coussins)
+    if spec["mode"] == "auto":
+        cushions_count, chosen_size = _place_coussins_LF(cushions,pts,tx,ty,"auto",meridienne_side,meridienne_len,traversins=trv)
+        total_line = f"{coussins} → {cushions_count} × {chosen_size} cm"
+    elif spec["mode"] == "fixed":
+        cushions_count, chosen_size = _place_coussins_LF(cushions,pts,tx,ty,int(spec["fixed"]),meridienne_side,meridienne_len,traversins=trv)
+        total_line = f"{coussins} → {cushions_count} × {chosen_size} cm"
+    elif spec["mode"] == "mix":
+        _place_L_like_mix(cushions, pts, spec["catalogue"], x_end_key="Bx", y_end_key="By", traversins=trv)
+        total_line = _format_mix_counts_console(cushions)
+    else:
+        best = _optimize_valise_L_like(pts, spec["range"], spec["same"], x_end_key="Bx", y_end_key="By", traversins=trv, alternatives=alternatives)
+        if not best:
+            raise ValueError("Aucune configuration valise valide pour LF.")
+        valise_alts = best.get("alternatives")
+        sizes = best["sizes"]; shift = best["shift_bas"]
+        n, sb, sg = _place_L_like_with_sizes(cushions, pts, sizes, shift, x_end_key="Bx", y_end_key="By", traversins=trv)
+        cushions_count = n
+        total_line = _format_valise_counts_console(
+            {"bas": sb, "gauche": sg},
+            best.get("counts", best.get("eval", {}).get("counts")),
+            cushions_count,
+        )
+
+    add_split = int(polys["split_flags"]["left"] and dossier_left) + int(polys["split_flags"]["bottom"] and dossier_bas)
+    return _layout_result("LF", None, pts, polys, cushions, trv_rects,
+                          total_line, add_split, angles=1, alternatives=valise_alts)
+
+def render_LF_variant(tx, ty, profondeur=DEPTH_STD,
+                      dossier_left=True, dossier_bas=True,
+                      acc_left=True, acc_bas=True,
+                      meridienne_side=None, meridienne_len=0,
+                      coussins="auto",
+                      traversins=None,
+                      couleurs=None,
+                      window_title="LF — variantes"):
+    lay = layout_LF(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
+                    meridienne_side, meridienne_len, coussins, traversins)
+    pts, polys, counts = lay["pts"], lay["polys"], lay["counts"]
+    legend_items = _resolve_and_apply_colors(couleurs)
+
     screen=turtle.Screen(); screen.setup(WIN_W,WIN_H)
     screen.title(f"{window_title} — {tx}x{ty} cm — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}")
     t=turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
-    tr=WorldToScreen(tx,ty,WIN_W,WIN_H,PAD_PX,ZOOM)
+    tr=t.ctx.transform=WorldToScreen(tx,ty,WIN_W,WIN_H,PAD_PX,ZOOM)
 
     # (Quadrillage et repères supprimés)
 
-    for poly in polys["dossiers"]:   draw_polygon_cm(t,tr,poly,fill=COLOR_DOSSIER)
-    for poly in polys["banquettes"]: draw_polygon_cm(t,tr,poly,fill=COLOR_ASSISE)
-    for poly in polys["accoudoirs"]: draw_polygon_cm(t,tr,poly,fill=COLOR_ACC)
-    for poly in polys["angle"]:      draw_polygon_cm(t,tr,poly,fill=COLOR_ASSISE)
+    for poly in polys["dossiers"]:   draw_polygon_cm(t,tr,poly,fill=t.ctx.palette["dossiers"], role="dossiers")
+    for poly in polys["banquettes"]: draw_polygon_cm(t,tr,poly,fill=t.ctx.palette["assise"], role="assise")
+    for poly in polys["accoudoirs"]: draw_polygon_cm(t,tr,poly,fill=t.ctx.palette["accoudoirs"], role="accoudoirs")
+    for poly in polys["angle"]:      draw_polygon_cm(t,tr,poly,fill=t.ctx.palette["assise"], role="assise")
 
-    # Traversins (visuel) + comptage
-    n_traversins = _draw_traversins_L_like(t, tr, pts, profondeur, trv)
+    # Traversins (visuel)
+    _draw_traversins(t, tr, lay["traversins"])
 
     draw_double_arrow_vertical_cm(t,tr,-25,0,ty,f"{ty} cm")
     draw_double_arrow_horizontal_cm(t,tr,-25,0,tx,f"{tx} cm")
 
-    banquette_sizes = []
     if polys["angle"]:
         side = int(round(pts["Fy"][1] - pts["F0"][1]))
         # Écrire les dimensions d'angle sur deux lignes et centrer dans le carré d'angle
@@ -1932,7 +3943,6 @@ def render_LF_variant(tx, ty, profondeur=DEPTH_STD,
     # Afficher les dimensions des banquettes en les décalant légèrement lorsqu'elles sont verticales
     for poly in polys["banquettes"]:
         L, P = banquette_dims(poly)
-        banquette_sizes.append((L, P))
         # Afficher la première dimension sans unité suivie d'un « x », la seconde avec « cm »
         text = f"{L}x\n{P} cm"
         xs = [p[0] for p in poly]
@@ -1949,44 +3959,23 @@ def render_LF_variant(tx, ty, profondeur=DEPTH_STD,
     for poly in polys["accoudoirs"]: label_poly(t,tr,poly,"15")
 
     # ===== COUSSINS =====
-    spec = _parse_coussins_spec(coussins)
-    if spec["mode"] == "auto":
-        cushions_count, chosen_size = draw_cousins_and_return_count(t,tr,pts,tx,ty,"auto",meridienne_side,meridienne_len,traversins=trv)
-        total_line = f"{coussins} → {cushions_count} × {chosen_size} cm"
-    elif spec["mode"] == "fixed":
-        cushions_count, chosen_size = draw_cousins_and_return_count(t,tr,pts,tx,ty,int(spec["fixed"]),meridienne_side,meridienne_len,traversins=trv)
-        total_line = f"{coussins} → {cushions_count} × {chosen_size} cm"
-    else:
-        best = _optimize_valise_L_like(pts, spec["range"], spec["same"], x_end_key="Bx", y_end_key="By", traversins=trv)
-        if not best:
-            raise ValueError("Aucune configuration valise valide pour LF.")
-        sizes = best["sizes"]; shift = best["shift_bas"]
-        n, sb, sg = _draw_L_like_with_sizes(t, tr, pts, sizes, shift, x_end_key="Bx", y_end_key="By", traversins=trv)
-        cushions_count = n
-        total_line = _format_valise_counts_console(
-            {"bas": sb, "gauche": sg},
-            best.get("counts", best.get("eval", {}).get("counts")),
-            cushions_count,
-        )
+    _draw_cushions(t, tr, lay["cushions"])
 
     # Légende (couleurs)
     draw_legend(t, tr, tx, ty, items=legend_items, pos="top-right")
 
     screen.tracer(True); t.hideturtle()
-    add_split = int(polys["split_flags"]["left"] and dossier_left) + int(polys["split_flags"]["bottom"] and dossier_bas)
     A = profondeur + 20
     print("=== Rapport canapé (LF) ===")
     print(f"Dimensions : {tx}×{ty} cm — profondeur : {profondeur} cm")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    print(f"Banquettes : {counts['banquettes']} → {counts['banquette_sizes']}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
-    dossiers_count = _compute_dossiers_count(polys)
-    dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
+    print(f"Dossiers : {_dossiers_str(counts['dossiers'])} (+{counts['dossiers_scission']} via scission) | Accoudoirs : {counts['accoudoirs']}")
     print(f"Banquettes d’angle : 1")
     print(f"Angles : 1 × {A}×{A} cm")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    print(f"Traversins : {counts['traversins']} × 70x30")
+    print(f"Coussins : {lay['coussins_line']}")
+    return turtle.done()
 
 # =====================================================================
 # ========================  U2f (2 angles fromage)  ====================
@@ -2209,24 +4198,21 @@ def build_polys_U2f(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
         polys["dossiers"] += angle_seams
     return polys
 
-def _draw_cushions_U2f_optimized_wrapper(t, tr, pts, size, traversins=None):
-    return _draw_cushions_U2f_optimized(t, tr, pts, size, traversins=traversins)
-
-def render_U2f_variant(tx, ty_left, tz_right, profondeur=DEPTH_STD,
-                       dossier_left=True, dossier_bas=True, dossier_right=True,
-                       acc_left=True, acc_bas=True, acc_right=True,
-                       meridienne_side=None, meridienne_len=0,
-                       coussins="auto",
-                       traversins=None,
-                       couleurs=None,
-                       window_title="U2F — variantes"):
+def layout_U2f(tx, ty_left, tz_right, profondeur=DEPTH_STD,
+               dossier_left=True, dossier_bas=True, dossier_right=True,
+               acc_left=True, acc_bas=True, acc_right=True,
+               meridienne_side=None, meridienne_len=0,
+               coussins="auto",
+               traversins=None, alternatives=0):
+    """
+    Calcul complet d'un U2f sans aucun dessin (voir layout_LF / compute_layout).
+    """
     if meridienne_side == 'g' and acc_left:
         raise ValueError("Erreur: une méridienne gauche ne peut pas coexister avec un accoudoir gauche.")
     if meridienne_side == 'd' and acc_right:
         raise ValueError("Erreur: une méridienne droite ne peut pas coexister avec un accoudoir droit.")
 
     trv = _parse_traversins_spec(traversins, allowed={"g","d"})
-    legend_items = _resolve_and_apply_colors(couleurs)
 
     pts = compute_points_U2f(tx, ty_left, tz_right, profondeur,
                              dossier_left, dossier_bas, dossier_right,
@@ -2237,52 +4223,12 @@ def render_U2f_variant(tx, ty_left, tz_right, profondeur=DEPTH_STD,
                             acc_left, acc_bas, acc_right)
     _assert_banquettes_max_250(polys)
 
-    ty_canvas = pts["_ty_canvas"]
-    screen = turtle.Screen(); screen.setup(WIN_W, WIN_H)
-    screen.title(f"{window_title} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}")
-    t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
-    tr = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
-
-    # (Quadrillage et repères supprimés)
-
-    for poly in polys["dossiers"]:   draw_polygon_cm(t, tr, poly, fill=COLOR_DOSSIER)
-    for poly in polys["banquettes"]: draw_polygon_cm(t, tr, poly, fill=COLOR_ASSISE)
-    for poly in polys["accoudoirs"]: draw_polygon_cm(t, tr, poly, fill=COLOR_ACC)
-    for poly in polys["angles"]:     draw_polygon_cm(t, tr, poly, fill=COLOR_ASSISE)
-
-    # Traversins (visuel) + comptage
-    n_traversins = _draw_traversins_U_side_F02(t, tr, pts, profondeur, trv)
-
-    draw_double_arrow_vertical_cm(t, tr, -25,    0, ty_left,  f"{ty_left} cm")
-    draw_double_arrow_vertical_cm(t, tr,  tx+25, 0, tz_right, f"{tz_right} cm")
-    draw_double_arrow_horizontal_cm(t, tr, -25,  0, tx, f"{tx} cm")
-
-    A = profondeur + 20
-    for poly in polys["angles"]:
-        # Écrire les dimensions d’angle sur deux lignes, première ligne sans unité suivie d’un « x »
-        label_poly(t, tr, poly, f"{A}x\n{A} cm")
-
-    banquette_sizes = []
-    for poly in polys["banquettes"]:
-        L, P = banquette_dims(poly)
-        banquette_sizes.append((L, P))
-        # Affichage de la dimension principale sans unité suivie d'un « x », et de la profondeur avec « cm »
-        text = f"{L}x\n{P} cm"
-        xs = [p[0] for p in poly]
-        ys = [p[1] for p in poly]
-        bb_w = max(xs) - min(xs)
-        bb_h = max(ys) - min(ys)
-        # Décaler horizontalement si la banquette est plus haute que large
-        if bb_h >= bb_w:
-            cx = sum(xs) / len(xs)
-            # Réduire les offsets : 3 cm en moins sur les branches verticales
-            # Branche gauche : CUSHION_DEPTH+7 (ex: 22 cm). Branche droite : -(CUSHION_DEPTH-8) (ex: -7 cm).
-            dx = (CUSHION_DEPTH + 7) if cx < tx / 2.0 else -(CUSHION_DEPTH - 8)
-            label_poly_offset_cm(t, tr, poly, text, dx_cm=dx, dy_cm=0.0)
-        else:
-            label_poly(t, tr, poly, text)
+    trv_rects = []
+    _place_traversins_U_side_F02(trv_rects, pts, profondeur, trv)
 
     # ===== COUSSINS =====
+    cushions = []
+    valise_alts = None
     spec = _parse_coussins_spec(coussins)
     if spec["mode"] == "auto":
         # ancien auto (65,80,90)
@@ -2304,18 +4250,22 @@ def render_U2f_variant(tx, ty_left, tz_right, profondeur=DEPTH_STD,
             if score < best_score:
                 best_score, best = score, s
         size = best
-        cushions_count = _draw_cushions_U2f_optimized_wrapper(t, tr, pts, size, traversins=trv)
+        cushions_count = _place_cushions_U2f_optimized(cushions, pts, size, traversins=trv)
         total_line = f"{coussins} → {cushions_count} × {size} cm"
     elif spec["mode"] == "fixed":
         size = int(spec["fixed"])
-        cushions_count = _draw_cushions_U2f_optimized_wrapper(t, tr, pts, size, traversins=trv)
+        cushions_count = _place_cushions_U2f_optimized(cushions, pts, size, traversins=trv)
         total_line = f"{coussins} → {cushions_count} × {size} cm"
+    elif spec["mode"] == "mix":
+        _place_U2f_mix(cushions, pts, spec["catalogue"], traversins=trv)
+        total_line = _format_mix_counts_console(cushions)
     else:
-        best = _optimize_valise_U2f(pts, spec["range"], spec["same"], traversins=trv)
+        best = _optimize_valise_U2f(pts, spec["range"], spec["same"], traversins=trv, alternatives=alternatives)
         if not best:
             raise ValueError("Aucune configuration valise valide pour U2f.")
+        valise_alts = best.get("alternatives")
         sizes = best["sizes"]; shiftL = best["shiftL"]; shiftR = best["shiftR"]
-        cushions_count = _draw_U2f_with_sizes(t, tr, pts, sizes, shiftL, shiftR, traversins=trv)
+        cushions_count = _place_U2f_with_sizes(cushions, pts, sizes, shiftL, shiftR, traversins=trv)
         sb, sg, sd = sizes["bas"], sizes["gauche"], sizes["droite"]
         total_line = _format_valise_counts_console(
             {"bas": sb, "gauche": sg, "droite": sd},
@@ -2323,28 +4273,89 @@ def render_U2f_variant(tx, ty_left, tz_right, profondeur=DEPTH_STD,
             cushions_count,
         )
 
-    # Titre demandé + légende (U → légende en haut-centre)
-    draw_title_center(t, tr, tx, ty_canvas, "Canapé en U avec deux angles")
-    draw_legend(t, tr, tx, ty_canvas, items=legend_items, pos="top-center")
-
-    screen.tracer(True); t.hideturtle()
-    add_split = sum(int(v) for v in polys.get("split_flags", {}).values())
-    print("=== Rapport canapé U2f ===")
-    print(f"Dimensions : tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur} (A={A})")
-    print(f"Méridienne : {meridienne_side or '-'} ({meridienne_len} cm)")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
     dossier_bonus = int(polys["split_flags"].get("left", False) and dossier_left) + \
                    int(polys["split_flags"].get("bottom", False) and dossier_bas) + \
                    int(polys["split_flags"].get("right", False) and dossier_right)
+    return _layout_result("U2f", None, pts, polys, cushions, trv_rects,
+                          total_line, dossier_bonus, angles=2, alternatives=valise_alts)
+
+def render_U2f_variant(tx, ty_left, tz_right, profondeur=DEPTH_STD,
+                       dossier_left=True, dossier_bas=True, dossier_right=True,
+                       acc_left=True, acc_bas=True, acc_right=True,
+                       meridienne_side=None, meridienne_len=0,
+                       coussins="auto",
+                       traversins=None,
+                       couleurs=None,
+                       window_title="U2F — variantes"):
+    lay = layout_U2f(tx, ty_left, tz_right, profondeur,
+                     dossier_left, dossier_bas, dossier_right,
+                     acc_left, acc_bas, acc_right,
+                     meridienne_side, meridienne_len, coussins, traversins)
+    pts, polys, counts = lay["pts"], lay["polys"], lay["counts"]
+    legend_items = _resolve_and_apply_colors(couleurs)
+
+    ty_canvas = pts["_ty_canvas"]
+    screen = turtle.Screen(); screen.setup(WIN_W, WIN_H)
+    screen.title(f"{window_title} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}")
+    t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
+    tr = t.ctx.transform = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
+
+    # (Quadrillage et repères supprimés)
+
+    for poly in polys["dossiers"]:   draw_polygon_cm(t, tr, poly, fill=t.ctx.palette["dossiers"], role="dossiers")
+    for poly in polys["banquettes"]: draw_polygon_cm(t, tr, poly, fill=t.ctx.palette["assise"], role="assise")
+    for poly in polys["accoudoirs"]: draw_polygon_cm(t, tr, poly, fill=t.ctx.palette["accoudoirs"], role="accoudoirs")
+    for poly in polys["angles"]:     draw_polygon_cm(t, tr, poly, fill=t.ctx.palette["assise"], role="assise")
+
+    # Traversins (visuel)
+    _draw_traversins(t, tr, lay["traversins"])
+
+    draw_double_arrow_vertical_cm(t, tr, -25,    0, ty_left,  f"{ty_left} cm")
+    draw_double_arrow_vertical_cm(t, tr,  tx+25, 0, tz_right, f"{tz_right} cm")
+    draw_double_arrow_horizontal_cm(t, tr, -25,  0, tx, f"{tx} cm")
+
+    A = profondeur + 20
+    for poly in polys["angles"]:
+        # Écrire les dimensions d’angle sur deux lignes, première ligne sans unité suivie d’un « x »
+        label_poly(t, tr, poly, f"{A}x\n{A} cm")
+
+    for poly in polys["banquettes"]:
+        L, P = banquette_dims(poly)
+        # Affichage de la dimension principale sans unité suivie d'un « x », et de la profondeur avec « cm »
+        text = f"{L}x\n{P} cm"
+        xs = [p[0] for p in poly]
+        ys = [p[1] for p in poly]
+        bb_w = max(xs) - min(xs)
+        bb_h = max(ys) - min(ys)
+        # Décaler horizontalement si la banquette est plus haute que large
+        if bb_h >= bb_w:
+            cx = sum(xs) / len(xs)
+            # Réduire les offsets : 3 cm en moins sur les branches verticales
+            # Branche gauche : CUSHION_DEPTH+7 (ex: 22 cm). Branche droite : -(CUSHION_DEPTH-8) (ex: -7 cm).
+            dx = (CUSHION_DEPTH + 7) if cx < tx / 2.0 else -(CUSHION_DEPTH - 8)
+            label_poly_offset_cm(t, tr, poly, text, dx_cm=dx, dy_cm=0.0)
+        else:
+            label_poly(t, tr, poly, text)
+
+    # ===== COUSSINS =====
+    _draw_cushions(t, tr, lay["cushions"])
+
+    # Titre demandé + légende (U → légende en haut-centre)
+    draw_title_center(t, tr, tx, ty_canvas, "Canapé en U avec deux angles")
+    draw_legend(t, tr, tx, ty_canvas, items=legend_items, pos="top-center")
+
+    screen.tracer(True); t.hideturtle()
+    print("=== Rapport canapé U2f ===")
+    print(f"Dimensions : tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur} (A={A})")
+    print(f"Méridienne : {meridienne_side or '-'} ({meridienne_len} cm)")
+    print(f"Banquettes : {counts['banquettes']} → {counts['banquette_sizes']}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
-    dossiers_count = _compute_dossiers_count(polys)
-    dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers : {dossiers_str} (+{dossier_bonus} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
+    print(f"Dossiers : {_dossiers_str(counts['dossiers'])} (+{counts['dossiers_scission']} via scission) | Accoudoirs : {counts['accoudoirs']}")
     print(f"Banquettes d'angle : 2")
     print(f"Angles : 2 × {A}×{A} cm")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    print(f"Traversins : {counts['traversins']} × 70x30")
+    print(f"Coussins : {lay['coussins_line']}")
+    return turtle.done()
 
 # =====================================================================
 # ===================  U1F (1 angle fromage) — v1..v4  =================
@@ -2396,7 +4407,7 @@ def _choose_cushion_size_auto_U1F(pts, traversins=None):
         if sc < score_best: best, score_best = s, sc
     return best
 
-def _draw_coussins_U1F(t, tr, pts, size, traversins=None):
+def _place_coussins_U1F(out, pts, size, traversins=None):
     F0x, F0y = pts["F0"]; F02x = pts["F02"][0]
     y_end_L = pts["By_cush"][1]; y_end_R = pts["By4_cush"][1]
     if traversins:
@@ -2421,22 +4432,19 @@ def _draw_coussins_U1F(t, tr, pts, size, traversins=None):
     y = F0y; x = xs
     while x + size <= xe + 1e-6:
         poly=[(x,y),(x+size,y),(x+size,y+CUSHION_DEPTH),(x,y+CUSHION_DEPTH),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "bas"})
         count+=1; x+=size
     # GAUCHE
     x = F0x; y = yL0
     while y + size <= y_end_L + 1e-6:
         poly=[(x,y),(x+CUSHION_DEPTH,y),(x+CUSHION_DEPTH,y+size),(x,y+size),(x,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "gauche"})
         count+=1; y+=size
     # DROITE
     x = F02x; y = yR0
     while y + size <= y_end_R + 1e-6:
         poly=[(x-CUSHION_DEPTH,y),(x,y),(x,y+size),(x-CUSHION_DEPTH,y+size),(x-CUSHION_DEPTH,y)]
-        draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-        label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "droite"})
         count+=1; y+=size
     return count
 
@@ -3050,18 +5058,17 @@ def build_polys_U1F_v4(pts, tx, ty_left, tz_right, profondeur=DEPTH_STD,
     return polys
 
 # --- rendu commun + wrappers (U1F) ---
-def _render_common_U1F(variant, tx, ty_left, tz_right, profondeur,
+def _layout_common_U1F(variant, tx, ty_left, tz_right, profondeur,
                        dossier_left, dossier_bas, dossier_right,
                        acc_left, acc_right,
                        meridienne_side, meridienne_len,
-                       coussins, traversins, couleurs, window_title):
+                       coussins, traversins, alternatives=0):
     comp = {"v1":compute_points_U1F_v1, "v2":compute_points_U1F_v2,
             "v3":compute_points_U1F_v3, "v4":compute_points_U1F_v4}[variant]
     build= {"v1":build_polys_U1F_v1,   "v2":build_polys_U1F_v2,
             "v3":build_polys_U1F_v3,   "v4":build_polys_U1F_v4}[variant]
 
     trv = _parse_traversins_spec(traversins, allowed={"g","d"})
-    legend_items = _resolve_and_apply_colors(couleurs)
 
     pts = comp(tx, ty_left, tz_right, profondeur,
                dossier_left, dossier_bas, dossier_right,
@@ -3072,24 +5079,73 @@ def _render_common_U1F(variant, tx, ty_left, tz_right, profondeur,
                   acc_left, acc_right)
     _assert_banquettes_max_250(polys)
 
+    trv_rects = []
+    _place_traversins_U_side_F02(trv_rects, pts, profondeur, trv)
+
+    # ===== COUSSINS =====
+    cushions = []
+    valise_alts = None
+    spec = _parse_coussins_spec(coussins)
+    if spec["mode"] == "auto":
+        size = _choose_cushion_size_auto_U1F(pts, traversins=trv)
+        nb_coussins = _place_coussins_U1F(cushions, pts, size, traversins=trv)
+        total_line = f"{coussins} → {nb_coussins} × {size} cm"
+    elif spec["mode"] == "fixed":
+        size = int(spec["fixed"])
+        nb_coussins = _place_coussins_U1F(cushions, pts, size, traversins=trv)
+        total_line = f"{coussins} → {nb_coussins} × {size} cm"
+    elif spec["mode"] == "mix":
+        _place_U1F_mix(cushions, pts, spec["catalogue"], traversins=trv)
+        total_line = _format_mix_counts_console(cushions)
+    else:
+        best = _optimize_valise_U1F(pts, spec["range"], spec["same"], traversins=trv, alternatives=alternatives)
+        if not best:
+            raise ValueError("Aucune configuration valise valide pour U1F.")
+        valise_alts = best.get("alternatives")
+        sizes = best["sizes"]; shiftL, shiftR = best["shifts"]
+        nb_coussins = _place_U1F_with_sizes(cushions, pts, sizes, shiftL, shiftR, traversins=trv)
+        sb, sg, sd = sizes["bas"], sizes["gauche"], sizes["droite"]
+        total_line = _format_valise_counts_console(
+            {"bas": sb, "gauche": sg, "droite": sd},
+            best.get("counts", best.get("eval", {}).get("counts")),
+            nb_coussins,
+        )
+
+    add_split = int(polys.get("split_flags",{}).get("any",False))
+    return _layout_result("U1F", variant, pts, polys, cushions, trv_rects,
+                          total_line, add_split, angles=1, alternatives=valise_alts)
+
+def _render_common_U1F(variant, tx, ty_left, tz_right, profondeur,
+                       dossier_left, dossier_bas, dossier_right,
+                       acc_left, acc_right,
+                       meridienne_side, meridienne_len,
+                       coussins, traversins, couleurs, window_title):
+    lay = _layout_common_U1F(variant, tx, ty_left, tz_right, profondeur,
+                             dossier_left, dossier_bas, dossier_right,
+                             acc_left, acc_right,
+                             meridienne_side, meridienne_len,
+                             coussins, traversins)
+    pts, polys, counts = lay["pts"], lay["polys"], lay["counts"]
+    legend_items = _resolve_and_apply_colors(couleurs)
+
     ty_canvas = max(ty_left, tz_right)
     screen = turtle.Screen(); screen.setup(WIN_W, WIN_H)
     screen.title(f"U1F {variant} — {window_title} — tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — prof={profondeur}")
     t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
-    tr = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
+    tr = t.ctx.transform = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
 
     # (Quadrillage et repères supprimés)
 
     for p in polys["dossiers"]:
         xs=[pp[0] for pp in p]; ys=[pp[1] for pp in p]
         if (max(xs)-min(xs) > 1e-9) and (max(ys)-min(ys) > 1e-9):
-            draw_polygon_cm(t, tr, p, fill=COLOR_DOSSIER)
-    for p in polys["banquettes"]: draw_polygon_cm(t, tr, p, fill=COLOR_ASSISE)
-    for p in polys["accoudoirs"]: draw_polygon_cm(t, tr, p, fill=COLOR_ACC)
-    for p in polys["angle"]:      draw_polygon_cm(t, tr, p, fill=COLOR_ASSISE)
+            draw_polygon_cm(t, tr, p, fill=t.ctx.palette["dossiers"], role="dossiers")
+    for p in polys["banquettes"]: draw_polygon_cm(t, tr, p, fill=t.ctx.palette["assise"], role="assise")
+    for p in polys["accoudoirs"]: draw_polygon_cm(t, tr, p, fill=t.ctx.palette["accoudoirs"], role="accoudoirs")
+    for p in polys["angle"]:      draw_polygon_cm(t, tr, p, fill=t.ctx.palette["assise"], role="assise")
 
-    # Traversins + comptage
-    n_traversins = _draw_traversins_U_side_F02(t, tr, pts, profondeur, trv)
+    # Traversins
+    _draw_traversins(t, tr, lay["traversins"])
 
     draw_double_arrow_vertical_cm(t, tr, -25,   0, ty_left,   f"{ty_left} cm")
     draw_double_arrow_vertical_cm(t, tr,  tx+25,0, tz_right,   f"{tz_right} cm")
@@ -3099,10 +5155,8 @@ def _render_common_U1F(variant, tx, ty_left, tz_right, profondeur,
     if polys["angle"]:
         # Dimensions d’angle sur deux lignes : première ligne sans unité suivie d'un « x », deuxième ligne avec « cm »
         label_poly(t, tr, polys["angle"][0], f"{A}x\n{A} cm")
-    banquette_sizes = []
     for poly in polys["banquettes"]:
         L, P = banquette_dims(poly)
-        banquette_sizes.append((L, P))
         # Afficher la longueur sans unité suivie d'un « x », et la profondeur avec « cm »
         text = f"{L}x\n{P} cm"
         xs = [pp[0] for pp in poly]
@@ -3129,27 +5183,7 @@ def _render_common_U1F(variant, tx, ty_left, tz_right, profondeur,
             label_poly(t,tr,p,"15")
 
     # ===== COUSSINS =====
-    spec = _parse_coussins_spec(coussins)
-    if spec["mode"] == "auto":
-        size = _choose_cushion_size_auto_U1F(pts, traversins=trv)
-        nb_coussins = _draw_coussins_U1F(t, tr, pts, size, traversins=trv)
-        total_line = f"{coussins} → {nb_coussins} × {size} cm"
-    elif spec["mode"] == "fixed":
-        size = int(spec["fixed"])
-        nb_coussins = _draw_coussins_U1F(t, tr, pts, size, traversins=trv)
-        total_line = f"{coussins} → {nb_coussins} × {size} cm"
-    else:
-        best = _optimize_valise_U1F(pts, spec["range"], spec["same"], traversins=trv)
-        if not best:
-            raise ValueError("Aucune configuration valise valide pour U1F.")
-        sizes = best["sizes"]; shiftL, shiftR = best["shifts"]
-        nb_coussins = _draw_U1F_with_sizes(t, tr, pts, sizes, shiftL, shiftR, traversins=trv)
-        sb, sg, sd = sizes["bas"], sizes["gauche"], sizes["droite"]
-        total_line = _format_valise_counts_console(
-            {"bas": sb, "gauche": sg, "droite": sd},
-            best.get("counts", best.get("eval", {}).get("counts")),
-            nb_coussins,
-        )
+    _draw_cushions(t, tr, lay["cushions"])
 
     # Titre + légende (U → haut-centre)
     draw_title_center(t, tr, tx, ty_canvas, "Canapé en U avec un angle")
@@ -3157,19 +5191,16 @@ def _render_common_U1F(variant, tx, ty_left, tz_right, profondeur,
 
     screen.tracer(True); t.hideturtle()
 
-    add_split = int(polys.get("split_flags",{}).get("any",False))
     print(f"=== Rapport U1F {variant} ===")
     print(f"Dimensions : tx={tx} / ty(left)={ty_left} / tz(right)={tz_right} — profondeur={profondeur} (A={A})")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    print(f"Banquettes : {counts['banquettes']} → {counts['banquette_sizes']}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
-    dossiers_count = _compute_dossiers_count(polys)
-    dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
+    print(f"Dossiers : {_dossiers_str(counts['dossiers'])} (+{counts['dossiers_scission']} via scission) | Accoudoirs : {counts['accoudoirs']}")
     print(f"Banquettes d’angle : 1")
     print(f"Angles : 1 × {A}×{A} cm")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    print(f"Traversins : {counts['traversins']} × 70x30")
+    print(f"Coussins : {lay['coussins_line']}")
+    return turtle.done()
 
 def _dry_polys_for_U1F_variant(tx, ty_left, tz_right, profondeur,
                                dossier_left, dossier_bas, dossier_right,
@@ -3205,6 +5236,63 @@ def _dry_polys_for_U1F_variant(tx, ty_left, tz_right, profondeur,
     )
     return pts, polys
 
+def _auto_variant_U1F(tx, ty_left, tz_right, profondeur,
+                      dossier_left, dossier_bas, dossier_right,
+                      acc_left, acc_right,
+                      meridienne_side, meridienne_len):
+    """Mode automatique : la variante la plus simple entre v1 et v3."""
+    candidates = ("v1", "v3")
+    best_variant = None
+    best_nb_ban = float("inf")
+    best_scissions = float("inf")
+    def _count_scissions(polys):
+        base = 3
+        nb = len(polys.get("banquettes", []))
+        return max(0, nb - base)
+    for var in candidates:
+        try:
+            _pts, _polys = _dry_polys_for_U1F_variant(
+                tx, ty_left, tz_right, profondeur,
+                dossier_left, dossier_bas, dossier_right,
+                acc_left, acc_right,
+                meridienne_side, meridienne_len,
+                var,
+            )
+        except ValueError:
+            continue
+        nb_ban = len(_polys.get("banquettes", []))
+        sci = _count_scissions(_polys)
+        if (nb_ban < best_nb_ban) or (nb_ban == best_nb_ban and sci < best_scissions):
+            best_variant = var
+            best_nb_ban = nb_ban
+            best_scissions = sci
+    if best_variant is None:
+        best_variant = "v1"
+    return best_variant
+
+def layout_U1F(tx, ty_left, tz_right, profondeur=DEPTH_STD,
+               dossier_left=True, dossier_bas=True, dossier_right=True,
+               acc_left=True, acc_right=True,
+               meridienne_side=None, meridienne_len=0,
+               coussins="auto",
+               variant="auto",
+               traversins=None, alternatives=0):
+    """
+    Calcul complet d'un U1F sans aucun dessin ; même choix de variante que
+    render_U1F (voir layout_LF / compute_layout).
+    """
+    v_norm = (variant or "auto").lower()
+    if v_norm not in {"v1", "v2", "v3", "v4"}:
+        v_norm = _auto_variant_U1F(tx, ty_left, tz_right, profondeur,
+                                   dossier_left, dossier_bas, dossier_right,
+                                   acc_left, acc_right,
+                                   meridienne_side, meridienne_len)
+    return _layout_common_U1F(v_norm, tx, ty_left, tz_right, profondeur,
+                              dossier_left, dossier_bas, dossier_right,
+                              acc_left, acc_right,
+                              meridienne_side, meridienne_len,
+                              coussins, traversins, alternatives=alternatives)
+
 def render_U1F(tx, ty_left, tz_right, profondeur=DEPTH_STD,
                dossier_left=True, dossier_bas=True, dossier_right=True,
                acc_left=True, acc_right=True,
@@ -3258,33 +5346,10 @@ def render_U1F(tx, ty_left, tz_right, profondeur=DEPTH_STD,
                 window_title=window_title,
             )
     # Mode automatique: choisir la variante la plus simple entre v1 et v3
-    candidates = ("v1", "v3")
-    best_variant = None
-    best_nb_ban = float("inf")
-    best_scissions = float("inf")
-    def _count_scissions(polys):
-        base = 3
-        nb = len(polys.get("banquettes", []))
-        return max(0, nb - base)
-    for var in candidates:
-        try:
-            _pts, _polys = _dry_polys_for_U1F_variant(
-                tx, ty_left, tz_right, profondeur,
-                dossier_left, dossier_bas, dossier_right,
-                acc_left, acc_right,
-                meridienne_side, meridienne_len,
-                var,
-            )
-        except ValueError:
-            continue
-        nb_ban = len(_polys.get("banquettes", []))
-        sci = _count_scissions(_polys)
-        if (nb_ban < best_nb_ban) or (nb_ban == best_nb_ban and sci < best_scissions):
-            best_variant = var
-            best_nb_ban = nb_ban
-            best_scissions = sci
-    if best_variant is None:
-        best_variant = "v1"
+    best_variant = _auto_variant_U1F(tx, ty_left, tz_right, profondeur,
+                                     dossier_left, dossier_bas, dossier_right,
+                                     acc_left, acc_right,
+                                     meridienne_side, meridienne_len)
     return _render_common_U1F(
         best_variant,
         tx, ty_left, tz_right, profondeur,
@@ -3301,25 +5366,25 @@ def render_U1F_v1(*args, **kwargs):
     # compat. anciens appels : ty/tz -> ty_left/tz_right
     if "ty_left" not in kwargs and "ty" in kwargs: kwargs["ty_left"] = kwargs.pop("ty")
     if "tz_right" not in kwargs and "tz" in kwargs: kwargs["tz_right"] = kwargs.pop("tz")
-    _render_common_U1F("v1", *args, **kwargs)
+    return _render_common_U1F("v1", *args, **kwargs)
 def render_U1F_v2(*args, **kwargs):
     if "traversins" not in kwargs: kwargs["traversins"]=None
     if "couleurs" not in kwargs: kwargs["couleurs"]=None
     if "ty_left" not in kwargs and "ty" in kwargs: kwargs["ty_left"] = kwargs.pop("ty")
     if "tz_right" not in kwargs and "tz" in kwargs: kwargs["tz_right"] = kwargs.pop("tz")
-    _render_common_U1F("v2", *args, **kwargs)
+    return _render_common_U1F("v2", *args, **kwargs)
 def render_U1F_v3(*args, **kwargs):
     if "traversins" not in kwargs: kwargs["traversins"]=None
     if "couleurs" not in kwargs: kwargs["couleurs"]=None
     if "ty_left" not in kwargs and "ty" in kwargs: kwargs["ty_left"] = kwargs.pop("ty")
     if "tz_right" not in kwargs and "tz" in kwargs: kwargs["tz_right"] = kwargs.pop("tz")
-    _render_common_U1F("v3", *args, **kwargs)
+    return _render_common_U1F("v3", *args, **kwargs)
 def render_U1F_v4(*args, **kwargs):
     if "traversins" not in kwargs: kwargs["traversins"]=None
     if "couleurs" not in kwargs: kwargs["couleurs"]=None
     if "ty_left" not in kwargs and "ty" in kwargs: kwargs["ty_left"] = kwargs.pop("ty")
     if "tz_right" not in kwargs and "tz" in kwargs: kwargs["tz_right"] = kwargs.pop("tz")
-    _render_common_U1F("v4", *args, **kwargs)
+    return _render_common_U1F("v4", *args, **kwargs)
 
 # =====================================================================
 # ======================  L (no fromage) v1 + v2  =====================
@@ -3603,7 +5668,7 @@ def _choose_cushion_size_auto_L(pts, traversins=None):
 
     return best_size
 
-def draw_coussins_L_optimized(t, tr, pts, coussins, traversins=None):
+def _place_coussins_L_optimized(out, pts, coussins, traversins=None):
     if isinstance(coussins, str) and coussins.strip().lower()=="auto":
         size = _choose_cushion_size_auto_L(pts, traversins=traversins)
     else:
@@ -3626,16 +5691,14 @@ def draw_coussins_L_optimized(t, tr, pts, coussins, traversins=None):
         cnt=0; y=F0y; x_cur=x_start
         while x_cur + size <= x_end + 1e-6:
             poly=[(x_cur,y),(x_cur+size,y),(x_cur+size,y+CUSHION_DEPTH),(x_cur,y+CUSHION_DEPTH),(x_cur,y)]
-            draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-            label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
+            out.append({"poly": poly, "size": size, "side": "bas"})
             x_cur += size; cnt += 1
         return cnt
     def draw_left(y_start):
         cnt=0; x=F0x; y_cur=y_start
         while y_cur + size <= y_end + 1e-6:
             poly=[(x,y_cur),(x+CUSHION_DEPTH,y_cur),(x+CUSHION_DEPTH,y_cur+size),(x,y_cur+size),(x,y_cur)]
-            draw_polygon_cm(t,tr,poly,fill=COLOR_CUSHION,outline=COLOR_CONTOUR,width=1)
-            label_poly(t,tr,poly,f"{size}",font=FONT_CUSHION)
+            out.append({"poly": poly, "size": size, "side": "gauche"})
             y_cur += size; cnt += 1
         return cnt
 
@@ -3649,36 +5712,82 @@ def draw_coussins_L_optimized(t, tr, pts, coussins, traversins=None):
         cb = draw_bottom(F0x); cl = draw_left(F0y + CUSHION_DEPTH)
         return cb + cl, size
 
-def _render_common_L(tx, ty, pts, polys, coussins, window_title,
-                     profondeur, dossier_left, dossier_bas, meridienne_side, meridienne_len,
-                     traversins=None, couleurs=None):
+def draw_coussins_L_optimized(t, tr, pts, coussins, traversins=None):
+    cushions = []
+    count, size = _place_coussins_L_optimized(cushions, pts, coussins, traversins=traversins)
+    _draw_cushions(t, tr, cushions)
+    return count, size
+
+def _layout_common_L(pts, polys, coussins,
+                     profondeur, dossier_left, dossier_bas,
+                     traversins=None, variant=None, alternatives=0):
     _assert_banquettes_max_250(polys)
 
     trv = _parse_traversins_spec(traversins, allowed={"g","b"})
+    trv_rects = []
+    _place_traversins_L_like(trv_rects, pts, profondeur, trv)
+
+    # ===== COUSSINS =====
+    cushions = []
+    valise_alts = None
+    spec = _parse_coussins_spec(coussins)
+    if spec["mode"] == "auto":
+        cushions_count, chosen_size = _place_coussins_L_optimized(cushions,pts,"auto", traversins=trv)
+        total_line = f"{coussins} → {cushions_count} × {chosen_size} cm"
+    elif spec["mode"] == "fixed":
+        cushions_count, chosen_size = _place_coussins_L_optimized(cushions,pts,int(spec["fixed"]), traversins=trv)
+        total_line = f"{coussins} → {cushions_count} × {chosen_size} cm"
+    elif spec["mode"] == "mix":
+        _place_L_like_mix(cushions, pts, spec["catalogue"], traversins=trv)
+        total_line = _format_mix_counts_console(cushions)
+    else:
+        best = _optimize_valise_L_like(pts, spec["range"], spec["same"], traversins=trv, alternatives=alternatives)
+        if not best:
+            raise ValueError("Aucune configuration valise valide pour L.")
+        valise_alts = best.get("alternatives")
+        sizes = best["sizes"]; shift = best["shift_bas"]
+        n, sb, sg = _place_L_like_with_sizes(cushions, pts, sizes, shift, traversins=trv)
+        cushions_count = n
+        total_line = _format_valise_counts_console(
+            {"bas": sb, "gauche": sg},
+            best.get("counts", best.get("eval", {}).get("counts")),
+            cushions_count,
+        )
+
+    add_split = int(polys.get("split_flags",{}).get("left",False) and dossier_left) \
+              + int(polys.get("split_flags",{}).get("bottom",False) and dossier_bas)
+    return _layout_result("LNF", variant, pts, polys, cushions, trv_rects,
+                          total_line, add_split, angles=0, alternatives=valise_alts)
+
+def _render_common_L(tx, ty, pts, polys, coussins, window_title,
+                     profondeur, dossier_left, dossier_bas, meridienne_side, meridienne_len,
+                     traversins=None, couleurs=None):
+    lay = _layout_common_L(pts, polys, coussins,
+                           profondeur, dossier_left, dossier_bas,
+                           traversins=traversins)
+    counts = lay["counts"]
     legend_items = _resolve_and_apply_colors(couleurs)
 
     screen = turtle.Screen(); screen.setup(WIN_W,WIN_H)
     screen.title(f"{window_title} — {tx}×{ty} — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}")
     t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
-    tr = WorldToScreen(tx, ty, WIN_W, WIN_H, PAD_PX, ZOOM)
+    tr = t.ctx.transform = WorldToScreen(tx, ty, WIN_W, WIN_H, PAD_PX, ZOOM)
 
     # (Quadrillage et repères supprimés)
 
-    for p in polys["dossiers"]:   draw_polygon_cm(t,tr,p,fill=COLOR_DOSSIER)
-    for p in polys["banquettes"]: draw_polygon_cm(t,tr,p,fill=COLOR_ASSISE)
-    for p in polys["accoudoirs"]: draw_polygon_cm(t,tr,p,fill=COLOR_ACC)
+    for p in polys["dossiers"]:   draw_polygon_cm(t,tr,p,fill=t.ctx.palette["dossiers"], role="dossiers")
+    for p in polys["banquettes"]: draw_polygon_cm(t,tr,p,fill=t.ctx.palette["assise"], role="assise")
+    for p in polys["accoudoirs"]: draw_polygon_cm(t,tr,p,fill=t.ctx.palette["accoudoirs"], role="accoudoirs")
 
-    # Traversins + comptage
-    n_traversins = _draw_traversins_L_like(t, tr, pts, profondeur, trv)
+    # Traversins
+    _draw_traversins(t, tr, lay["traversins"])
 
     draw_double_arrow_vertical_cm(t,tr,-25,0,ty,f"{ty} cm")
     draw_double_arrow_horizontal_cm(t,tr,-25,0,tx,f"{tx} cm")
 
     # Banquettes : afficher les dimensions sur deux lignes. Décaler légèrement lorsque la banquette est verticale.
-    banquette_sizes = []
     for poly in polys["banquettes"]:
         L, P = banquette_dims(poly)
-        banquette_sizes.append((L, P))
         # Afficher la longueur sans unité suivie d'un « x » puis la profondeur avec « cm »
         text = f"{L}x\n{P} cm"
         xs = [p[0] for p in poly]
@@ -3696,45 +5805,22 @@ def _render_common_L(tx, ty, pts, polys, coussins, window_title,
     for p in polys["accoudoirs"]: label_poly(t,tr,p,"15")
 
     # ===== COUSSINS =====
-    spec = _parse_coussins_spec(coussins)
-    if spec["mode"] == "auto":
-        cushions_count, chosen_size = draw_coussins_L_optimized(t,tr,pts,"auto", traversins=trv)
-        total_line = f"{coussins} → {cushions_count} × {chosen_size} cm"
-    elif spec["mode"] == "fixed":
-        cushions_count, chosen_size = draw_coussins_L_optimized(t,tr,pts,int(spec["fixed"]), traversins=trv)
-        total_line = f"{coussins} → {cushions_count} × {chosen_size} cm"
-    else:
-        best = _optimize_valise_L_like(pts, spec["range"], spec["same"], traversins=trv)
-        if not best:
-            raise ValueError("Aucune configuration valise valide pour L.")
-        sizes = best["sizes"]; shift = best["shift_bas"]
-        n, sb, sg = _draw_L_like_with_sizes(t, tr, pts, sizes, shift, traversins=trv)
-        cushions_count = n
-        total_line = _format_valise_counts_console(
-            {"bas": sb, "gauche": sg},
-            best.get("counts", best.get("eval", {}).get("counts")),
-            cushions_count,
-        )
+    _draw_cushions(t, tr, lay["cushions"])
 
     # Légende
     draw_legend(t, tr, tx, ty, items=legend_items, pos="top-right")
 
     screen.tracer(True); t.hideturtle()
 
-    add_split = int(polys.get("split_flags",{}).get("left",False) and dossier_left) \
-              + int(polys.get("split_flags",{}).get("bottom",False) and dossier_bas)
-
     print("=== Rapport LNF ===")
     print(f"Dimensions : {tx}×{ty} — prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len}")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    print(f"Banquettes : {counts['banquettes']} → {counts['banquette_sizes']}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
-    dossiers_count = _compute_dossiers_count(polys)
-    dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}")
+    print(f"Dossiers : {_dossiers_str(counts['dossiers'])} (+{counts['dossiers_scission']} via scission) | Accoudoirs : {counts['accoudoirs']}")
     print(f"Banquettes d’angle : 0")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    print(f"Traversins : {counts['traversins']} × 70x30")
+    print(f"Coussins : {lay['coussins_line']}")
+    return turtle.done()
 
 def render_LNF_v1(tx, ty, profondeur=DEPTH_STD,
                   dossier_left=True, dossier_bas=True,
@@ -3752,7 +5838,7 @@ def render_LNF_v1(tx, ty, profondeur=DEPTH_STD,
         if not dossier_bas: raise ValueError("Méridienne bas impossible sans dossier bas.")
     pts = compute_points_LNF_v1(tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
     polys = build_polys_LNF_v1(pts,tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
-    _render_common_L(tx,ty,pts,polys,coussins,window_title,profondeur,dossier_left,dossier_bas,meridienne_side,meridienne_len,traversins=traversins, couleurs=couleurs)
+    return _render_common_L(tx,ty,pts,polys,coussins,window_title,profondeur,dossier_left,dossier_bas,meridienne_side,meridienne_len,traversins=traversins, couleurs=couleurs)
 
 def render_LNF_v2(tx, ty, profondeur=DEPTH_STD,
                   dossier_left=True, dossier_bas=True,
@@ -3770,7 +5856,7 @@ def render_LNF_v2(tx, ty, profondeur=DEPTH_STD,
         if not dossier_bas: raise ValueError("Méridienne bas impossible sans dossier bas.")
     pts = compute_points_LNF_v2(tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
     polys = build_polys_LNF_v2(pts,tx,ty,profondeur,dossier_left,dossier_bas,acc_left,acc_bas,meridienne_side,meridienne_len)
-    _render_common_L(tx,ty,pts,polys,coussins,window_title,profondeur,dossier_left,dossier_bas,meridienne_side,meridienne_len,traversins=traversins, couleurs=couleurs)
+    return _render_common_L(tx,ty,pts,polys,coussins,window_title,profondeur,dossier_left,dossier_bas,meridienne_side,meridienne_len,traversins=traversins, couleurs=couleurs)
 
 def _dry_polys_for_variant(tx, ty, profondeur,
                            dossier_left, dossier_bas,
@@ -3792,27 +5878,10 @@ def _dry_polys_for_variant(tx, ty, profondeur,
         polys = build_polys_LNF_v2(pts, tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas, meridienne_side, meridienne_len)
     return pts, polys
 
-def render_LNF(tx, ty, profondeur=DEPTH_STD,
-               dossier_left=True, dossier_bas=True,
-               acc_left=True, acc_bas=True,
-               meridienne_side=None, meridienne_len=0,
-               coussins="auto",
-               variant="auto",
-               traversins=None,
-               couleurs=None,
-               window_title="LNF — auto"):
-    if variant and variant.lower() in ("v1", "v2"):
-        chosen = variant.lower()
-        if chosen == "v2":
-            render_LNF_v2(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
-                          meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
-                          window_title=window_title)
-        else:
-            render_LNF_v1(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
-                          meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
-                          window_title=window_title)
-        return
-
+def _auto_variant_LNF(tx, ty, profondeur,
+                      dossier_left, dossier_bas,
+                      acc_left, acc_bas,
+                      meridienne_side, meridienne_len):
     nb_ban_v1 = float("inf")
     nb_ban_v2 = float("inf")
     polys1 = polys2 = None
@@ -3847,20 +5916,75 @@ def render_LNF(tx, ty, profondeur=DEPTH_STD,
         elif scissions(polys2) < scissions(polys1): chosen="v2"
         else: chosen = "v1" if tx >= ty else "v2"
 
-    if chosen == "v2":
-        render_LNF_v2(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
-                      meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
-                      window_title=window_title)
-    else:
-        render_LNF_v1(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
-                      meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
-                      window_title=window_title)
+    return chosen
 
-# =====================================================================
-# =====================  U (no fromage) — v1..v4  =====================
-# =====================================================================
+def layout_LNF(tx, ty, profondeur=DEPTH_STD,
+               dossier_left=True, dossier_bas=True,
+               acc_left=True, acc_bas=True,
+               meridienne_side=None, meridienne_len=0,
+               coussins="auto",
+               variant="auto",
+               traversins=None, alternatives=0):
+    """
+    Calcul complet d'un LNF sans aucun dessin ; même choix de variante que
+    render_LNF (voir layout_LF / compute_layout).
+    """
+    if variant and variant.lower() in ("v1", "v2"):
+        chosen = variant.lower()
+    else:
+        chosen = _auto_variant_LNF(tx, ty, profondeur,
+                                   dossier_left, dossier_bas,
+                                   acc_left, acc_bas,
+                                   meridienne_side, meridienne_len)
+    pts, polys = _dry_polys_for_variant(tx, ty, profondeur,
+                                        dossier_left, dossier_bas,
+                                        acc_left, acc_bas,
+                                        meridienne_side, meridienne_len,
+                                        chosen)
+    return _layout_common_L(pts, polys, coussins,
+                            profondeur, dossier_left, dossier_bas,
+                            traversins=traversins, variant=chosen,
+                            alternatives=alternatives)
 
-def compute_points_U_v1(
+def render_LNF(tx, ty, profondeur=DEPTH_STD,
+               dossier_left=True, dossier_bas=True,
+               acc_left=True, acc_bas=True,
+               meridienne_side=None, meridienne_len=0,
+               coussins="auto",
+               variant="auto",
+               traversins=None,
+               couleurs=None,
+               window_title="LNF — auto"):
+    if variant and variant.lower() in ("v1", "v2"):
+        chosen = variant.lower()
+        if chosen == "v2":
+            return render_LNF_v2(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
+                                 meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
+                                 window_title=window_title)
+        else:
+            return render_LNF_v1(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
+                                 meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
+                                 window_title=window_title)
+
+    chosen = _auto_variant_LNF(tx, ty, profondeur,
+                               dossier_left, dossier_bas,
+                               acc_left, acc_bas,
+                               meridienne_side, meridienne_len)
+
+    if chosen == "v2":
+        return render_LNF_v2(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
+                             meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
+                             window_title=window_title)
+    else:
+        return render_LNF_v1(tx, ty, profondeur, dossier_left, dossier_bas, acc_left, acc_bas,
+                             meridienne_side, meridienne_len, coussins, traversins=traversins, couleurs=couleurs,
+                             window_title=window_title)
+
+# =====================================================================
+# =====================  U (no fromage) — v1..v4  =====================
+# =====================================================================
+
+def compute_points_U_v1(
     tx,
     ty_left,
     tz_right,
@@ -4916,12 +7040,12 @@ def _choose_cushion_size_auto_U(variant, pts, drawn, traversins=None):
             best_tuple, best_s = score_tuple, s
     return best_s
 
-def _draw_cushions_variant_U(t, tr, variant, pts, size, drawn, traversins=None):
+def _place_cushions_variant_U(out, variant, pts, size, drawn, traversins=None):
     """
-    Draw cushions for the U‑shaped sofa, taking a possible méridienne into account.
+    Place cushions for the U‑shaped sofa, taking a possible méridienne into account.
 
     This function uses ``_best_orientation_score_U`` to determine the optimal
-    placement and then draws cushions on the bottom and both branches. The
+    placement and then lays cushions out on the bottom and both branches. The
     ``By_``/``By4_`` keys and optional traversins reduce the available
     height as needed.
     """
@@ -4950,10 +7074,7 @@ def _draw_cushions_variant_U(t, tr, variant, pts, size, drawn, traversins=None):
             (x, y + CUSHION_DEPTH),
             (x, y),
         ]
-        draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
-        )
-        label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "bas"})
         x += size
         count += 1
 
@@ -4968,10 +7089,7 @@ def _draw_cushions_variant_U(t, tr, variant, pts, size, drawn, traversins=None):
             (x, y + size),
             (x, y),
         ]
-        draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
-        )
-        label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "gauche"})
         y += size
         count += 1
 
@@ -4986,16 +7104,13 @@ def _draw_cushions_variant_U(t, tr, variant, pts, size, drawn, traversins=None):
             (x - CUSHION_DEPTH, y + size),
             (x - CUSHION_DEPTH, y),
         ]
-        draw_polygon_cm(
-            t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1
-        )
-        label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "droite"})
         y += size
         count += 1
 
     return count
 
-def _render_common_U(
+def _layout_common_U(
     variant,
     tx,
     ty_left,
@@ -5008,22 +7123,19 @@ def _render_common_U(
     acc_bas,
     acc_right,
     coussins,
-    window_title,
     compute_fn,
     build_fn,
     traversins=None,
-    couleurs=None,
     meridienne_side=None,
     meridienne_len=0,
+    alternatives=0,
 ):
     """
-    Common rendering routine for all U‑shaped sofa variants.
+    Common layout routine for all U‑shaped sofa variants.
 
-    This function computes the geometry via ``compute_fn`` (passing
-    through ``meridienne_side`` and ``meridienne_len``), builds the
-    polygons via ``build_fn``, draws the backs, seats, armrests,
-    cushions and traversins, and prints a textual report. The window
-    title is augmented to display the méridienne configuration.
+    Computes the geometry via ``compute_fn`` and ``build_fn``, then places
+    traversins and cushions without drawing anything. The ``drawn`` flags
+    returned by ``build_fn`` are kept in the result.
     """
     # Compute points with méridienne parameters
     pts = compute_fn(
@@ -5057,8 +7169,141 @@ def _render_common_U(
     # Ensure no seat exceeds maximum length
     _assert_banquettes_max_250(polys)
 
-    # Parse traversins and resolve colors
+    # Parse traversins
     trv = _parse_traversins_spec(traversins, allowed={"g", "d"})
+
+    # Place traversins
+    trv_rects = []
+    _place_traversins_U_common(trv_rects, variant, pts, profondeur, trv)
+
+    # Place cushions
+    cushions = []
+    valise_alts = None
+    spec = _parse_coussins_spec(coussins)
+    if spec["mode"] == "auto":
+        size = _choose_cushion_size_auto_U(
+            variant, pts, drawn, traversins=trv
+        )
+        cushions_count = _place_cushions_variant_U(
+            cushions, variant, pts, size, drawn, traversins=trv
+        )
+        total_line = f"{coussins} → {cushions_count} × {size} cm"
+    elif spec["mode"] == "fixed":
+        size = int(spec["fixed"])
+        cushions_count = _place_cushions_variant_U(
+            cushions, variant, pts, size, drawn, traversins=trv
+        )
+        total_line = f"{coussins} → {cushions_count} × {size} cm"
+    elif spec["mode"] == "mix":
+        _place_U_mix(
+            variant, cushions, pts, drawn, spec["catalogue"], traversins=trv
+        )
+        total_line = _format_mix_counts_console(cushions)
+    else:
+        best = _optimize_valise_U(
+            variant,
+            pts,
+            drawn,
+            spec["range"],
+            spec["same"],
+            traversins=trv,
+            alternatives=alternatives,
+        )
+        if not best:
+            raise ValueError(
+                "Aucune configuration valise valide pour U."
+            )
+        valise_alts = best.get("alternatives")
+        sizes = best["sizes"]
+        shiftL = best.get("shiftL", False)
+        shiftR = best.get("shiftR", False)
+        cushions_count = _place_U_with_sizes(
+            variant,
+            cushions,
+            pts,
+            sizes,
+            drawn,
+            shiftL,
+            shiftR,
+            traversins=trv,
+        )
+        sb, sg, sd = (
+            sizes["bas"],
+            sizes["gauche"],
+            sizes["droite"],
+        )
+        total_line = _format_valise_counts_console(
+            {"bas": sb, "gauche": sg, "droite": sd},
+            best.get("counts", best.get("eval", {}).get("counts")),
+            cushions_count,
+        )
+
+    # Compute split bonus for backs
+    split_flags = polys.get("split_flags", {})
+    add_split = int(
+        split_flags.get("left", False)
+        and (drawn.get("D1") or drawn.get("D2"))
+    ) + int(
+        split_flags.get("bottom", False) and drawn.get("D3")
+    ) + int(
+        split_flags.get("right", False) and drawn.get("D5")
+    )
+
+    lay = _layout_result("U", variant, pts, polys, cushions, trv_rects,
+                         total_line, add_split, angles=0, alternatives=valise_alts)
+    lay["drawn"] = drawn
+    return lay
+
+def _render_common_U(
+    variant,
+    tx,
+    ty_left,
+    tz_right,
+    profondeur,
+    dossier_left,
+    dossier_bas,
+    dossier_right,
+    acc_left,
+    acc_bas,
+    acc_right,
+    coussins,
+    window_title,
+    compute_fn,
+    build_fn,
+    traversins=None,
+    couleurs=None,
+    meridienne_side=None,
+    meridienne_len=0,
+):
+    """
+    Common rendering routine for all U‑shaped sofa variants.
+
+    This function obtains the geometry and the cushion/traversin placement
+    from ``_layout_common_U`` (passing through ``meridienne_side`` and
+    ``meridienne_len``), draws the backs, seats, armrests, cushions and
+    traversins, and prints a textual report. The window title is augmented
+    to display the méridienne configuration.
+    """
+    lay = _layout_common_U(
+        variant,
+        tx,
+        ty_left,
+        tz_right,
+        profondeur,
+        dossier_left,
+        dossier_bas,
+        dossier_right,
+        acc_left,
+        acc_bas,
+        acc_right,
+        coussins,
+        compute_fn,
+        build_fn,
+        traversins=traversins,
+        meridienne_side=meridienne_side,
+        meridienne_len=meridienne_len,
+    )
+    pts, polys, counts = lay["pts"], lay["polys"], lay["counts"]
     legend_items = _resolve_and_apply_colors(couleurs)
 
     # Setup drawing canvas
@@ -5072,21 +7317,19 @@ def _render_common_U(
     t = turtle.Turtle(visible=False)
     t.speed(0)
     screen.tracer(False)
-    tr = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
+    tr = t.ctx.transform = WorldToScreen(tx, ty_canvas, WIN_W, WIN_H, PAD_PX, ZOOM)
 
     # Draw backs, seats and armrests
     for p in polys["dossiers"]:
         if _poly_has_area(p):
-            draw_polygon_cm(t, tr, p, fill=COLOR_DOSSIER)
+            draw_polygon_cm(t, tr, p, fill=t.ctx.palette["dossiers"], role="dossiers")
     for p in polys["banquettes"]:
-        draw_polygon_cm(t, tr, p, fill=COLOR_ASSISE)
+        draw_polygon_cm(t, tr, p, fill=t.ctx.palette["assise"], role="assise")
     for p in polys["accoudoirs"]:
-        draw_polygon_cm(t, tr, p, fill=COLOR_ACC)
+        draw_polygon_cm(t, tr, p, fill=t.ctx.palette["accoudoirs"], role="accoudoirs")
 
-    # Draw traversins and count
-    n_traversins = _draw_traversins_U_common(
-        t, tr, variant, pts, profondeur, trv
-    )
+    # Draw traversins
+    _draw_traversins(t, tr, lay["traversins"])
 
     # Dimension arrows
     draw_double_arrow_vertical_cm(
@@ -5100,10 +7343,8 @@ def _render_common_U(
     )
 
     # Label seats : afficher les dimensions sur deux lignes. Décaler légèrement selon l'orientation et la position.
-    banquette_sizes = []
     for poly in polys["banquettes"]:
         L, P = banquette_dims(poly)
-        banquette_sizes.append((L, P))
         # Première dimension sans unité suivie d'un « x », seconde avec « cm »
         text = f"{L}x\n{P} cm"
         xs = [p[0] for p in poly]
@@ -5131,58 +7372,7 @@ def _render_common_U(
             label_poly(t, tr, p, "15")
 
     # Draw cushions
-    spec = _parse_coussins_spec(coussins)
-    if spec["mode"] == "auto":
-        size = _choose_cushion_size_auto_U(
-            variant, pts, drawn, traversins=trv
-        )
-        cushions_count = _draw_cushions_variant_U(
-            t, tr, variant, pts, size, drawn, traversins=trv
-        )
-        total_line = f"{coussins} → {cushions_count} × {size} cm"
-    elif spec["mode"] == "fixed":
-        size = int(spec["fixed"])
-        cushions_count = _draw_cushions_variant_U(
-            t, tr, variant, pts, size, drawn, traversins=trv
-        )
-        total_line = f"{coussins} → {cushions_count} × {size} cm"
-    else:
-        best = _optimize_valise_U(
-            variant,
-            pts,
-            drawn,
-            spec["range"],
-            spec["same"],
-            traversins=trv,
-        )
-        if not best:
-            raise ValueError(
-                "Aucune configuration valise valide pour U."
-            )
-        sizes = best["sizes"]
-        shiftL = best.get("shiftL", False)
-        shiftR = best.get("shiftR", False)
-        cushions_count = _draw_U_with_sizes(
-            variant,
-            t,
-            tr,
-            pts,
-            sizes,
-            drawn,
-            shiftL,
-            shiftR,
-            traversins=trv,
-        )
-        sb, sg, sd = (
-            sizes["bas"],
-            sizes["gauche"],
-            sizes["droite"],
-        )
-        total_line = _format_valise_counts_console(
-            {"bas": sb, "gauche": sg, "droite": sd},
-            best.get("counts", best.get("eval", {}).get("counts")),
-            cushions_count,
-        )
+    _draw_cushions(t, tr, lay["cushions"])
 
     # Title and legend
     draw_title_center(
@@ -5196,17 +7386,6 @@ def _render_common_U(
     screen.tracer(True)
     t.hideturtle()
 
-    # Compute split bonus for backs
-    split_flags = polys.get("split_flags", {})
-    add_split = int(
-        split_flags.get("left", False)
-        and (drawn.get("D1") or drawn.get("D2"))
-    ) + int(
-        split_flags.get("bottom", False) and drawn.get("D3")
-    ) + int(
-        split_flags.get("right", False) and drawn.get("D5")
-    )
-
     # Print report
     print(f"=== Rapport canapé U (variant {variant}) ===")
     print(
@@ -5216,18 +7395,16 @@ def _render_common_U(
         f"Méridienne : {meridienne_side or '-'} ({meridienne_len} cm)"
     )
     print(
-        f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}"
+        f"Banquettes : {counts['banquettes']} → {counts['banquette_sizes']}"
     )
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
-    dossiers_count = _compute_dossiers_count(polys)
-    dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
     print(
-        f"Dossiers : {dossiers_str} (+{add_split} via scission) | Accoudoirs : {len(polys['accoudoirs'])}"
+        f"Dossiers : {_dossiers_str(counts['dossiers'])} (+{counts['dossiers_scission']} via scission) | Accoudoirs : {counts['accoudoirs']}"
     )
     print("Banquettes d’angle : 0")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins : {total_line}")
-    turtle.done()
+    print(f"Traversins : {counts['traversins']} × 70x30")
+    print(f"Coussins : {lay['coussins_line']}")
+    return turtle.done()
 
 def render_U_v1(
     tx,
@@ -5272,7 +7449,7 @@ def render_U_v1(
             raise ValueError(
                 "Méridienne droite impossible sans dossier droit."
             )
-    _render_common_U(
+    return _render_common_U(
         "v1",
         tx,
         ty_left,
@@ -5335,7 +7512,7 @@ def render_U_v2(
             raise ValueError(
                 "Méridienne droite impossible sans dossier droit."
             )
-    _render_common_U(
+    return _render_common_U(
         "v2",
         tx,
         ty_left,
@@ -5398,7 +7575,7 @@ def render_U_v3(
             raise ValueError(
                 "Méridienne droite impossible sans dossier droit."
             )
-    _render_common_U(
+    return _render_common_U(
         "v3",
         tx,
         ty_left,
@@ -5461,7 +7638,7 @@ def render_U_v4(
             raise ValueError(
                 "Méridienne droite impossible sans dossier droit."
             )
-    _render_common_U(
+    return _render_common_U(
         "v4",
         tx,
         ty_left,
@@ -5571,63 +7748,27 @@ def _metrics_U(
 
     return nb_banquettes, scissions, nb_le_200, ok
 
-def render_U(
+def _auto_variant_U(
     tx,
     ty_left,
     tz_right,
-    profondeur=DEPTH_STD,
-    dossier_left=True,
-    dossier_bas=True,
-    dossier_right=True,
-    acc_left=True,
-    acc_bas=True,
-    acc_right=True,
-    coussins="auto",
-    variant="auto",
-    traversins=None,
-    couleurs=None,
-    window_title="U — auto",
+    profondeur,
+    dossier_left,
+    dossier_bas,
+    dossier_right,
+    acc_left,
+    acc_bas,
+    acc_right,
     meridienne_side=None,
     meridienne_len=0,
 ):
     """
-    High‑level entry point to render a U‑shaped sofa. Automatically selects
-    an appropriate variant unless one is specified, taking into account
-    méridienne parameters. Validations ensure a méridienne does not
-    conflict with armrests or absent backs.
-
-    Parameters are the same as for individual render functions, with
-    additional ``meridienne_side`` and ``meridienne_len``.
+    Select the U variant used in automatic mode (see ``render_U``).
     """
-    # Validate méridienne configuration
-    if meridienne_side == "g":
-        if acc_left:
-            raise ValueError(
-                "Méridienne gauche interdite avec accoudoir gauche."
-            )
-        if not dossier_left:
-            raise ValueError(
-                "Méridienne gauche impossible sans dossier gauche."
-            )
-    if meridienne_side == "d":
-        if acc_right:
-            raise ValueError(
-                "Méridienne droite interdite avec accoudoir droit."
-            )
-        if not dossier_right:
-            raise ValueError(
-                "Méridienne droite impossible sans dossier droit."
-            )
-
-    v = (variant or "auto").lower()
-    # If a specific variant is requested, delegate directly
-    if v in ("v1", "v2", "v3", "v4"):
-        return {
-            "v1": render_U_v1,
-            "v2": render_U_v2,
-            "v3": render_U_v3,
-            "v4": render_U_v4,
-        }[v](
+    variants = ["v1", "v2", "v3", "v4"]
+    metrics = {
+        vv: _metrics_U(
+            vv,
             tx,
             ty_left,
             tz_right,
@@ -5638,31 +7779,8 @@ def render_U(
             acc_left,
             acc_bas,
             acc_right,
-            coussins,
-            window_title=f"{window_title} [{v}]",
-            traversins=traversins,
-            couleurs=couleurs,
-            meridienne_side=meridienne_side,
-            meridienne_len=meridienne_len,
-        )
-
-    # Automatic variant selection
-    variants = ["v1", "v2", "v3", "v4"]
-    metrics = {
-        vv: _metrics_U(
-            vv,
-            tx,
-            ty_left,
-            tz_right,
-            profondeur,
-            dossier_left,
-            dossier_bas,
-            dossier_right,
-            acc_left,
-            acc_bas,
-            acc_right,
-            meridienne_side,
-            meridienne_len,
+            meridienne_side,
+            meridienne_len,
         )
         for vv in variants
     }
@@ -5692,6 +7810,190 @@ def render_U(
             break
     if choice is None:
         choice = tied[0]
+    return choice
+
+def layout_U(
+    tx,
+    ty_left,
+    tz_right,
+    profondeur=DEPTH_STD,
+    dossier_left=True,
+    dossier_bas=True,
+    dossier_right=True,
+    acc_left=True,
+    acc_bas=True,
+    acc_right=True,
+    coussins="auto",
+    variant="auto",
+    traversins=None,
+    meridienne_side=None,
+    meridienne_len=0,
+    alternatives=0,
+):
+    """
+    Compute a U‑shaped sofa without drawing anything: same validations and
+    variant selection as ``render_U``, returning the geometry, the placed
+    cushions/traversins and the report counts (see ``compute_layout``).
+    """
+    # Validate méridienne configuration
+    if meridienne_side == "g":
+        if acc_left:
+            raise ValueError(
+                "Méridienne gauche interdite avec accoudoir gauche."
+            )
+        if not dossier_left:
+            raise ValueError(
+                "Méridienne gauche impossible sans dossier gauche."
+            )
+    if meridienne_side == "d":
+        if acc_right:
+            raise ValueError(
+                "Méridienne droite interdite avec accoudoir droit."
+            )
+        if not dossier_right:
+            raise ValueError(
+                "Méridienne droite impossible sans dossier droit."
+            )
+
+    v = (variant or "auto").lower()
+    if v not in ("v1", "v2", "v3", "v4"):
+        v = _auto_variant_U(
+            tx,
+            ty_left,
+            tz_right,
+            profondeur,
+            dossier_left,
+            dossier_bas,
+            dossier_right,
+            acc_left,
+            acc_bas,
+            acc_right,
+            meridienne_side,
+            meridienne_len,
+        )
+    compute_fn = {
+        "v1": compute_points_U_v1,
+        "v2": compute_points_U_v2,
+        "v3": compute_points_U_v3,
+        "v4": compute_points_U_v4,
+    }[v]
+    build_fn = {
+        "v1": build_polys_U_v1,
+        "v2": build_polys_U_v2,
+        "v3": build_polys_U_v3,
+        "v4": build_polys_U_v4,
+    }[v]
+    return _layout_common_U(
+        v,
+        tx,
+        ty_left,
+        tz_right,
+        profondeur,
+        dossier_left,
+        dossier_bas,
+        dossier_right,
+        acc_left,
+        acc_bas,
+        acc_right,
+        coussins,
+        compute_fn,
+        build_fn,
+        traversins=traversins,
+        meridienne_side=meridienne_side,
+        meridienne_len=meridienne_len,
+        alternatives=alternatives,
+    )
+
+def render_U(
+    tx,
+    ty_left,
+    tz_right,
+    profondeur=DEPTH_STD,
+    dossier_left=True,
+    dossier_bas=True,
+    dossier_right=True,
+    acc_left=True,
+    acc_bas=True,
+    acc_right=True,
+    coussins="auto",
+    variant="auto",
+    traversins=None,
+    couleurs=None,
+    window_title="U — auto",
+    meridienne_side=None,
+    meridienne_len=0,
+):
+    """
+    High‑level entry point to render a U‑shaped sofa. Automatically selects
+    an appropriate variant unless one is specified, taking into account
+    méridienne parameters. Validations ensure a méridienne does not
+    conflict with armrests or absent backs.
+
+    Parameters are the same as for individual render functions, with
+    additional ``meridienne_side`` and ``meridienne_len``.
+    """
+    # Validate méridienne configuration
+    if meridienne_side == "g":
+        if acc_left:
+            raise ValueError(
+                "Méridienne gauche interdite avec accoudoir gauche."
+            )
+        if not dossier_left:
+            raise ValueError(
+                "Méridienne gauche impossible sans dossier gauche."
+            )
+    if meridienne_side == "d":
+        if acc_right:
+            raise ValueError(
+                "Méridienne droite interdite avec accoudoir droit."
+            )
+        if not dossier_right:
+            raise ValueError(
+                "Méridienne droite impossible sans dossier droit."
+            )
+
+    v = (variant or "auto").lower()
+    # If a specific variant is requested, delegate directly
+    if v in ("v1", "v2", "v3", "v4"):
+        return {
+            "v1": render_U_v1,
+            "v2": render_U_v2,
+            "v3": render_U_v3,
+            "v4": render_U_v4,
+        }[v](
+            tx,
+            ty_left,
+            tz_right,
+            profondeur,
+            dossier_left,
+            dossier_bas,
+            dossier_right,
+            acc_left,
+            acc_bas,
+            acc_right,
+            coussins,
+            window_title=f"{window_title} [{v}]",
+            traversins=traversins,
+            couleurs=couleurs,
+            meridienne_side=meridienne_side,
+            meridienne_len=meridienne_len,
+        )
+
+    # Automatic variant selection
+    choice = _auto_variant_U(
+        tx,
+        ty_left,
+        tz_right,
+        profondeur,
+        dossier_left,
+        dossier_bas,
+        dossier_right,
+        acc_left,
+        acc_bas,
+        acc_right,
+        meridienne_side,
+        meridienne_len,
+    )
 
     # Delegate to the chosen variant
     return render_U(
@@ -5812,8 +8114,8 @@ def _choose_cushion_size_auto_simple_S1(x0, x1):
             best_score, best = score, s
     return best
 
-def _draw_coussins_simple_S1(t, tr, pts, size,
-                             meridienne_side=None, meridienne_len=0,
+def _place_coussins_simple_S1(out, pts, size,
+                              meridienne_side=None, meridienne_len=0,
                              traversins=None):
     x0 = pts["B0"][0]; x1 = pts["Bx"][0]
     if meridienne_side == 'g' and meridienne_len > 0:
@@ -5833,20 +8135,21 @@ def _draw_coussins_simple_S1(t, tr, pts, size,
     x = x0 + off; n = 0
     while x + size <= x1 + 1e-6:
         poly = [(x, y), (x+size, y), (x+size, y+CUSHION_DEPTH), (x, y+CUSHION_DEPTH), (x, y)]
-        draw_polygon_cm(t, tr, poly, fill=COLOR_CUSHION, outline=COLOR_CONTOUR, width=1)
-        label_poly(t, tr, poly, f"{size}", font=FONT_CUSHION)
+        out.append({"poly": poly, "size": size, "side": "bas"})
         x += size; n += 1
     return n
 
-def render_Simple1(tx,
+def layout_Simple1(tx,
                    profondeur=DEPTH_STD,
                    dossier=True,
                    acc_left=True, acc_right=True,
                    meridienne_side=None, meridienne_len=0,
                    coussins="auto",
-                   traversins=None,
-                   couleurs=None,
-                   window_title="Canapé simple 1"):
+                   traversins=None, alternatives=0):
+    """
+    Calcul complet d'un canapé simple (S1) sans aucun dessin (voir
+    layout_LF / compute_layout).
+    """
     pts   = compute_points_simple_S1(tx, profondeur, dossier, acc_left, acc_right,
                                      meridienne_side, meridienne_len)
     polys = build_polys_simple_S1(pts, dossier, acc_left, acc_right,
@@ -5854,6 +8157,60 @@ def render_Simple1(tx,
     _assert_banquettes_max_250(polys)
 
     trv = _parse_traversins_spec(traversins, allowed={"g","d"})
+
+    # profondeur totale (dossier + assise) : repère des traversins
+    y_base = DOSSIER_THICK if dossier else 0
+    prof_tot = profondeur + y_base
+
+    # Traversins (on travaille avec la profondeur totale)
+    trv_rects = []
+    _place_traversins_simple_S1(trv_rects, pts, prof_tot, dossier, trv)
+
+    # ===== COUSSINS =====
+    cushions = []
+    valise_alts = None
+    spec = _parse_coussins_spec(coussins)
+    if spec["mode"] == "auto":
+        x0 = pts.get("B0_m", pts["B0"])[0] if meridienne_side == 'g' else pts["B0"][0]
+        x1 = pts.get("Bx_m", pts["Bx"])[0] if meridienne_side == 'd' else pts["Bx"][0]
+        if trv:
+            if "g" in trv: x0 += TRAVERSIN_THK
+            if "d" in trv: x1 -= TRAVERSIN_THK
+        size = _choose_cushion_size_auto_simple_S1(x0, x1)
+        nb_coussins = _place_coussins_simple_S1(cushions, pts, size, meridienne_side, meridienne_len, traversins=trv)
+        total_line = f"{coussins} → {nb_coussins} × {size} cm"
+    elif spec["mode"] == "fixed":
+        size = int(spec["fixed"])
+        nb_coussins = _place_coussins_simple_S1(cushions, pts, size, meridienne_side, meridienne_len, traversins=trv)
+        total_line = f"{coussins} → {nb_coussins} × {size} cm"
+    elif spec["mode"] == "mix":
+        _place_simple_mix(cushions, pts, spec["catalogue"], meridienne_side, meridienne_len, traversins=trv)
+        total_line = _format_mix_counts_console(cushions)
+    else:
+        best = _optimize_valise_simple(pts, spec["range"], meridienne_side, meridienne_len, traversins=trv, alternatives=alternatives)
+        if not best:
+            raise ValueError("Aucune configuration valise valide pour S1.")
+        valise_alts = best.get("alternatives")
+        size = best["size"]
+        nb_coussins = _place_simple_with_size(cushions, pts, size, meridienne_side, meridienne_len, traversins=trv)
+        total_line = f"{nb_coussins} × {size} cm"
+
+    add_split = int(polys.get("split_flags",{}).get("center",False) and dossier)
+    return _layout_result("S1", None, pts, polys, cushions, trv_rects,
+                          total_line, add_split, angles=0, alternatives=valise_alts)
+
+def render_Simple1(tx,
+                   profondeur=DEPTH_STD,
+                   dossier=True,
+                   acc_left=True, acc_right=True,
+                   meridienne_side=None, meridienne_len=0,
+                   coussins="auto",
+                   traversins=None,
+                   couleurs=None,
+                   window_title="Canapé simple 1"):
+    lay = layout_Simple1(tx, profondeur, dossier, acc_left, acc_right,
+                         meridienne_side, meridienne_len, coussins, traversins)
+    polys, counts = lay["polys"], lay["counts"]
     legend_items = _resolve_and_apply_colors(couleurs)
 
     # profondeur totale pour l'affichage : dossier + assise
@@ -5864,19 +8221,19 @@ def render_Simple1(tx,
     screen.title(f"{window_title} — tx={tx} / prof={profondeur} — méridienne {meridienne_side or '-'}={meridienne_len} — coussins={coussins}")
     t = turtle.Turtle(visible=False); t.speed(0); screen.tracer(False)
     # utiliser la profondeur totale pour le repère
-    tr = WorldToScreen(tx, prof_tot, WIN_W, WIN_H, PAD_PX, ZOOM)
+    tr = t.ctx.transform = WorldToScreen(tx, prof_tot, WIN_W, WIN_H, PAD_PX, ZOOM)
 
     # (Quadrillage et repères supprimés)
 
     for p in polys["dossiers"]:
-        if _poly_has_area(p):  draw_polygon_cm(t, tr, p, fill=COLOR_DOSSIER)
+        if _poly_has_area(p):  draw_polygon_cm(t, tr, p, fill=t.ctx.palette["dossiers"], role="dossiers")
     for p in polys["banquettes"]:
-        draw_polygon_cm(t, tr, p, fill=COLOR_ASSISE)
+        draw_polygon_cm(t, tr, p, fill=t.ctx.palette["assise"], role="assise")
     for p in polys["accoudoirs"]:
-        draw_polygon_cm(t, tr, p, fill=COLOR_ACC)
+        draw_polygon_cm(t, tr, p, fill=t.ctx.palette["accoudoirs"], role="accoudoirs")
 
-    # Traversins + comptage (on travaille avec la profondeur totale)
-    n_traversins = _draw_traversins_simple_S1(t, tr, pts, prof_tot, dossier, trv)
+    # Traversins
+    _draw_traversins(t, tr, lay["traversins"])
 
     # Flèche de profondeur = profondeur TOTALE (dossier + assise)
     # - avec dossier: prof_tot = profondeur + DOSSIER_THICK, ex : 80 cm
@@ -5891,10 +8248,8 @@ def render_Simple1(tx,
     # Largeur identique
     draw_double_arrow_horizontal_cm(t, tr, -25, 0, tx, f"{tx} cm")
 
-    banquette_sizes = []
     for poly in polys["banquettes"]:
         L, P = banquette_dims(poly)
-        banquette_sizes.append((L, P))
         # Première dimension sans unité avec un « x », seconde dimension avec « cm »
         text = f"{L}x\n{P} cm"
         xs = [p[0] for p in poly]
@@ -5913,505 +8268,906 @@ def render_Simple1(tx,
         if _poly_has_area(p): label_poly(t, tr, p, "15")
 
     # ===== COUSSINS =====
-    spec = _parse_coussins_spec(coussins)
-    if spec["mode"] == "auto":
-        x0 = pts.get("B0_m", pts["B0"])[0] if meridienne_side == 'g' else pts["B0"][0]
-        x1 = pts.get("Bx_m", pts["Bx"])[0] if meridienne_side == 'd' else pts["Bx"][0]
-        if trv:
-            if "g" in trv: x0 += TRAVERSIN_THK
-            if "d" in trv: x1 -= TRAVERSIN_THK
-        size = _choose_cushion_size_auto_simple_S1(x0, x1)
-        nb_coussins = _draw_coussins_simple_S1(t, tr, pts, size, meridienne_side, meridienne_len, traversins=trv)
-        total_line = f"{coussins} → {nb_coussins} × {size} cm"
-    elif spec["mode"] == "fixed":
-        size = int(spec["fixed"])
-        nb_coussins = _draw_coussins_simple_S1(t, tr, pts, size, meridienne_side, meridienne_len, traversins=trv)
-        total_line = f"{coussins} → {nb_coussins} × {size} cm"
-    else:
-        best = _optimize_valise_simple(pts, spec["range"], meridienne_side, meridienne_len, traversins=trv)
-        if not best:
-            raise ValueError("Aucune configuration valise valide pour S1.")
-        size = best["size"]
-        nb_coussins = _draw_simple_with_size(t, tr, pts, size, meridienne_side, meridienne_len, traversins=trv)
-        total_line = f"{nb_coussins} × {size} cm"
+    _draw_cushions(t, tr, lay["cushions"])
 
     # Légende
     draw_legend(t, tr, tx, profondeur, items=legend_items, pos="top-right")
 
     screen.tracer(True); t.hideturtle()
-    add_split = int(polys.get("split_flags",{}).get("center",False) and dossier)
     print("=== Rapport Canapé simple 1 ===")
     print(f"Dimensions : {tx}×{profondeur} cm")
-    print(f"Banquettes : {len(polys['banquettes'])} → {banquette_sizes}")
+    print(f"Banquettes : {counts['banquettes']} → {counts['banquette_sizes']}")
     # Comptage pondéré des dossiers : <=110cm → 0.5, >110cm → 1
-    dossiers_count = _compute_dossiers_count(polys)
-    dossiers_str = f"{int(dossiers_count)}" if abs(dossiers_count - int(dossiers_count)) < 1e-9 else f"{dossiers_count}"
-    print(f"Dossiers   : {dossiers_str} (+{add_split} via scission)  |  Accoudoirs : {len(polys['accoudoirs'])}")
+    print(f"Dossiers   : {_dossiers_str(counts['dossiers'])} (+{counts['dossiers_scission']} via scission)  |  Accoudoirs : {counts['accoudoirs']}")
     print(f"Banquettes d’angle : 0")
-    print(f"Traversins : {n_traversins} × 70x30")
-    print(f"Coussins   : {total_line}")
+    print(f"Traversins : {counts['traversins']} × 70x30")
+    print(f"Coussins   : {lay['coussins_line']}")
     if meridienne_side:
         print(f"Méridienne : côté {'gauche' if meridienne_side=='g' else 'droit'} — {meridienne_len} cm")
-    turtle.done()
+    return turtle.done()
 
 # =====================================================================
-# =====================  TESTS ÉTENDUS (30)  ==========================
+# =====================  LAYOUT PUR (sans dessin)  ====================
 # =====================================================================
+# compute_layout({"render": "render_U", "params": {...}}) : même forme de
+# configuration que le rendu par lots et le schéma du devis PDF. Aucun
+# écran n'est ouvert (matplotlib n'est pas importé) ; les render_* passent
+# par les mêmes layout_* puis ne font que dessiner.
+
+# nom de rendu -> (fonction layout_*, variante imposée)
+_LAYOUT_FUNCS = {
+    "render_Simple1":     ("layout_Simple1", None),
+    "render_LF_variant":  ("layout_LF", None),
+    "render_LNF":         ("layout_LNF", None),
+    "render_LNF_v1":      ("layout_LNF", "v1"),
+    "render_LNF_v2":      ("layout_LNF", "v2"),
+    "render_U":           ("layout_U", None),
+    "render_U_v1":        ("layout_U", "v1"),
+    "render_U_v2":        ("layout_U", "v2"),
+    "render_U_v3":        ("layout_U", "v3"),
+    "render_U_v4":        ("layout_U", "v4"),
+    "render_U1F":         ("layout_U1F", None),
+    "render_U1F_v1":      ("layout_U1F", "v1"),
+    "render_U1F_v2":      ("layout_U1F", "v2"),
+    "render_U1F_v3":      ("layout_U1F", "v3"),
+    "render_U1F_v4":      ("layout_U1F", "v4"),
+    "render_U2f_variant": ("layout_U2f", None),
+}
 
+# paramètres purement visuels des render_*, ignorés par le layout
+_LAYOUT_VISUAL_PARAMS = ("couleurs", "window_title")
 
 
+def compute_layout(config, alternatives=0):
+    """
+    Calcule un canapé sans le dessiner.
+
+    config : {"render": "render_U", "params": {...}} (params nommés, comme
+    pour le rendu par lots). Retourne le dict de layout_* : "family",
+    "variant" (variante retenue, None si la famille n'en a pas), "pts",
+    "polys", "cushions" ([{"poly", "size", "side"}] en cm), "traversins"
+    ([{"rect": (x0, y0, x1, y1), "side"}] en cm), "counts" (banquettes,
+    dossiers, accoudoirs, angles, traversins, coussins) et "coussins_line"
+    (ligne « Coussins » du rapport), plus "valise_alternatives" en mode
+    valise si alternatives > 0 (cf. _valise_alternatives). Lève ValueError
+    comme le render_*.
+    """
+    name = config.get("render")
+    if name not in _LAYOUT_FUNCS:
+        raise ValueError(f"Fonction de rendu inconnue : {name!r}")
+    layout_name, forced_variant = _LAYOUT_FUNCS[name]
+    params = {k: v for k, v in (config.get("params") or {}).items()
+              if k not in _LAYOUT_VISUAL_PARAMS}
+    if layout_name == "layout_U1F":
+        # compat. anciens appels : ty/tz -> ty_left/tz_right (cf. render_U1F_v*)
+        if "ty_left" not in params and "ty" in params: params["ty_left"] = params.pop("ty")
+        if "tz_right" not in params and "tz" in params: params["tz_right"] = params.pop("tz")
+    if forced_variant:
+        params["variant"] = forced_variant
+    lay = globals()[layout_name](**params, alternatives=alternatives)
+    lay["render"] = name
+    return lay
+
+
+def render_function(name):
+    """
+    Fonction render_* de canapé désignée par son nom (configurations JSON :
+    rendu par lots, schéma du devis PDF). Lève ValueError pour tout autre
+    nom, y compris les fonctions utilitaires (render_image, ...).
+    """
+    if not (isinstance(name, str) and name in _LAYOUT_FUNCS):
+        raise ValueError(f"Fonction de rendu inconnue : {name!r}")
+    return globals()[name]
 
-def TEST_22_LNF_v1_mer_bas_split_TRb_gs():
-    render_LNF(
-        tx=250, ty=260, profondeur=70,
-        dossier_left=True, dossier_bas=True,
-        acc_left=True, acc_bas=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="p", variant="v2",
-        traversins="None",
-        window_title="T22 — LNF v1 | méridienne bas | split bas | g:s | TR bas"
-    )
-
-
-def TEST_23_LNF_v1_grand_scission_valise_TRgb_palette():
-    render_LNF(
-        tx=540, ty=360, profondeur=70,
-        dossier_left=True, dossier_bas=True,
-        acc_left=True, acc_bas=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="valise", variant="v1",
-        traversins="g,b",
-        couleurs="accoudoirs:gris foncé; assise:gris très clair presque blanc; coussins:#8B7E74",
-        window_title="T23 — LNF v1 | grandes longueurs | valise | TR G+B | palette"
-    )
-
-
-def TEST_24_LNF_v2_mer_gauche_split_TRg_ps():
-    render_LNF(
-        tx=280, ty=360, profondeur=70,
-        dossier_left=True, dossier_bas=True,
-        acc_left=False, acc_bas=True,               # méridienne gauche -> pas d'accoudoir gauche (déjà OFF)
-        meridienne_side='g', meridienne_len=90,
-        coussins="p:s", variant="v2",
-        traversins="g",
-        window_title="T24 — LNF v2 | méridienne G 90 | split gauche | p:s | TR G"
-    )
-
-
-def TEST_25_LNF_v2_mer_bas_split_TRb_auto():
-    render_LNF(
-        tx=520, ty=280, profondeur=80,
-        dossier_left=True, dossier_bas=True,
-        acc_left=True, acc_bas=False,               # méridienne bas -> pas d'accoudoir bas
-        meridienne_side='b', meridienne_len=140,
-        coussins="auto", variant="v2",
-        traversins="b",
-        window_title="T25 — LNF v2 | méridienne bas 140 | split bas | auto | TR bas"
-    )
-
-
-def TEST_26_LF_mer_bas_TRgb_palette_dict():
-    render_LF_variant(
-        tx=420, ty=440, profondeur=80,
-        dossier_left=False, dossier_bas=True,
-        acc_left=True, acc_bas=False,               # méridienne bas -> pas d'accoudoir bas
-        meridienne_side='b', meridienne_len=50,
-        coussins="90", traversins="",
-        couleurs={"accoudoirs": "anthracite", "assise": "crème", "coussins": "#c0ffee"},
-        window_title="T26 — LF | méridienne bas 100 | TR G+B | palette dict"
-    )
-
-
-def TEST_27_LF_valise_sans_mer_TRg_split():
-    render_LF_variant(
-        tx=500, ty=500, profondeur=70,
-        dossier_left=True, dossier_bas=True,
-        acc_left=True, acc_bas=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="valise", traversins="g",
-        window_title="T27 — LF | valise | sans méridienne | TR G | grandes longueurs"
-    )
-
-
-def TEST_28_S1_TR_both_auto_palette():
-    render_Simple1(
-        tx=260, profondeur=70, dossier=True,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="auto", traversins="g,d",
-        couleurs="accoudoirs:#444444; assise:#f0f0f0; coussins:#b38b6d",
-        window_title="T28 — S1 | dossier | TR G+D | auto | palette"
-    )
-
-
-def TEST_29_S1_mer_droite_120_no_accR_90_TRg():
-    render_Simple1(
-        tx=320, profondeur=70, dossier=True,
-        acc_left=True, acc_right=False,             # méridienne droite -> pas d'accoudoir droit
-        meridienne_side='d', meridienne_len=120,
-        coussins="90", traversins="g",
-        couleurs=None,
-        window_title="T29 — S1 | méridienne D 120 | accR OFF | 90 | TR G"
-    )
-
-
-def TEST_30_U_v1_left_TRg_auto_no_dossier_droit():
-    render_U(
-        tx=240, ty_left=260, tz_right=260, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=False, acc_bas=True, acc_right=False,
-        coussins="p", variant="v4", traversins=None,
-        meridienne_side='d', meridienne_len=20,
-        window_title="T30 — U v1 | pas de dossier droit | TR G | auto"
-    )
-
-
-def TEST_31_U_v1_TR_both_80_palette():
-    render_U(
-        tx=420, ty_left=400, tz_right=420, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_bas=True, acc_right=True,
-        coussins="auto", variant="v4", traversins="",
-        couleurs="accoudoirs:#333333; assise:#f5f5f5; coussins:#a67c52",
-        window_title="T31 — U v1 | TR G+D | 80 | palette"
-    )
-
-
-def TEST_32_U_auto_valise_g():
-    render_U(
-        tx=520, ty_left=420, tz_right=420, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_bas=True, acc_right=True,
-        coussins="valise", variant="auto", traversins="g",
-        couleurs=None,
-        window_title="T32 — U auto | valise g"
-    )
-
-
-def TEST_33_U_v3_valise_p_sans_TR():
-    render_U(
-        tx=460, ty_left=380, tz_right=360, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_bas=True, acc_right=True,
-        coussins="p", variant="v3", traversins=None,
-        couleurs=None,
-        window_title="T33 — U v3 | valise p | sans TR"
-    )
-
-
-def TEST_34_U_v4_TR_both_75_palette_hex():
-    render_U(
-        tx=300, ty_left=400, tz_right=480, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_bas=True, acc_right=True,
-        coussins="75", variant="v4", traversins="g,d",
-        couleurs="accoudoirs:#4b4b4b; assise:#f6f6f6; coussins:#8B7E74",
-        window_title="T34 — U v4 | TR G+D | 75 | palette hex"
-    )
-
-
-def TEST_35_U2F_mer_g_120_no_accL_s_TRd():
-    render_U2f_variant(
-        tx=520, ty_left=450, tz_right=450, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=False, acc_bas=True, acc_right=True,   # méridienne gauche -> pas d'accoudoir gauche
-        meridienne_side='g', meridienne_len=120,
-        coussins="s", traversins="d",
-        window_title="T35 — U2F | méridienne G 120 | accL OFF | s | TR D"
-    )
-
-
-def TEST_36_U2F_mer_d_100_no_accR_80_TRg():
-    render_U2f_variant(
-        tx=520, ty_left=420, tz_right=330, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_bas=True, acc_right=False,   # méridienne droite -> pas d'accoudoir droit
-        meridienne_side='d', meridienne_len=100,
-        coussins="g", traversins="g",
-        window_title="T36 — U2F | méridienne D 100 | accR OFF | 80 | TR G"
-    )
-
-
-def TEST_37_U2F_valise_same_TR_both():
-    render_U2f_variant(
-        tx=560, ty_left=540, tz_right=520, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=False, acc_bas=True, acc_right=True,
-        meridienne_side='g', meridienne_len=50,
-        coussins="g:s", traversins="g,d",
-        window_title="T37 — U2F | valise g:s | TR G+D"
-    )
-
-
-def TEST_38_U1F_v1_mer_g_90_no_accL_p_TRd():
-    render_U1F(
-        tx=400, ty_left=280, tz_right=300, profondeur=70,
-        dossier_left=False, dossier_bas=False, dossier_right=True,
-        acc_left=False, acc_right=True,                  # méridienne gauche -> pas d'accoudoir gauche
-        meridienne_side='g', meridienne_len=90,
-        coussins="p", variant="v1",
-        traversins="d",
-        window_title="T38 — U1F v1 | méridienne G 90 | accL OFF | p | TR D"
-    )
-
-
-def TEST_39_U1F_v2_mer_d_110_no_accR_65_TRg():
-    render_U1F(
-        tx=520, ty_left=400, tz_right=420, profondeur=80,
-        dossier_left=False, dossier_bas=False, dossier_right=True,
-        acc_left=True, acc_right=False,                 # méridienne droite -> pas d'accoudoir droit
-        meridienne_side='d', meridienne_len=110,
-        coussins="65", variant="v2",
-        traversins="g",
-        window_title="T39 — U1F v2 | méridienne D 110 | accR OFF | 65 | TR G"
-    )
-
-
-def TEST_40_U1F_v3_TR_both_valise_g_palette():
-    render_U1F(
-        tx=380, ty_left=320, tz_right=300, profondeur=70,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="g", variant="v3",
-        traversins="g,d",
-        couleurs={"accoudoirs": "gris", "assise": "crème", "coussins": "taupe"},
-        window_title="T40 — U1F v3 | TR G+D | valise g | palette dict"
-    )
-
-
-def TEST_41_U1F_v4_valise_TRg():
-    render_U1F(
-        tx=400, ty_left=280, tz_right=320, profondeur=70,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="valise", variant="v4",
-        traversins="g",
-        window_title="T41 — U1F v4 | valise | TR G"
-    )
-
-
-def TEST_42_U1F_v4_auto_sans_TR():
-    render_U1F(
-        tx=460, ty_left=400, tz_right=480, profondeur=70,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="auto", variant="v4",
-        traversins=None,
-        window_title="T42 — U1F v4 | auto | pas de TR"
-    )
-
-
-def TEST_43_U1F_v2_grand_split_TRg_palette():
-    render_U1F(
-        tx=520, ty_left=450, tz_right=430, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="p:s", variant="v2",
-        traversins="g",
-        couleurs="accoudoirs:anthracite; assise:gris très clair; coussins:#e0d9c7",
-        window_title="T43 — U1F v2 | grandes longueurs (scissions) | p:s | TR G | palette"
-    )
-
-
-def TEST_44_U1F_v3_split_droite_TRd_ps():
-    render_U1F(
-        tx=460, ty_left=300, tz_right=360, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="p:s", variant="v3",
-        traversins="d",
-        window_title="T44 — U1F v3 | split droite | p:s | TR D"
-    )
-
-
-def TEST_45_U1F_v4_TR_both_90_palette_dict():
-    render_U1F(
-        tx=420, ty_left=300, tz_right=300, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="90", variant="v4",
-        traversins="g,d",
-        couleurs={"accoudoirs": "gris", "assise": "blanc", "coussins": "#8B7E74"},
-        window_title="T45 — U1F v4 | TR G+D | 90 | palette dict"
-    )
-
-
-def TEST_46_LNF_v1_palette_lighten_dossiers_auto():
-    render_LNF(
-        tx=300, ty=280, profondeur=70,
-        dossier_left=True, dossier_bas=True,
-        acc_left=True, acc_bas=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="80", variant="v1",
-        traversins=None,
-        couleurs={"accoudoirs": "anthracite fonce", "assise": "gris très clair", "coussins": "#b5651d"},
-        window_title="T46 — LNF v1 | palette lighten dossiers auto"
-    )
+# =====================================================================
+# =====================  INSTRUMENTATION (temps par phase)  ===========
+# =====================================================================
+# Activée à la demande, par thread :
+#     with instrument() as stats:
+#         render_image(render_U, tx=450, ty_left=250, tz_right=250)
+#     stats.renders[-1]  -> {"render": "render_U", "seconds": ..., "phases": {...}, "evals": {...}}
+# Phases (temps inclusifs, une phase imbriquée dans elle-même n'est comptée
+# qu'une fois) : render, layout, compute_points, build_polys, optimize
+# (_optimize_valise_*), draw (tracé de la liste d'affichage sur l'écran),
+# encode (savefig / plt.show). Les évaluations des optimiseurs (_eval_*_counts)
+# sont seulement comptées. Désactivée, chaque phase enveloppée ne coûte qu'un
+# getattr sur le thread-local ; les compteurs d'évaluations (appelées des
+# milliers de fois par rendu) ne sont installés que tant qu'un instrument()
+# est ouvert, dans n'importe quel thread.
+
+# nom -> fonction _eval_*_counts d'origine (cf. _instrument_module)
+_EVAL_FUNCS = {}
+_instrument_users = 0
+_instrument_lock = threading.Lock()
+
+class RenderStats:
+    """
+    Mesures collectées par instrument() : totaux (phases, evals) et un
+    enregistrement par appel render_* de premier niveau (renders).
+    log : flux (une ligne JSON par rendu) ou fonction appelée avec le dict.
+    """
 
+    def __init__(self, log=None):
+        self.log = log
+        self.phases = {}
+        self.evals = {}
+        self.renders = []
+        self._current = None
+        self._active = set()
+
+    def _add(self, phase, seconds):
+        for target in (self.phases, self._current and self._current["phases"]):
+            if target is None:
+                continue
+            entry = target.setdefault(phase, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+
+    def count(self, name):
+        self.evals[name] = self.evals.get(name, 0) + 1
+        if self._current is not None:
+            evals = self._current["evals"]
+            evals[name] = evals.get(name, 0) + 1
+
+    def call(self, phase, fn, args, kwargs):
+        if phase in self._active:
+            return fn(*args, **kwargs)
+        record = None
+        if phase == "render":
+            record = self._current = {"render": fn.__name__, "seconds": 0.0,
+                                      "phases": {}, "evals": {}}
+        self._active.add(phase)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if record is not None:
+                record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            dt = time.perf_counter() - t0
+            self._active.discard(phase)
+            self._add(phase, dt)
+            if record is not None:
+                record["seconds"] = dt
+                self._current = None
+                self.renders.append(record)
+                self._emit(record)
+
+    @contextlib.contextmanager
+    def timer(self, phase):
+        if phase in self._active:
+            yield
+            return
+        self._active.add(phase)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._active.discard(phase)
+            self._add(phase, time.perf_counter() - t0)
+
+    def _emit(self, record):
+        if self.log is None:
+            return
+        if callable(self.log):
+            self.log(record)
+        else:
+            self.log.write(_stats_json(record) + "\n")
 
-def TEST_47_LNF_v2_palette_string_accents_TRb():
-    render_LNF(
-        tx=320, ty=300, profondeur=80,
-        dossier_left=True, dossier_bas=True,
-        acc_left=True, acc_bas=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="auto", variant="v2",
-        traversins="b",
-        couleurs="accoudoirs:gris; dossiers:gris clair; assise:crème; coussins:taupe",
-        window_title="T47 — LNF v2 | palette string (accents) | TR bas"
-    )
+    def as_dict(self):
+        return {"phases": self.phases, "evals": self.evals, "renders": self.renders}
 
+    def to_json(self):
+        """Toutes les mesures sur une ligne JSON."""
+        return _stats_json(self.as_dict())
 
-def TEST_48_S1_sans_dossier_TR_both_auto():
-    render_Simple1(
-        tx=300, profondeur=70, dossier=False,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="auto", traversins="g,d",
-        couleurs=None,
-        window_title="T48 — S1 | sans dossier | TR G+D | auto"
-    )
 
+def _stats_json(data):
+    import json
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
 
-def TEST_49_LF_valise_same_TRg():
-    render_LF_variant(
-        tx=460, ty=460, profondeur=70,
-        dossier_left=True, dossier_bas=True,
-        acc_left=True, acc_bas=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="valise", traversins="g",
-        couleurs=None,
-        window_title="T49 — LF | valise | TR G | mêmes longueurs"
-    )
 
+@contextlib.contextmanager
+def instrument(log=None):
+    """
+    Active l'instrumentation pour le thread courant et fournit le
+    RenderStats ; l'état précédent est restauré en sortie.
 
-def TEST_50_U_v2_valise_same_TRg_palette():
-    render_U(
-        tx=460, ty_left=460, tz_right=460, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_bas=True, acc_right=True,
-        coussins="valise", variant="v2", traversins="g",
-        couleurs="accoudoirs:#444444; assise:#f0f0f0; coussins:#b38b6d",
-        window_title="T50 — U v2 | valise | TR G | mêmes longueurs | palette"
-    )
+    Exemple :
+        with instrument(log=sys.stderr) as stats:
+            render_image(render_LNF, tx=280, ty=250)
+        print(stats.to_json())
+    """
+    previous = getattr(_local, "stats", None)
+    stats = _local.stats = RenderStats(log)
+    _eval_counters(+1)
+    try:
+        yield stats
+    finally:
+        _local.stats = previous
+        _eval_counters(-1)
+
+
+def _eval_counters(delta):
+    """Installe les compteurs d'évaluations au premier instrument(), les retire au dernier."""
+    global _instrument_users
+    with _instrument_lock:
+        _instrument_users += delta
+        if _instrument_users == (1 if delta > 0 else 0):
+            g = globals()
+            for name, fn in _EVAL_FUNCS.items():
+                g[name] = _counted(fn) if delta > 0 else fn
+
+
+def _phase_timer(phase):
+    stats = getattr(_local, "stats", None)
+    return contextlib.nullcontext() if stats is None else stats.timer(phase)
+
+
+def _timed(phase, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        stats = getattr(_local, "stats", None)
+        if stats is None:
+            return fn(*args, **kwargs)
+        return stats.call(phase, fn, args, kwargs)
+    return wrapper
+
+
+def _counted(fn):
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        stats = getattr(_local, "stats", None)
+        if stats is not None:
+            stats.count(name)
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def _instrument_module():
+    """Enveloppe, une fois au chargement, les fonctions de chaque phase."""
+    g = globals()
+    for name, fn in list(g.items()):
+        if not isinstance(fn, types.FunctionType):
+            continue
+        if name in _LAYOUT_FUNCS:
+            g[name] = _timed("render", fn)
+        elif name.startswith(("layout_", "_layout_common_")):
+            g[name] = _timed("layout", fn)
+        elif name.startswith("compute_points_"):
+            g[name] = _timed("compute_points", fn)
+        elif name.startswith("build_polys_"):
+            g[name] = _timed("build_polys", fn)
+        elif name.startswith("_optimize_valise_"):
+            g[name] = _timed("optimize", fn)
+        elif name.startswith("_eval_") and name.endswith("_counts"):
+            _EVAL_FUNCS[name] = fn
+
+
+_instrument_module()
 
+# =====================================================================
+# =====================  TESTS ÉTENDUS (30)  ==========================
+# =====================================================================
 
-def TEST_51_LNF_auto_dossier_bas_seul_TRb():
-    # LNF : uniquement dossier bas, choix de variante automatique
-    render_LNF(
-        tx=280, ty=220, profondeur=70,
-        dossier_left=False, dossier_bas=True,
-        acc_left=True, acc_bas=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="auto", variant="auto",
-        traversins="b",
-        couleurs="accoudoirs:gris; assise:gris très clair; coussins:taupe",
-        window_title="T51 — LNF auto | dossier bas seul | TR bas"
-    )
 
 
-def TEST_52_LNF_auto_dossier_gauche_seul_TRg_palette_dict():
-    # LNF : uniquement dossier gauche, test de variant=auto + palette dictionnaire
-    render_LNF(
-        tx=240, ty=360, profondeur=70,
-        dossier_left=False, dossier_bas=True,
-        acc_left=True, acc_bas=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="65", variant="auto",
-        traversins=None,
-        couleurs={"accoudoirs": "anthracite",
-                  "assise": "gris très clair",
-                  "coussins": "#c8ad7f"},
-        window_title="T52 — LNF auto | dossier gauche seul | TR G | palette dict"
-    )
 
+# Scénarios de test : {"render", "params"} comme le rendu par lots et
+# compute_layout ; chaque entrée est aussi exposée comme fonction TEST_*()
+# (rendu interactif, cf. __main__) et sert de jeu de mesure à benchmark.py.
+TEST_SCENARIOS = {
+    "TEST_22_LNF_v1_mer_bas_split_TRb_gs": {
+        "render": "render_LNF",
+        "params": dict(
+            tx=250, ty=260, profondeur=70,
+            dossier_left=True, dossier_bas=True,
+            acc_left=True, acc_bas=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="p", variant="v2",
+            traversins="None",
+            window_title="T22 — LNF v1 | méridienne bas | split bas | g:s | TR bas"
+        ),
+    },
+    "TEST_23_LNF_v1_grand_scission_valise_TRgb_palette": {
+        "render": "render_LNF",
+        "params": dict(
+            tx=540, ty=360, profondeur=70,
+            dossier_left=True, dossier_bas=True,
+            acc_left=True, acc_bas=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="valise", variant="v1",
+            traversins="g,b",
+            couleurs="accoudoirs:gris foncé; assise:gris très clair presque blanc; coussins:#8B7E74",
+            window_title="T23 — LNF v1 | grandes longueurs | valise | TR G+B | palette"
+        ),
+    },
+    "TEST_24_LNF_v2_mer_gauche_split_TRg_ps": {
+        "render": "render_LNF",
+        "params": dict(
+            tx=280, ty=360, profondeur=70,
+            dossier_left=True, dossier_bas=True,
+            acc_left=False, acc_bas=True,               # méridienne gauche -> pas d'accoudoir gauche (déjà OFF)
+            meridienne_side='g', meridienne_len=90,
+            coussins="p:s", variant="v2",
+            traversins="g",
+            window_title="T24 — LNF v2 | méridienne G 90 | split gauche | p:s | TR G"
+        ),
+    },
+    "TEST_25_LNF_v2_mer_bas_split_TRb_auto": {
+        "render": "render_LNF",
+        "params": dict(
+            tx=520, ty=280, profondeur=80,
+            dossier_left=True, dossier_bas=True,
+            acc_left=True, acc_bas=False,               # méridienne bas -> pas d'accoudoir bas
+            meridienne_side='b', meridienne_len=140,
+            coussins="auto", variant="v2",
+            traversins="b",
+            window_title="T25 — LNF v2 | méridienne bas 140 | split bas | auto | TR bas"
+        ),
+    },
+    "TEST_26_LF_mer_bas_TRgb_palette_dict": {
+        "render": "render_LF_variant",
+        "params": dict(
+            tx=420, ty=440, profondeur=80,
+            dossier_left=False, dossier_bas=True,
+            acc_left=True, acc_bas=False,               # méridienne bas -> pas d'accoudoir bas
+            meridienne_side='b', meridienne_len=50,
+            coussins="90", traversins="",
+            couleurs={"accoudoirs": "anthracite", "assise": "crème", "coussins": "#c0ffee"},
+            window_title="T26 — LF | méridienne bas 100 | TR G+B | palette dict"
+        ),
+    },
+    "TEST_27_LF_valise_sans_mer_TRg_split": {
+        "render": "render_LF_variant",
+        "params": dict(
+            tx=500, ty=500, profondeur=70,
+            dossier_left=True, dossier_bas=True,
+            acc_left=True, acc_bas=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="valise", traversins="g",
+            window_title="T27 — LF | valise | sans méridienne | TR G | grandes longueurs"
+        ),
+    },
+    "TEST_28_S1_TR_both_auto_palette": {
+        "render": "render_Simple1",
+        "params": dict(
+            tx=260, profondeur=70, dossier=True,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="auto", traversins="g,d",
+            couleurs="accoudoirs:#444444; assise:#f0f0f0; coussins:#b38b6d",
+            window_title="T28 — S1 | dossier | TR G+D | auto | palette"
+        ),
+    },
+    "TEST_29_S1_mer_droite_120_no_accR_90_TRg": {
+        "render": "render_Simple1",
+        "params": dict(
+            tx=320, profondeur=70, dossier=True,
+            acc_left=True, acc_right=False,             # méridienne droite -> pas d'accoudoir droit
+            meridienne_side='d', meridienne_len=120,
+            coussins="90", traversins="g",
+            couleurs=None,
+            window_title="T29 — S1 | méridienne D 120 | accR OFF | 90 | TR G"
+        ),
+    },
+    "TEST_30_U_v1_left_TRg_auto_no_dossier_droit": {
+        "render": "render_U",
+        "params": dict(
+            tx=240, ty_left=260, tz_right=260, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=False, acc_bas=True, acc_right=False,
+            coussins="p", variant="v4", traversins=None,
+            meridienne_side='d', meridienne_len=20,
+            window_title="T30 — U v1 | pas de dossier droit | TR G | auto"
+        ),
+    },
+    "TEST_31_U_v1_TR_both_80_palette": {
+        "render": "render_U",
+        "params": dict(
+            tx=420, ty_left=400, tz_right=420, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_bas=True, acc_right=True,
+            coussins="auto", variant="v4", traversins="",
+            couleurs="accoudoirs:#333333; assise:#f5f5f5; coussins:#a67c52",
+            window_title="T31 — U v1 | TR G+D | 80 | palette"
+        ),
+    },
+    "TEST_32_U_auto_valise_g": {
+        "render": "render_U",
+        "params": dict(
+            tx=520, ty_left=420, tz_right=420, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_bas=True, acc_right=True,
+            coussins="valise", variant="auto", traversins="g",
+            couleurs=None,
+            window_title="T32 — U auto | valise g"
+        ),
+    },
+    "TEST_33_U_v3_valise_p_sans_TR": {
+        "render": "render_U",
+        "params": dict(
+            tx=460, ty_left=380, tz_right=360, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_bas=True, acc_right=True,
+            coussins="p", variant="v3", traversins=None,
+            couleurs=None,
+            window_title="T33 — U v3 | valise p | sans TR"
+        ),
+    },
+    "TEST_34_U_v4_TR_both_75_palette_hex": {
+        "render": "render_U",
+        "params": dict(
+            tx=300, ty_left=400, tz_right=480, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_bas=True, acc_right=True,
+            coussins="75", variant="v4", traversins="g,d",
+            couleurs="accoudoirs:#4b4b4b; assise:#f6f6f6; coussins:#8B7E74",
+            window_title="T34 — U v4 | TR G+D | 75 | palette hex"
+        ),
+    },
+    "TEST_35_U2F_mer_g_120_no_accL_s_TRd": {
+        "render": "render_U2f_variant",
+        "params": dict(
+            tx=520, ty_left=450, tz_right=450, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=False, acc_bas=True, acc_right=True,   # méridienne gauche -> pas d'accoudoir gauche
+            meridienne_side='g', meridienne_len=120,
+            coussins="s", traversins="d",
+            window_title="T35 — U2F | méridienne G 120 | accL OFF | s | TR D"
+        ),
+    },
+    "TEST_36_U2F_mer_d_100_no_accR_80_TRg": {
+        "render": "render_U2f_variant",
+        "params": dict(
+            tx=520, ty_left=420, tz_right=330, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_bas=True, acc_right=False,   # méridienne droite -> pas d'accoudoir droit
+            meridienne_side='d', meridienne_len=100,
+            coussins="g", traversins="g",
+            window_title="T36 — U2F | méridienne D 100 | accR OFF | 80 | TR G"
+        ),
+    },
+    "TEST_37_U2F_valise_same_TR_both": {
+        "render": "render_U2f_variant",
+        "params": dict(
+            tx=560, ty_left=540, tz_right=520, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=False, acc_bas=True, acc_right=True,
+            meridienne_side='g', meridienne_len=50,
+            coussins="g:s", traversins="g,d",
+            window_title="T37 — U2F | valise g:s | TR G+D"
+        ),
+    },
+    "TEST_38_U1F_v1_mer_g_90_no_accL_p_TRd": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=400, ty_left=280, tz_right=300, profondeur=70,
+            dossier_left=False, dossier_bas=False, dossier_right=True,
+            acc_left=False, acc_right=True,                  # méridienne gauche -> pas d'accoudoir gauche
+            meridienne_side='g', meridienne_len=90,
+            coussins="p", variant="v1",
+            traversins="d",
+            window_title="T38 — U1F v1 | méridienne G 90 | accL OFF | p | TR D"
+        ),
+    },
+    "TEST_39_U1F_v2_mer_d_110_no_accR_65_TRg": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=520, ty_left=400, tz_right=420, profondeur=80,
+            dossier_left=False, dossier_bas=False, dossier_right=True,
+            acc_left=True, acc_right=False,                 # méridienne droite -> pas d'accoudoir droit
+            meridienne_side='d', meridienne_len=110,
+            coussins="65", variant="v2",
+            traversins="g",
+            window_title="T39 — U1F v2 | méridienne D 110 | accR OFF | 65 | TR G"
+        ),
+    },
+    "TEST_40_U1F_v3_TR_both_valise_g_palette": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=380, ty_left=320, tz_right=300, profondeur=70,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="g", variant="v3",
+            traversins="g,d",
+            couleurs={"accoudoirs": "gris", "assise": "crème", "coussins": "taupe"},
+            window_title="T40 — U1F v3 | TR G+D | valise g | palette dict"
+        ),
+    },
+    "TEST_41_U1F_v4_valise_TRg": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=400, ty_left=280, tz_right=320, profondeur=70,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="valise", variant="v4",
+            traversins="g",
+            window_title="T41 — U1F v4 | valise | TR G"
+        ),
+    },
+    "TEST_42_U1F_v4_auto_sans_TR": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=460, ty_left=400, tz_right=480, profondeur=70,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="auto", variant="v4",
+            traversins=None,
+            window_title="T42 — U1F v4 | auto | pas de TR"
+        ),
+    },
+    "TEST_43_U1F_v2_grand_split_TRg_palette": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=520, ty_left=450, tz_right=430, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="p:s", variant="v2",
+            traversins="g",
+            couleurs="accoudoirs:anthracite; assise:gris très clair; coussins:#e0d9c7",
+            window_title="T43 — U1F v2 | grandes longueurs (scissions) | p:s | TR G | palette"
+        ),
+    },
+    "TEST_44_U1F_v3_split_droite_TRd_ps": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=460, ty_left=300, tz_right=360, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="p:s", variant="v3",
+            traversins="d",
+            window_title="T44 — U1F v3 | split droite | p:s | TR D"
+        ),
+    },
+    "TEST_45_U1F_v4_TR_both_90_palette_dict": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=420, ty_left=300, tz_right=300, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="90", variant="v4",
+            traversins="g,d",
+            couleurs={"accoudoirs": "gris", "assise": "blanc", "coussins": "#8B7E74"},
+            window_title="T45 — U1F v4 | TR G+D | 90 | palette dict"
+        ),
+    },
+    "TEST_46_LNF_v1_palette_lighten_dossiers_auto": {
+        "render": "render_LNF",
+        "params": dict(
+            tx=300, ty=280, profondeur=70,
+            dossier_left=True, dossier_bas=True,
+            acc_left=True, acc_bas=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="80", variant="v1",
+            traversins=None,
+            couleurs={"accoudoirs": "anthracite fonce", "assise": "gris très clair", "coussins": "#b5651d"},
+            window_title="T46 — LNF v1 | palette lighten dossiers auto"
+        ),
+    },
+    "TEST_47_LNF_v2_palette_string_accents_TRb": {
+        "render": "render_LNF",
+        "params": dict(
+            tx=320, ty=300, profondeur=80,
+            dossier_left=True, dossier_bas=True,
+            acc_left=True, acc_bas=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="auto", variant="v2",
+            traversins="b",
+            couleurs="accoudoirs:gris; dossiers:gris clair; assise:crème; coussins:taupe",
+            window_title="T47 — LNF v2 | palette string (accents) | TR bas"
+        ),
+    },
+    "TEST_48_S1_sans_dossier_TR_both_auto": {
+        "render": "render_Simple1",
+        "params": dict(
+            tx=300, profondeur=70, dossier=False,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="auto", traversins="g,d",
+            couleurs=None,
+            window_title="T48 — S1 | sans dossier | TR G+D | auto"
+        ),
+    },
+    "TEST_49_LF_valise_same_TRg": {
+        "render": "render_LF_variant",
+        "params": dict(
+            tx=460, ty=460, profondeur=70,
+            dossier_left=True, dossier_bas=True,
+            acc_left=True, acc_bas=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="valise", traversins="g",
+            couleurs=None,
+            window_title="T49 — LF | valise | TR G | mêmes longueurs"
+        ),
+    },
+    "TEST_50_U_v2_valise_same_TRg_palette": {
+        "render": "render_U",
+        "params": dict(
+            tx=460, ty_left=460, tz_right=460, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_bas=True, acc_right=True,
+            coussins="valise", variant="v2", traversins="g",
+            couleurs="accoudoirs:#444444; assise:#f0f0f0; coussins:#b38b6d",
+            window_title="T50 — U v2 | valise | TR G | mêmes longueurs | palette"
+        ),
+    },
+    "TEST_51_LNF_auto_dossier_bas_seul_TRb": {
+        "render": "render_LNF",
+        "params": dict(
+            tx=280, ty=220, profondeur=70,
+            dossier_left=False, dossier_bas=True,
+            acc_left=True, acc_bas=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="auto", variant="auto",
+            traversins="b",
+            couleurs="accoudoirs:gris; assise:gris très clair; coussins:taupe",
+            window_title="T51 — LNF auto | dossier bas seul | TR bas"
+        ),
+    },
+    "TEST_52_LNF_auto_dossier_gauche_seul_TRg_palette_dict": {
+        "render": "render_LNF",
+        "params": dict(
+            tx=240, ty=360, profondeur=70,
+            dossier_left=False, dossier_bas=True,
+            acc_left=True, acc_bas=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="65", variant="auto",
+            traversins=None,
+            couleurs={"accoudoirs": "anthracite",
+                      "assise": "gris très clair",
+                      "coussins": "#c8ad7f"},
+            window_title="T52 — LNF auto | dossier gauche seul | TR G | palette dict"
+        ),
+    },
+    "TEST_53_U1F_auto_TR_both_auto_palette": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=520, ty_left=360, tz_right=380, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="auto", variant="auto",
+            traversins="g,d",
+            couleurs="accoudoirs:gris foncé; assise:gris très clair; coussins:taupe",
+            window_title="T53 — U1F auto | TR G+D | palette"
+        ),
+    },
+    "TEST_54_U1F_v3_dossiers_gauche_et_bas_TRg": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=420, ty_left=320, tz_right=280, profondeur=75,
+            dossier_left=True, dossier_bas=True, dossier_right=False,
+            acc_left=True, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="p", variant="v3",
+            traversins="g",
+            window_title="T54 — U1F v3 | dossiers G+bas | TR G"
+        ),
+    },
+    "TEST_55_U1F_v4_dossier_droit_seul_TRd_palette": {
+        "render": "render_U1F",
+        "params": dict(
+            tx=450, ty_left=280, tz_right=340, profondeur=70,
+            dossier_left=False, dossier_bas=False, dossier_right=True,
+            acc_left=False, acc_right=True,
+            meridienne_side=None, meridienne_len=0,
+            coussins="s", variant="v4",
+            traversins="d",
+            couleurs="accoudoirs:gris; assise:blanc cassé; coussins:#b5651d",
+            window_title="T55 — U1F v4 | dossier droit seul | TR D | palette"
+        ),
+    },
+    # U v1 avec méridienne gauche 120 cm :
+    # - dossier gauche et bas présents
+    # - pas d'accoudoir gauche (acc_left=False obligatoire)
+    # - méridienne sur branche gauche (meridienne_side='g')
+    # - traversin à gauche
+    "TEST_56_U_v1_mer_g_120_no_accL_TRg": {
+        "render": "render_U",
+        "params": dict(
+            tx=520, ty_left=450, tz_right=420, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=False, acc_bas=True, acc_right=True,
+            meridienne_side="g", meridienne_len=120,
+            coussins="auto", variant="v1",
+            traversins="g",
+            couleurs="accoudoirs:anthracite; assise:gris très clair; coussins:taupe",
+            window_title="T56 — U v1 | méridienne G 120 | accL OFF | TR G"
+        ),
+    },
+    # U v2 avec méridienne droite 100 cm :
+    # - dossier droit et bas présents
+    # - pas d'accoudoir droit (acc_right=False obligatoire)
+    # - méridienne sur branche droite (meridienne_side='d')
+    # - traversin à droite
+    "TEST_57_U_v2_mer_d_100_no_accR_TRd": {
+        "render": "render_U",
+        "params": dict(
+            tx=580, ty_left=430, tz_right=460, profondeur=80,
+            dossier_left=True, dossier_bas=True, dossier_right=True,
+            acc_left=True, acc_bas=True, acc_right=False,
+            meridienne_side="d", meridienne_len=100,
+            coussins="80", variant="v2",
+            traversins="d",
+            couleurs="accoudoirs:#444444; assise:#f0f0f0; coussins:#b38b6d",
+            window_title="T57 — U v2 | méridienne D 100 | accR OFF | TR D"
+        ),
+    },
+}
 
-def TEST_53_U1F_auto_TR_both_auto_palette():
-    # U1F : 3 dossiers, TR gauche + droite, choix auto de la variante
-    render_U1F(
-        tx=520, ty_left=360, tz_right=380, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="auto", variant="auto",
-        traversins="g,d",
-        couleurs="accoudoirs:gris foncé; assise:gris très clair; coussins:taupe",
-        window_title="T53 — U1F auto | TR G+D | palette"
-    )
 
+def _scenario_runner(name):
+    def run():
+        spec = TEST_SCENARIOS[name]
+        return globals()[spec["render"]](**spec["params"])
+    run.__name__ = run.__qualname__ = name
+    return run
 
-def TEST_54_U1F_v3_dossiers_gauche_et_bas_TRg():
-    # U1F : variante v3 forcée, dossiers gauche + bas uniquement
-    render_U1F(
-        tx=420, ty_left=320, tz_right=280, profondeur=75,
-        dossier_left=True, dossier_bas=True, dossier_right=False,
-        acc_left=True, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="p", variant="v3",
-        traversins="g",
-        window_title="T54 — U1F v3 | dossiers G+bas | TR G"
-    )
 
+for _name in TEST_SCENARIOS:
+    globals()[_name] = _scenario_runner(_name)
+del _name
 
-def TEST_55_U1F_v4_dossier_droit_seul_TRd_palette():
-    # U1F : variante v4 forcée, uniquement dossier droit (cas limite pour D5 / couture Dx2–Bx)
-    render_U1F(
-        tx=450, ty_left=280, tz_right=340, profondeur=70,
-        dossier_left=False, dossier_bas=False, dossier_right=True,
-        acc_left=False, acc_right=True,
-        meridienne_side=None, meridienne_len=0,
-        coussins="s", variant="v4",
-        traversins="d",
-        couleurs="accoudoirs:gris; assise:blanc cassé; coussins:#b5651d",
-        window_title="T55 — U1F v4 | dossier droit seul | TR D | palette"
-    )
+# =====================================================================
+# =====================  RENDU PAR LOTS (CLI)  ========================
+# =====================================================================
+#   python -m canapematplot batch configs.jsonl --out dir/ --workers N [--cache DIR]
+#
+# Une ligne JSON par configuration :
+#   {"id": "devis-0042", "render": "render_U", "params": {"tx": 400, ...}}
+# "id" est optionnel (défaut : numéro de ligne). Pour chaque ligne, le
+# worker écrit <id>.png (ou .svg) et <id>.json (rapport console + statut).
 
-def TEST_56_U_v1_mer_g_120_no_accL_TRg():
-    """
-    U v1 avec méridienne gauche 120 cm :
-    - dossier gauche et bas présents
-    - pas d'accoudoir gauche (acc_left=False obligatoire)
-    - méridienne sur branche gauche (meridienne_side='g')
-    - traversin à gauche
-    """
-    render_U(
-        tx=520, ty_left=450, tz_right=420, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=False, acc_bas=True, acc_right=True,
-        meridienne_side="g", meridienne_len=120,
-        coussins="auto", variant="v1",
-        traversins="g",
-        couleurs="accoudoirs:anthracite; assise:gris très clair; coussins:taupe",
-        window_title="T56 — U v1 | méridienne G 120 | accL OFF | TR G"
-    )
+def _batch_safe_id(raw):
+    return "".join(c if (c.isalnum() or c in "-_.") else "_" for c in str(raw)) or "item"
 
 
-def TEST_57_U_v2_mer_d_100_no_accR_TRd():
+def _batch_render_item(item_id, line, out_dir, fmt, backend, dpi, min_round_px=0.0):
     """
-    U v2 avec méridienne droite 100 cm :
-    - dossier droit et bas présents
-    - pas d'accoudoir droit (acc_right=False obligatoire)
-    - méridienne sur branche droite (meridienne_side='d')
-    - traversin à droite
+    Rendu d'une ligne du lot (exécuté dans un processus worker).
+    Écrit l'image et le rapport JSON ; retourne un petit dict de statut.
     """
-    render_U(
-        tx=580, ty_left=430, tz_right=460, profondeur=80,
-        dossier_left=True, dossier_bas=True, dossier_right=True,
-        acc_left=True, acc_bas=True, acc_right=False,
-        meridienne_side="d", meridienne_len=100,
-        coussins="80", variant="v2",
-        traversins="d",
-        couleurs="accoudoirs:#444444; assise:#f0f0f0; coussins:#b38b6d",
-        window_title="T57 — U v2 | méridienne D 100 | accR OFF | TR D"
-    )
+    import json
+    import os
+    import time
+
+    report = {"id": item_id, "ok": False}
+    t0 = time.perf_counter()
+    console = io.StringIO()
+    try:
+        cfg = json.loads(line)
+        report["render"] = cfg.get("render")
+        report["params"] = cfg.get("params", {})
+        fn = render_function(report["render"])
+        with capture_console(console):
+            data = render_image(fn, fmt=fmt, dpi=dpi, backend=backend,
+                                min_round_px=min_round_px, **report["params"])
+        image = f"{item_id}.{fmt}"
+        with open(os.path.join(out_dir, image), "wb") as f:
+            f.write(data)
+        report["image"] = image
+        report["ok"] = True
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+    report["rapport"] = [l for l in console.getvalue().splitlines() if l.strip()]
+    report["duration_s"] = round(time.perf_counter() - t0, 4)
+    with open(os.path.join(out_dir, f"{item_id}.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return {"id": item_id, "ok": report["ok"], "error": report.get("error"),
+            "duration_s": report["duration_s"]}
+
+
+def _batch_main(args):
+    import json
+    import os
+    import sys
+    import time
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    os.makedirs(args.out, exist_ok=True)
+    items = []
+    with open(args.configs, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            item_id = f"{lineno:05d}"
+            try:
+                item_id = _batch_safe_id(json.loads(line).get("id", item_id))
+            except (ValueError, AttributeError):
+                pass  # l'erreur est rapportée par le worker
+            items.append((item_id, line))
+
+    # ids en double (ou confondus une fois assainis) : suffixe -2, -3… pour
+    # ne pas écraser les fichiers de sortie d'un autre devis
+    seen = {item_id for item_id, _ in items}
+    used = set()
+    for i, (item_id, line) in enumerate(items):
+        if item_id in used:
+            n = 2
+            while f"{item_id}-{n}" in seen:
+                n += 1
+            new_id = f"{item_id}-{n}"
+            print(f"id en double {item_id!r} → {new_id!r}", file=sys.stderr)
+            seen.add(new_id)
+            items[i] = (new_id, line)
+            item_id = new_id
+        used.add(item_id)
+
+    total = len(items)
+    failures = []
+    t0 = time.perf_counter()
+    cache_init = {}
+    if args.cache:
+        # niveau disque partagé par les workers (la mémoire reste par processus)
+        cache_init = {"initializer": enable_render_cache,
+                      "initargs": (128, args.cache, args.cache_max_mb * 1024 * 1024)}
+    with ProcessPoolExecutor(max_workers=args.workers, **cache_init) as ex:
+        futures = [ex.submit(_batch_render_item, item_id, line, args.out,
+                             args.format, args.backend, args.dpi, args.min_round_px)
+                   for item_id, line in items]
+        for done, fut in enumerate(as_completed(futures), 1):
+            res = fut.result()
+            status = "ok" if res["ok"] else f"ÉCHEC — {res['error']}"
+            print(f"[{done}/{total}] {res['id']} {status} ({res['duration_s']:.2f} s)",
+                  file=sys.stderr)
+            if not res["ok"]:
+                failures.append(res)
+
+    print(f"{total - len(failures)}/{total} rendus en {time.perf_counter() - t0:.1f} s"
+          f" → {args.out}", file=sys.stderr)
+    for res in failures:
+        print(f"  échec {res['id']} : {res['error']}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _cli(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m canapematplot")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("batch", help="rendu par lots d'un fichier JSONL de configurations")
+    b.add_argument("configs", help="fichier JSONL : {\"id\", \"render\", \"params\"} par ligne")
+    b.add_argument("--out", required=True, help="répertoire de sortie (images + rapports JSON)")
+    b.add_argument("--workers", type=int, default=None, help="nombre de processus (défaut : nb de CPU)")
+    b.add_argument("--format", choices=("png", "svg"), default=None,
+                   help="défaut : svg avec --backend svg, png sinon")
+    b.add_argument("--backend", choices=("matplotlib", "matplotlib_world", "svg"), default="matplotlib")
+    b.add_argument("--dpi", type=int, default=100)
+    b.add_argument("--min-round-px", type=float, default=0.0,
+                   help="coins arrondis tracés droits sous ce rayon, en pixels (défaut 0)")
+    b.add_argument("--cache", default=None, metavar="DIR",
+                   help="répertoire du cache de rendu (réutilisé entre lots)")
+    b.add_argument("--cache-max-mb", type=int, default=512,
+                   help="taille maximale du cache disque (Mo)")
+    v = sub.add_parser("valise-lut", help="construit hors ligne la table des tailles valise (cf. VALISE_LUT_FILE)")
+    v.add_argument("--out", required=True, help="fichier de sortie, à désigner ensuite par VALISE_LUT_FILE")
+    args = parser.parse_args(argv)
+    if args.command == "valise-lut":
+        import sys
+        print(build_valise_lut(args.out), file=sys.stderr)
+        return 0
+    args.format = args.format or ("svg" if args.backend == "svg" else "png")
+    if args.backend == "svg" and args.format != "svg":
+        parser.error("--backend svg impose --format svg")
+    return _batch_main(args)
+
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        sys.exit(_cli(sys.argv[1:]))
+
     #TEST_21_LNF_v1_mer_gauche_split_TRg_p()
     #TEST_22_LNF_v1_mer_bas_split_TRb_gs()
     #TEST_23_LNF_v1_grand_scission_valise_TRgb_palette()
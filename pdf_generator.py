@@ -11,6 +11,38 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from io import BytesIO
 from datetime import datetime
+from xml.sax.saxutils import escape
+
+
+def _schema_drawing(schema, max_width):
+    """
+    Dessine le schéma du canapé directement en vectoriel (ReportLab)
+    
+    Args:
+        schema: Dictionnaire {'render': nom de la fonction render_* de
+                canapematplot, 'params': arguments de cette fonction}
+        max_width: Largeur disponible dans le cadre (points)
+    
+    Returns:
+        Drawing: Flowable ReportLab mis à l'échelle de la largeur disponible
+    
+    Raises:
+        ValueError: Fonction de rendu inconnue ou canapé impossible
+    """
+    # Import différé : le module de dessin n'est chargé que si un schéma est demandé
+    import canapematplot
+    
+    # seuls les points d'entrée de dessin d'un canapé (pas render_image, etc.)
+    render_fn = canapematplot.render_function(schema.get('render', ''))
+    
+    # rapport console du rendu : capturé pour ce thread, pas écrit sur la sortie du serveur
+    with canapematplot.capture_console():
+        drawing = canapematplot.render_drawing(render_fn, **schema.get('params', {}))
+    echelle = min(1.0, max_width / drawing.width)
+    drawing.scale(echelle, echelle)
+    drawing.width *= echelle
+    drawing.height *= echelle
+    return drawing
 
 
 def generer_pdf_devis(config, prix_details):
@@ -127,6 +159,18 @@ def generer_pdf_devis(config, prix_details):
     elements.append(table_config)
     elements.append(Spacer(1, 1*cm))
     
+    # Schéma du canapé (dessin vectoriel), si la configuration le décrit
+    if config.get('schema'):
+        elements.append(Paragraph("SCHÉMA DU CANAPÉ", subtitle_style))
+        try:
+            elements.append(_schema_drawing(config['schema'], doc.width))
+        except (ValueError, TypeError) as e:
+            # schéma impossible (rendu inconnu, banquette > 250 cm, paramètre
+            # invalide) : le devis est tout de même généré, sans le dessin
+            elements.append(Paragraph(f"Schéma indisponible : {escape(str(e))}",
+                                      styles['Italic']))
+        elements.append(Spacer(1, 1*cm))
+    
     # Détail des prix
     elements.append(Paragraph("DÉTAIL DU DEVIS", subtitle_style))
     